@@ -0,0 +1 @@
+"""The package contains the benchmarks for Hammett."""
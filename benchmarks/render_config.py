@@ -0,0 +1,109 @@
+"""The module benchmarks the finalization of the render config of a screen
+with a 30-button keyboard, comparing the former deep-copying path
+(`FinalRenderConfig(**asdict(config))`) with `finalize_render_config`.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/render_config.py
+"""
+
+import argparse
+import os
+import time
+from dataclasses import asdict
+from typing import TYPE_CHECKING
+
+os.environ.setdefault('HAMMETT_SETTINGS_MODULE', 'tests.settings')
+
+from hammett.core.button import Button
+from hammett.core.constants import FinalRenderConfig, RenderConfig
+from hammett.core.handlers import register_button_handler
+from hammett.core.screen import Screen
+from hammett.utils.render_config import finalize_render_config
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from telegram import Update
+    from telegram.ext import CallbackContext
+    from telegram.ext._utils.types import BD, BT, CD, UD
+    from typing_extensions import Self
+
+_BUTTONS_NUMBER = 30
+
+_BUTTONS_PER_ROW = 3
+
+
+class _BenchmarkScreen(Screen):
+    """The class implements the screen the buttons of which refer to
+    its own handler, as it usually happens in real bots.
+    """
+
+    description = 'Benchmark'
+
+    @register_button_handler
+    async def handle(
+        self: 'Self',
+        _update: 'Update',
+        _context: 'CallbackContext[BT, UD, CD, BD]',
+    ) -> None:
+        """Do nothing."""
+
+
+def _get_config() -> RenderConfig:
+    """Return the render config with a 30-button keyboard.
+
+    Returns
+    -------
+        Render config.
+
+    """
+    screen = _BenchmarkScreen()
+    buttons = [Button(f'Button {i}', screen.handle) for i in range(_BUTTONS_NUMBER)]
+    keyboard = [
+        buttons[i:i + _BUTTONS_PER_ROW] for i in range(0, _BUTTONS_NUMBER, _BUTTONS_PER_ROW)
+    ]
+    return RenderConfig(description='Benchmark', keyboard=keyboard)
+
+
+def _measure(
+    name: str,
+    iterations: int,
+    config: RenderConfig,
+    finalize: 'Callable[[RenderConfig], FinalRenderConfig]',
+) -> float:
+    """Finalize the config the specified number of times and report
+    the CPU time per render.
+
+    Returns
+    -------
+        CPU time per render in seconds.
+
+    """
+    start = time.process_time()
+    for _ in range(iterations):
+        finalize(config)
+
+    per_render = (time.process_time() - start) / iterations
+    print(f'{name:>24}: {per_render * 1e6:10.1f} us of CPU time per render')  # noqa: T201
+    return per_render
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    config = _get_config()
+    before = _measure(
+        'asdict (before)',
+        args.iterations,
+        config,
+        lambda config: FinalRenderConfig(**asdict(config)),
+    )
+    after = _measure('finalize_render_config', args.iterations, config, finalize_render_config)
+    print(f'{"speedup":>24}: {before / after:10.1f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
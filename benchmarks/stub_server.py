@@ -0,0 +1,122 @@
+"""The module contains the implementation of a local stub Bot API server
+intended for the benchmarks.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class StubBotAPIServer:
+    """The class implements a minimal HTTP/1.1 server which accepts any Bot API
+    method and responds with a message as the Bot API would do.
+    """
+
+    def __init__(self: 'Self', latency: float = 0.0) -> None:
+        """Initialize a stub Bot API server object."""
+        self.latency = latency
+        self.requests = 0
+        self.received_bytes = 0
+
+        self._server: asyncio.Server | None = None
+
+    @property
+    def base_url(self: 'Self') -> str:
+        """Base URL of the server to be passed to the bot.
+
+        Raises
+        ------
+            RuntimeError: If the server is not started.
+
+        """
+        if self._server is None:
+            msg = 'The server is not started'
+            raise RuntimeError(msg)
+
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}/bot'
+
+    @staticmethod
+    def _get_response_body(method: str) -> bytes:
+        """Return the body of the response to the specified Bot API method.
+
+        Returns
+        -------
+            Body of the response.
+
+        """
+        result: object
+        if method == 'getMe':
+            result = {'id': 1, 'first_name': 'Stub', 'is_bot': True, 'username': 'stub_bot'}
+        elif method.startswith(('send', 'edit')):
+            result = {
+                'message_id': 1,
+                'date': int(datetime.now(timezone.utc).timestamp()),
+                'chat': {'id': 1, 'type': 'private'},
+                'text': 'stub',
+            }
+        else:
+            result = True
+
+        return json.dumps({'ok': True, 'result': result}).encode()
+
+    async def _handle(
+        self: 'Self',
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Handle the requests sent over a single keep-alive connection."""
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                request_line, *headers = head.decode('latin-1').split('\r\n')
+                method = request_line.split(' ')[1].rsplit('/', 1)[-1]
+                content_length = 0
+                for line in headers:
+                    name, _, value = line.partition(':')
+                    if name.lower() == 'content-length':
+                        content_length = int(value)
+
+                # Read the body by chunks to not hold large uploads in memory.
+                remaining = content_length
+                while remaining:
+                    chunk = await reader.read(min(remaining, _CHUNK_SIZE))
+                    if not chunk:
+                        return
+
+                    remaining -= len(chunk)
+
+                self.requests += 1
+                self.received_bytes += content_length
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                body = self._get_response_body(method)
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\n'
+                    b'Content-Type: application/json\r\n'
+                    b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+                    b'\r\n' + body,
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self: 'Self') -> None:
+        """Start the server on a random local port."""
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+
+    async def stop(self: 'Self') -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -0,0 +1,76 @@
+"""The module benchmarks rendering a screen description with
+render_template_from_string, comparing the former path, which created
+an environment and compiled the template on every call, with the cache
+of the compiled templates.
+
+Usage:
+    PYTHONPATH=.:build/lib python3 benchmarks/template.py
+"""
+
+import argparse
+import html
+import os
+import time
+from typing import TYPE_CHECKING
+
+from jinja2 import BaseLoader, Environment
+
+os.environ.setdefault('HAMMETT_SETTINGS_MODULE', 'tests.settings')
+
+from hammett.template import render_template_from_string
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+_TEMPLATE = (
+    '<b>{{ artist }}</b>\n\n'
+    '{% for release in releases %}'
+    '{{ loop.index }}. <i>{{ release.title }}</i> ({{ release.year }})\n'
+    '{% endfor %}'
+)
+
+_CONTEXT = {
+    'artist': 'Artist',
+    'releases': [{'title': f'Release {i}', 'year': 2000 + i} for i in range(10)],
+}
+
+
+def _render_uncached(template: str, context: 'dict[str, Any]') -> str:
+    """Render the template the way render_template_from_string used to.
+
+    Returns
+    -------
+        Rendered template.
+
+    """
+    return Environment(  # noqa: S701
+        loader=BaseLoader(),
+    ).from_string(
+        html.unescape(template),
+    ).render(**context)
+
+
+def _run(name: str, render: 'Callable[[str, dict[str, Any]], str]', renders_number: int) -> None:
+    """Render the template the specified number of times."""
+    started_at = time.perf_counter()
+    for _ in range(renders_number):
+        render(_TEMPLATE, _CONTEXT)
+
+    elapsed = time.perf_counter() - started_at
+    print(f'{name:>8}: {renders_number / elapsed:>10.0f} renders/s')  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=10_000)
+    args = parser.parse_args()
+
+    # The former path is much slower, so it renders fewer times.
+    _run('uncached', _render_uncached, args.renders // 10)
+    _run('cached', render_template_from_string, args.renders)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""The module benchmarks the outbound Bot API transport against a local stub
+Bot API server, reporting the number of sends per second and the time spent
+waiting for a connection from the pool.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/transport.py
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+
+from telegram import Bot
+
+from benchmarks.stub_server import StubBotAPIServer
+from hammett.core.request import build_request
+
+_SOCKET_OPTIONS = ((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1), )
+
+
+async def _run(
+    server: StubBotAPIServer,
+    connection_pool_size: int,
+    requests_number: int,
+    concurrency: int,
+) -> None:
+    """Send the specified number of messages using the specified pool size."""
+    request = build_request({
+        'CONNECTION_POOL_SIZE': connection_pool_size,
+        # Let the requests queue on the pool instead of failing,
+        # to see how long they wait.
+        'POOL_TIMEOUT': None,
+        'SOCKET_OPTIONS': _SOCKET_OPTIONS,
+    })
+    bot = Bot('123:stub', base_url=server.base_url, request=request)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send() -> None:
+        async with semaphore:
+            await bot.send_message(chat_id=1, text='benchmark')
+
+    async with bot:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(requests_number)))
+        elapsed = time.perf_counter() - started_at
+
+    stats = request.pool_stats
+    print(  # noqa: T201
+        f'pool size {connection_pool_size:>4}: '
+        f'{requests_number / elapsed:>8.1f} sends/s, '
+        f'avg pool wait {stats.avg_wait * 1000:>7.2f} ms, '
+        f'max pool wait {stats.max_wait * 1000:>7.2f} ms',
+    )
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.01)
+    args = parser.parse_args()
+
+    server = StubBotAPIServer(latency=args.latency)
+    await server.start()
+    try:
+        for connection_pool_size in (1, 8, 64, 256):
+            await _run(server, connection_pool_size, args.requests, args.concurrency)
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""The module benchmarks sending a large local document concurrently
+against a local stub Bot API server, reporting the peak memory usage
+when the document is streamed and when it's read into memory.
+Each mode is run in its own process, so that the peaks don't mix.
+
+Usage:
+    PYTHONPATH=.:build/lib python3 benchmarks/uploads.py
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('HAMMETT_SETTINGS_MODULE', 'tests.settings')
+
+from telegram import Bot
+
+from benchmarks.stub_server import StubBotAPIServer
+from hammett.conf import settings
+from hammett.core.request import build_request
+from hammett.core.uploads import Uploads
+
+_MODES = ('buffered', 'streamed')
+
+
+async def _run(mode: str, path: Path, uploads_number: int) -> None:
+    """Send the document the specified number of times concurrently."""
+    # Don't let the media cache share the contents of the buffered document.
+    settings.MEDIA_CACHE = {'ENABLED': False}
+    settings.UPLOADS = {
+        'STREAMING_THRESHOLD': 0 if mode == 'streamed' else None,
+        # Let all the uploads run concurrently, to see the peak memory usage.
+        'MAX_BYTES_IN_FLIGHT': 0,
+    }
+    server = StubBotAPIServer()
+    await server.start()
+    request = build_request({'CONNECTION_POOL_SIZE': uploads_number, 'POOL_TIMEOUT': None})
+    bot = Bot('123:stub', base_url=server.base_url, request=request)
+
+    async def send() -> None:
+        uploads = Uploads()
+        try:
+            document = await uploads.add(path)
+            async with uploads.reserve():
+                await bot.send_document(chat_id=1, document=document, read_timeout=None)
+        finally:
+            uploads.close()
+
+    try:
+        async with bot:
+            started_at = time.perf_counter()
+            await asyncio.gather(*(send() for _ in range(uploads_number)))
+            elapsed = time.perf_counter() - started_at
+    finally:
+        await server.stop()
+
+    # ru_maxrss is in kilobytes on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(  # noqa: T201
+        f'{mode:>8}: {elapsed:>6.2f} s, peak RSS {peak_rss:>8.1f} MB',
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--uploads', type=int, default=50)
+    parser.add_argument('--size', type=int, default=20, help='size of the document in MB')
+    parser.add_argument('--mode', choices=_MODES)
+    parser.add_argument('--path', type=Path)
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(_run(args.mode, args.path, args.uploads))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'document.bin'
+        with path.open('wb') as outfile:
+            for _ in range(args.size):
+                outfile.write(b'\0' * 1024 * 1024)
+
+        for mode in _MODES:
+            subprocess.run(  # noqa: S603
+                [
+                    sys.executable, __file__,
+                    '--mode', mode,
+                    '--path', str(path),
+                    '--uploads', str(args.uploads),
+                ],
+                check=True,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""The module contains the facility for sharing the objects built from
+the settings (e.g., queues and caches) between the modules using them.
+"""
+
+from typing import TYPE_CHECKING, TypeVar, cast
+
+from hammett.conf import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+_T = TypeVar('_T')
+
+_configured_objects: 'dict[tuple[str, Callable[[Any], Any]], tuple[Any, Any]]' = {}
+
+
+def get_configured_object(name: str, build: 'Callable[[Any], _T]') -> _T:
+    """Return the object built from the value of the specified setting.
+    The object is shared until the value of the setting changes (e.g.,
+    when the setting is overridden in the tests), and then it's built again.
+
+    Returns
+    -------
+        Object built from the value of the setting.
+
+    """
+    value = getattr(settings, name)
+    key = (name, build)
+    try:
+        built_from, obj = _configured_objects[key]
+    except KeyError:
+        pass
+    else:
+        if built_from == value:
+            return cast('_T', obj)
+
+    obj = build(value)
+    _configured_objects[key] = (value, obj)
+    return obj
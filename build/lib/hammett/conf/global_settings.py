@@ -7,30 +7,148 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from typing import Any
 
+# Sets the number of updates processed concurrently (True means 256).
+# Processing updates concurrently lets the data loaders batch the queries
+# made by the handlers of different users.
+# https://docs.python-telegram-bot.org/en/stable/telegram.ext.applicationbuilder.html#telegram.ext.ApplicationBuilder.concurrent_updates
+APPLICATION_BUILDER_CONCURRENT_UPDATES: 'bool | int' = False
+
 # Sets the waiting timeout for the read_timeout parameter of telegram.Bot.request.
 # https://docs.python-telegram-bot.org/en/stable/telegram.ext.applicationbuilder.html#telegram.ext.ApplicationBuilder.read_timeout
 APPLICATION_BUILDER_READ_TIMEOUT = 5.0
 
+# Configures the connection pool used for the regular Bot API requests
+# (sending messages, editing them, answering callback queries, etc.).
+# KEEPALIVE_CONNECTIONS set to None means that all the connections of the pool
+# are kept alive. HTTP_VERSION set to '2' requires python-telegram-bot[http2].
+# SOCKET_OPTIONS is passed to httpx as is (for example, to enable TCP_NODELAY).
+APPLICATION_BUILDER_REQUEST = {
+    'CONNECTION_POOL_SIZE': 256,
+    'HTTP_VERSION': '1.1',
+    'KEEPALIVE_CONNECTIONS': None,
+    'KEEPALIVE_EXPIRY': 5.0,
+    'POOL_TIMEOUT': 1.0,
+    'SOCKET_OPTIONS': None,
+}
+
+# Configures the separate connection pool used for the getUpdates requests,
+# so that long polling never occupies the connections needed for sending messages.
+APPLICATION_BUILDER_GET_UPDATES_REQUEST = {
+    'CONNECTION_POOL_SIZE': 1,
+    'HTTP_VERSION': '1.1',
+    'KEEPALIVE_CONNECTIONS': None,
+    'KEEPALIVE_EXPIRY': 5.0,
+    'POOL_TIMEOUT': 1.0,
+    'SOCKET_OPTIONS': None,
+}
+
+# Sets the time in seconds after which a deferred answer to a callback query
+# is sent automatically, even if the handler hasn't finished yet.
+CALLBACK_ANSWER_TIMEOUT = 5.0
+
+# Makes the renderer preprocess the local covers before uploading them:
+# downscale them to MAX_SIZE pixels on the longer side (Telegram doesn't
+# display photos larger than that anyway), convert them to FORMAT ('JPEG'
+# or 'WEBP') with the specified QUALITY and strip their metadata.
+# The covers are processed in a pool of MAX_WORKERS processes (defaults to
+# the number of CPUs) and cached in CACHE_DIR (defaults to a directory in
+# the system temporary directory) by the hash of their content, so each cover
+# is processed only once. Requires Pillow.
+COVER_PREPROCESSING = {
+    'ENABLED': False,
+    'CACHE_DIR': '',
+    'FORMAT': 'JPEG',
+    'MAX_SIZE': 1280,
+    'MAX_WORKERS': None,
+    'QUALITY': 85,
+}
+
 DOMAIN = 'hammett'
 
+# Makes the screens collapse the bursts of edits of the same message (e.g.,
+# when a user taps a button quickly several times) into the latest one.
+# The first edit is made immediately, and only the latest of the edits
+# following it within WINDOW seconds is made in the background once
+# the window is over, so the handlers never wait for the window and are
+# still called on every tap.
+EDIT_DEBOUNCE = {
+    'ENABLED': False,
+    'WINDOW': 0.3,
+}
+
 ERROR_HANDLER_CONF = {
     'IGNORE_QUERY_IS_TOO_OLD': False,
     'IGNORE_TIMED_OUT': False,
     'IGNORE_UPDATE_MASSAGE_FAIL': False,
 }
 
+# Configures the cache of the file IDs of the uploaded local covers, which
+# are keyed by the path and the content hash of the covers. The backends
+# are MemoryFileIdCache (keeps up to MAX_ENTRIES file IDs of the current
+# process), SQLiteFileIdCache (keeps the file IDs in the database at PATH)
+# and RedisFileIdCache (uses the REDIS_FILE_ID_CACHE setting). WARMUP_CHAT_ID
+# is the service chat the covers are uploaded to by the warmup command
+# (python -m hammett.core.file_id_cache).
+FILE_ID_CACHE = {
+    'BACKEND': 'hammett.core.file_id_cache.MemoryFileIdCache',
+    'MAX_ENTRIES': 10_000,
+    'PATH': '',
+    'WARMUP_CHAT_ID': 0,
+}
+
 HIDERS_CHECKER = ''
 
 HTML_PARSE_MODE = True
 
+# Makes the screens hide the keyboards of the previous messages in the
+# background instead of waiting for it before returning. The hides are sent
+# one by one per chat with the lowest priority of the send queue, the repeated
+# hides of the same message are coalesced, and up to MAX_PENDING hides are
+# kept waiting (the oldest ones are dropped first). The pending hides are
+# sent when the application stops, but they are lost if the process is killed.
+KEYBOARD_HIDING = {
+    'DEFERRED': False,
+    'MAX_PENDING': 10000,
+}
+
 LANGUAGE_CODE = 'en'
 
 LOCALE_PATH = ''
 
+# Makes the bot load the translation catalogs of all the languages found
+# in LOCALE_PATH at startup rather than on the first translation into each
+# language.
+LOCALE_PRELOAD = False
+
 LOGGING: dict[str, 'Any'] = {}
 
+# Makes the renderer keep the contents of the local media files (e.g.,
+# covers) in memory, up to MAX_BYTES in total, instead of reading them from
+# disk on every render. The contents are dropped when the file is modified,
+# and the files larger than MAX_FILE_SIZE are not cached.
+MEDIA_CACHE = {
+    'ENABLED': True,
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'MAX_FILE_SIZE': 10 * 1024 * 1024,
+}
+
 PAYLOAD_NAMESPACE = 'hammett'
 
+# Configures the store of the button payloads too large to be packed into
+# the callback data. The payloads not accessed within TTL seconds expire.
+# BotDataPayloadStore keeps the payloads in bot_data, so they are saved by
+# the persistence. It and MemoryPayloadStore, which loses the payloads on
+# restart, evict the least recently used payloads when there are more than
+# MAX_ENTRIES of them or their total size exceeds MAX_BYTES. RedisPayloadStore
+# keeps each payload under its own key with EXPIRE and uses
+# the REDIS_PAYLOAD_STORE setting.
+PAYLOAD_STORE = {
+    'BACKEND': 'hammett.core.payload_store.BotDataPayloadStore',
+    'MAX_BYTES': 16 * 1024 * 1024,
+    'MAX_ENTRIES': 100_000,
+    'TTL': 7 * 24 * 60 * 60,
+}
+
 PERMISSIONS: list[str] = []
 
 REDIS_CONF = {
@@ -45,21 +163,121 @@ REDIS_CACHE = {
     'DB': 1,
 }
 
+REDIS_FILE_ID_CACHE = {
+    **REDIS_CONF,
+    'DB': 3,
+}
+
+REDIS_PAYLOAD_STORE = {
+    **REDIS_CONF,
+    'DB': 2,
+}
+
 REDIS_PERSISTENCE = {
     **REDIS_CONF,
     'DB': 0,
 }
 
+# Makes the renderer remember the fingerprints of the last rendered text,
+# media and keyboard of up to MAX_MESSAGES messages, so that editing
+# a message skips the requests which change nothing, and sends only
+# the keyboard or the caption when the rest is the same. The fingerprints
+# are kept in the memory of the process, so don't enable it if the messages
+# of the bot are edited by several processes, or by anything but the renderer.
+RENDER_DIFF = {
+    'ENABLED': False,
+    'MAX_MESSAGES': 10_000,
+}
+
 SAVE_LATEST_MESSAGE = False
 
+# Configures the queue the outbound requests of the renderer go through.
+# The queue enforces the global and per-chat Telegram rate limits using token
+# buckets (the RATE keys are measured in requests per second, the BURST keys
+# are the capacities of the buckets), sends the interactive edits ahead of
+# the notifications and jobs, and pauses only the affected chat on RetryAfter.
+# Negative chat IDs (i.e., groups and channels) are subject to the GROUP_CHAT
+# limits.
+SEND_QUEUE = {
+    'ENABLED': False,
+    'GLOBAL_RATE': 30,
+    'GLOBAL_BURST': 30,
+    'PER_CHAT_RATE': 1,
+    'PER_CHAT_BURST': 3,
+    'GROUP_CHAT_RATE': 20 / 60,
+    'GROUP_CHAT_BURST': 3,
+    'MAX_RETRIES': 3,
+}
+
+# Enables shedding the stale updates replayed after a restart or an outage.
+# The backlog consists of the messages sent before the bot started and
+# the callback queries made on such messages, and it's drained until the first
+# update which is not a part of it, but no longer than MAX_DRAIN_TIME seconds
+# after the start (None means no limit). The callback queries of the backlog
+# are dropped (and answered, if ANSWER_STALE_CALLBACK_QUERIES is True) and
+# the repeated /start commands of the same user in the backlog are collapsed.
+# The messages older than MAX_MESSAGE_AGE seconds are dropped; None means
+# that the messages are never dropped.
+STALE_UPDATES = {
+    'ENABLED': False,
+    'ANSWER_STALE_CALLBACK_QUERIES': True,
+    'COLLAPSE_STARTS': True,
+    'MAX_DRAIN_TIME': 60,
+    'MAX_MESSAGE_AGE': None,
+}
+
+# Limits the number of the templates compiled by render_template_from_string
+# and kept in memory. The least recently used templates are evicted first.
+TEMPLATE_CACHE = {
+    'MAX_ENTRIES': 1000,
+}
+
 TOKEN = ''
 
+# Makes the renderer stream the local files larger than STREAMING_THRESHOLD
+# bytes to Telegram by chunks instead of reading them into memory, and
+# limits the total size of the files uploaded concurrently to
+# MAX_BYTES_IN_FLIGHT bytes.
+UPLOADS = {
+    'STREAMING_THRESHOLD': 1024 * 1024,
+    'MAX_BYTES_IN_FLIGHT': 64 * 1024 * 1024,
+}
+
 USE_WEBHOOK = False
 
+# Sets the number of times setting the webhook is retried on failure
+# (-1 means retrying indefinitely).
+WEBHOOK_BOOTSTRAP_RETRIES = 0
+
+# Sets the paths to the SSL certificate and its private key, if the webhook
+# server is in charge of the SSL handshake (i.e., there is no reverse proxy).
+WEBHOOK_CERT = ''
+
+# Makes Telegram drop the updates accumulated while the bot was down.
+WEBHOOK_DROP_PENDING_UPDATES = False
+
+WEBHOOK_KEY = ''
+
 WEBHOOK_LISTEN = '127.0.0.1'
 
+# Sets the maximum number of simultaneous connections Telegram opens to
+# the webhook server (1-100).
+WEBHOOK_MAX_CONNECTIONS = 40
+
 WEBHOOK_PORT = 80
 
+# Makes the webhook server return the answer to a callback query inline in
+# the response to the webhook request instead of sending it as a separate
+# request. If the callback query is not answered within WEBHOOK_REPLY_TIMEOUT
+# seconds, the response is returned empty and the answer is sent as usual.
+WEBHOOK_REPLY = False
+
+WEBHOOK_REPLY_TIMEOUT = 0.5
+
+# Sets the secret token Telegram sends in the X-Telegram-Bot-Api-Secret-Token
+# header of every webhook request. The requests without it are rejected.
+WEBHOOK_SECRET_TOKEN = ''
+
 WEBHOOK_URL_PATH = ''
 
 WEBHOOK_URL = ''
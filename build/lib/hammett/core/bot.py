@@ -2,6 +2,7 @@
 
 # ruff: noqa: PLR2004
 
+import functools
 import logging
 import sys
 from typing import TYPE_CHECKING, Any
@@ -12,31 +13,45 @@ from telegram.ext import (
     CallbackQueryHandler,
     CommandHandler,
     MessageHandler,
+    TypeHandler,
     filters,
 )
 
+from hammett.core.callback_answer import finish_callback_answer_handler
+from hammett.core.callback_data import get_handler_pattern
+from hammett.core.constants import FINISH_CALLBACK_ANSWER_GROUP, STALE_UPDATE_FILTER_GROUP
 from hammett.core.conversation_handler import ConversationHandler
+from hammett.core.edit_debounce import get_edit_debouncer
 from hammett.core.exceptions import (
     CallbackNotProvided,
     JobKwargsNotProvided,
     TokenIsNotSpecified,
     UnknownHandlerType,
 )
-from hammett.core.handlers import calc_checksum, log_unregistered_handler
+from hammett.core.handlers import log_unregistered_handler
+from hammett.core.intake import build_stale_update_filter
+from hammett.core.keyboard_hiding import get_keyboard_hiding_queue
+from hammett.core.media_cache import get_media_cache
 from hammett.core.permission import apply_permission_to
+from hammett.core.request import InstrumentedHTTPXRequest, build_request
+from hammett.core.webhook import WebhookReplyRequest, run_webhook_with_replies
 from hammett.error_handler import default_error_handler
+from hammett.template import precompile_templates
 from hammett.types import HandlerAlias, HandlerType, JobConfig
 from hammett.utils.log import configure_logging
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Coroutine, Iterable
 
     from telegram.ext import BasePersistence
     from telegram.ext._applicationbuilder import ApplicationBuilder
     from telegram.ext._utils.types import BD, CD, UD
     from typing_extensions import Self
 
+    from hammett.core.intake import IntakeStats
+    from hammett.core.media_cache import MediaCacheStats
     from hammett.core.mixins import StartMixin
+    from hammett.core.request import PoolStats
     from hammett.core.screen import Screen
     from hammett.types import Handler, HandlerAlias, NativeStates, State, States
 
@@ -90,6 +105,19 @@ class Bot:
             builder.persistence(persistence)
 
         self._native_application = builder.build()
+        if settings.EDIT_DEBOUNCE.get('ENABLED') or settings.KEYBOARD_HIDING.get('DEFERRED'):
+            self._native_application.post_stop = functools.partial(
+                self._send_pending_requests,
+                self._native_application.post_stop,
+            )
+
+        self._stale_update_filter = None
+        if settings.STALE_UPDATES.get('ENABLED'):
+            self._stale_update_filter = build_stale_update_filter()
+            self._native_application.add_handler(
+                TypeHandler(Update, self._stale_update_filter),
+                group=STALE_UPDATE_FILTER_GROUP,
+            )
 
         if self._states:
             for state in self._states.items():
@@ -105,6 +133,10 @@ class Bot:
             name=self._name,
             persistent=bool(persistence),
         ))
+        self._native_application.add_handler(
+            TypeHandler(Update, finish_callback_answer_handler),
+            group=FINISH_CALLBACK_ANSWER_GROUP,
+        )
 
     @staticmethod
     def _get_handler_object(
@@ -129,7 +161,7 @@ class Bot:
                 handler,
                 # Specify a pattern. The pattern is used to determine which handler
                 # should be triggered when a specific button is pressed.
-                pattern=calc_checksum(handler),
+                pattern=get_handler_pattern(handler),
             )
         elif handler_type == HandlerType.COMMAND_HANDLER:
             handler_object = MessageHandler(
@@ -202,6 +234,10 @@ class Bot:
     def _register_handlers(self: 'Self', state: 'State', screens: 'Iterable[type[Screen]]') -> None:
         self._set_default_value_to_native_states(state)
 
+        screens = tuple(screens)
+        # The descriptions are often rendered as templates, so they are
+        # compiled at startup rather than on the first renders.
+        precompile_templates(screen.description for screen in screens)
         for screen in screens:
             for name in dir(screen):
                 acceptable_handler_types = (
@@ -244,6 +280,20 @@ class Bot:
                 else:
                     self._native_states[state].append(handler_object)
 
+    @staticmethod
+    async def _send_pending_requests(
+        post_stop: 'Callable[[Any], Coroutine[Any, Any, None]] | None',
+        application: 'NativeApplication[Any, Any, Any, Any, Any, Any]',
+    ) -> None:
+        """Make the edits still waiting in the edit debouncer and hide
+        the keyboards still waiting in the keyboard hiding queue when
+        the application stops, then call the original post_stop callback.
+        """
+        await get_edit_debouncer().join()
+        await get_keyboard_hiding_queue().join()
+        if post_stop is not None:
+            await post_stop(application)
+
     def _set_default_value_to_native_states(self: 'Self', state: 'State') -> None:
         """Set default value to native states."""
         try:
@@ -252,10 +302,18 @@ class Bot:
             self._native_states[state] = []
 
     def _setup(self: 'Self') -> None:
-        """Configure logging."""
+        """Configure logging and load the translation catalogs if it's
+        required by the LOCALE_PRELOAD setting.
+        """
         from hammett.conf import settings
         configure_logging(settings.LOGGING)
 
+        if settings.LOCALE_PATH and settings.LOCALE_PRELOAD:
+            from hammett.utils.translation import preload_catalogs
+
+            languages = preload_catalogs()
+            logger.debug('Loaded the translation catalogs: %s', ', '.join(languages))
+
     def provide_application_builder(self: 'Self') -> 'ApplicationBuilder':  # type: ignore[type-arg]
         """Return a native application builder.
 
@@ -266,12 +324,63 @@ class Bot:
         """
         from hammett.conf import settings
 
-        return NativeApplication.builder().read_timeout(
-            settings.APPLICATION_BUILDER_READ_TIMEOUT,
+        request_class = InstrumentedHTTPXRequest
+        if settings.USE_WEBHOOK and settings.WEBHOOK_REPLY:
+            request_class = WebhookReplyRequest
+
+        return NativeApplication.builder().request(
+            build_request(
+                settings.APPLICATION_BUILDER_REQUEST,
+                read_timeout=settings.APPLICATION_BUILDER_READ_TIMEOUT,
+                request_class=request_class,
+            ),
+        ).get_updates_request(
+            build_request(settings.APPLICATION_BUILDER_GET_UPDATES_REQUEST),
+        ).concurrent_updates(
+            settings.APPLICATION_BUILDER_CONCURRENT_UPDATES,
         ).token(
             settings.TOKEN,
         )
 
+    def get_intake_stats(self: 'Self') -> 'IntakeStats | None':
+        """Return the statistics of the stale update filter.
+
+        Returns
+        -------
+            Statistics of the stale update filter or None if the filter is disabled.
+
+        """
+        if self._stale_update_filter is None:
+            return None
+
+        return self._stale_update_filter.stats
+
+    @staticmethod
+    def get_media_cache_stats() -> 'MediaCacheStats':
+        """Return the statistics of the cache of the local media files.
+
+        Returns
+        -------
+            Statistics of the media cache.
+
+        """
+        return get_media_cache().get_stats()
+
+    def get_pool_stats(self: 'Self') -> 'dict[str, PoolStats | None]':
+        """Return the statistics of waiting for a connection from the pools
+        used for the getUpdates requests and the regular Bot API requests.
+
+        Returns
+        -------
+            Statistics of waiting for a connection from the pools.
+
+        """
+        get_updates_request, request = self._native_application.bot._request  # noqa: SLF001
+        return {
+            'get_updates': getattr(get_updates_request, 'pool_stats', None),
+            'request': getattr(request, 'pool_stats', None),
+        }
+
     def run(self: 'Self') -> None:
         """Run the bot."""
         from hammett.conf import settings
@@ -289,13 +398,26 @@ class Bot:
                 "lead to an improper shutdown process.",
             )
 
-        if settings.USE_WEBHOOK:
-            self._native_application.run_webhook(
-                listen=settings.WEBHOOK_LISTEN,
-                port=settings.WEBHOOK_PORT,
-                url_path=settings.WEBHOOK_URL_PATH,
-                webhook_url=settings.WEBHOOK_URL,
-                allowed_updates=Update.ALL_TYPES,
+        webhook_kwargs = {
+            'listen': settings.WEBHOOK_LISTEN,
+            'port': settings.WEBHOOK_PORT,
+            'url_path': settings.WEBHOOK_URL_PATH,
+            'cert': settings.WEBHOOK_CERT or None,
+            'key': settings.WEBHOOK_KEY or None,
+            'bootstrap_retries': settings.WEBHOOK_BOOTSTRAP_RETRIES,
+            'webhook_url': settings.WEBHOOK_URL,
+            'allowed_updates': Update.ALL_TYPES,
+            'drop_pending_updates': settings.WEBHOOK_DROP_PENDING_UPDATES,
+            'max_connections': settings.WEBHOOK_MAX_CONNECTIONS,
+            'secret_token': settings.WEBHOOK_SECRET_TOKEN or None,
+        }
+        if settings.USE_WEBHOOK and settings.WEBHOOK_REPLY:
+            run_webhook_with_replies(
+                self._native_application,
+                reply_timeout=settings.WEBHOOK_REPLY_TIMEOUT,
+                **webhook_kwargs,
             )
+        elif settings.USE_WEBHOOK:
+            self._native_application.run_webhook(**webhook_kwargs)
         else:
             self._native_application.run_polling(allowed_updates=Update.ALL_TYPES)
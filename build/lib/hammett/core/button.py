@@ -4,12 +4,15 @@ from typing import TYPE_CHECKING, cast
 
 from telegram import InlineKeyboardButton, WebAppInfo
 
-from hammett.core import handlers
+from hammett.core import callback_data
 from hammett.core.constants import SourceTypes
 from hammett.core.exceptions import ImproperlyConfigured, UnknownSourceType
+from hammett.core.payload_store import get_payload_store
 from hammett.utils.module_loading import import_string
 
 if TYPE_CHECKING:
+    from typing import Any
+
     from telegram import Update
     from telegram.ext import CallbackContext
     from telegram.ext._utils.types import BD, BT, CD, UD
@@ -57,9 +60,18 @@ class Button:
         self.source_type = source_type
         self.hiders = hiders
 
+        # The parts of the inline button that don't depend on the user
+        # are computed once and reused on subsequent renders.
+        self._callback_data_header: tuple[Handler, str, str] | None = None
+        self._encoded_payload: tuple[str, tuple[str, str | None]] | None = None
+        self._inline_button: tuple[tuple[Any, ...], InlineKeyboardButton] | None = None
+
         self._check_source()
         self._init_hider_checker()
 
+        if self.source_type in _HANDLER_SOURCES_TYPES:
+            self._get_callback_data_header()
+
     #
     # Private methods
     #
@@ -136,6 +148,64 @@ class Button:
             )
             raise TypeError(msg)
 
+    def _create_inline_button(self: 'Self') -> InlineKeyboardButton:
+        """Create the inline button which doesn't depend on the user.
+
+        Returns
+        -------
+            Object of the `InlineKeyboardButton` type.
+
+        Raises
+        ------
+            UnknownSourceType: If the source type of the button is unknown.
+
+        """
+        if self.source_type == SourceTypes.URL_SOURCE_TYPE and isinstance(self.source, str):
+            return InlineKeyboardButton(self.caption, url=self.source)
+
+        if self.source_type == SourceTypes.WEB_APP_SOURCE_TYPE and isinstance(self.source, str):
+            return InlineKeyboardButton(self.caption, web_app=WebAppInfo(url=self.source))
+
+        raise UnknownSourceType
+
+    def _get_callback_data_header(self: 'Self') -> str:
+        """Return the part of the callback data that doesn't depend on the user,
+        computing it again only if the source or the caption has changed.
+
+        Returns
+        -------
+            Part of the callback data that doesn't depend on the user.
+
+        """
+        if self.source_type in _SHORTCUT_SOURCES_TYPES and self.source_shortcut:
+            source = self.source_shortcut
+        else:
+            source = cast('Handler', self.source)
+
+        cached = self._callback_data_header
+        if cached is not None and cached[0] is source and cached[1] == self.caption:
+            return cached[2]
+
+        header = callback_data.encode_callback_data_header(source, self.caption)
+        self._callback_data_header = (source, self.caption, header)
+        return header
+
+    def _encode_payload(self: 'Self') -> tuple[str, str | None]:
+        """Encode the payload of the button, computing it again only if
+        the payload has changed.
+
+        Returns
+        -------
+            Encoded payload and the key under which the payload must be put into
+            the payload storage, or None if the payload is packed inline.
+
+        """
+        payload = cast('str', self.payload)
+        if self._encoded_payload is None or self._encoded_payload[0] != payload:
+            self._encoded_payload = (payload, callback_data.encode_payload(payload))
+
+        return self._encoded_payload[1]
+
     @staticmethod
     def _get_user_id(
         update: 'Update | None',
@@ -203,31 +273,33 @@ class Button:
         visibility = await self._specify_visibility(update, context)
 
         if self.source_type in _HANDLER_SOURCES_TYPES:
-            if self.source_type in _SHORTCUT_SOURCES_TYPES and self.source_shortcut:
-                source = self.source_shortcut
-            else:
-                source = cast('Handler', self.source)
-
             chat_id = self._get_user_id(update, context) or self.chat_id
-            data = (
-                f'{handlers.calc_checksum(source)},'
-                f'button={handlers.calc_checksum(self.caption)},'
-                f'user_id={chat_id}'
-            )
-
-            if self.payload is not None:
-                payload_storage = handlers.get_payload_storage(context)
-                payload_storage[data] = self.payload
+            header, encoded_payload, payload_key = self.get_callback_data_parts()
+            data = f'{header}{callback_data.encode_user_id(chat_id)}{encoded_payload}'
+            if payload_key is not None:
+                await get_payload_store(context).set(payload_key, cast('str', self.payload))
 
             return InlineKeyboardButton(self.caption, callback_data=data), visibility
 
-        if self.source_type == SourceTypes.URL_SOURCE_TYPE and isinstance(self.source, str):
-            return InlineKeyboardButton(self.caption, url=self.source), visibility
+        key = (self.caption, self.source, self.source_type)
+        if self._inline_button is None or self._inline_button[0] != key:
+            self._inline_button = (key, self._create_inline_button())
 
-        if self.source_type == SourceTypes.WEB_APP_SOURCE_TYPE and isinstance(self.source, str):
-            return InlineKeyboardButton(
-                self.caption,
-                web_app=WebAppInfo(url=self.source),
-            ), visibility
+        return self._inline_button[1], visibility
 
-        raise UnknownSourceType
+    def get_callback_data_parts(self: 'Self') -> tuple[str, str, str | None]:
+        """Return the parts of the callback data of the button which don't
+        depend on the user, i.e. the ones preceding and following the user ID.
+
+        Returns
+        -------
+            Header of the callback data, encoded payload and the key under which
+            the payload must be put into the payload store, or None if the payload
+            is packed inline or missing.
+
+        """
+        if self.payload is None:
+            return self._get_callback_data_header(), '', None
+
+        encoded_payload, payload_key = self._encode_payload()
+        return self._get_callback_data_header(), encoded_payload, payload_key
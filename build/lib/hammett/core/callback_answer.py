@@ -0,0 +1,191 @@
+"""The module contains the implementation of the mechanism that ensures
+each callback query is answered exactly once.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from telegram import Update
+from telegram.error import TelegramError
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from telegram import CallbackQuery
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+# The answers are normally forgotten once the handler finishes. The limit
+# only protects from leaks when callback queries are processed outside
+# the registered handlers.
+_MAX_CALLBACK_ANSWERS = 1000
+
+_callback_answers: 'OrderedDict[str, CallbackAnswer]' = OrderedDict()
+
+
+class CallbackAnswer:
+    """The class implements the answer to a callback query, which is sent
+    at most once, either immediately or, if deferred, when the handler
+    finishes or the timeout expires.
+    """
+
+    def __init__(self: 'Self', query: 'CallbackQuery') -> None:
+        """Initialize a callback answer object."""
+        self.query = query
+        self.answered = False
+        self.deferred = False
+        self.kwargs: dict[str, Any] = {}
+
+        self._lock = asyncio.Lock()
+        self._timeout_handle: asyncio.TimerHandle | None = None
+        self._timeout_task: asyncio.Task[None] | None = None
+
+    #
+    # Private methods
+    #
+
+    def _answer_on_timeout(self: 'Self') -> None:
+        """Answer the callback query when the deferral timeout expires."""
+        self._timeout_handle = None
+        if not self.answered:
+            LOGGER.debug('Answering the callback query %s on timeout', self.query.id)
+            self._timeout_task = asyncio.get_running_loop().create_task(
+                self._answer_in_background(),
+            )
+
+    async def _answer_in_background(self: 'Self') -> None:
+        """Answer the callback query, logging the error if it fails, since
+        nobody awaits the result.
+        """
+        try:
+            await self.answer()
+        except TelegramError:
+            LOGGER.exception('Failed to answer the callback query %s', self.query.id)
+
+    #
+    # Public methods
+    #
+
+    async def answer(self: 'Self', **kwargs: 'Any') -> bool:
+        """Answer the callback query unless it has already been answered.
+        The specified kwargs take precedence over the ones set earlier.
+
+        Returns
+        -------
+            True if the callback query was answered by this call, or False otherwise.
+
+        """
+        # The lock prevents the timeout and the handler from answering
+        # concurrently, while the query remains unanswered if sending fails.
+        async with self._lock:
+            if self.answered:
+                return False
+
+            if self._timeout_handle is not None:
+                self._timeout_handle.cancel()
+                self._timeout_handle = None
+
+            await self.query.answer(**{**self.kwargs, **kwargs})
+            self.answered = True
+            return True
+
+    def defer(self: 'Self', timeout: float) -> None:
+        """Postpone answering the callback query until the handler finishes,
+        but no longer than the specified timeout.
+        """
+        if self.answered:
+            return
+
+        self.deferred = True
+        if self._timeout_handle is not None:
+            self._timeout_handle.cancel()
+
+        self._timeout_handle = asyncio.get_running_loop().call_later(
+            timeout,
+            self._answer_on_timeout,
+        )
+
+    def set(self: 'Self', text: str | None = None, **kwargs: 'Any') -> None:
+        """Set the text and other parameters (e.g., show_alert) of the answer."""
+        self.kwargs.update(text=text, **kwargs)
+
+
+def _get_callback_answer(query: 'CallbackQuery') -> CallbackAnswer:
+    """Return the answer to the specified callback query, creating it if needed.
+
+    Returns
+    -------
+        Answer to the callback query.
+
+    """
+    try:
+        callback_answer = _callback_answers[query.id]
+    except KeyError:
+        callback_answer = CallbackAnswer(query)
+        _callback_answers[query.id] = callback_answer
+        if len(_callback_answers) > _MAX_CALLBACK_ANSWERS:
+            _callback_answers.popitem(last=False)
+
+    return callback_answer
+
+
+async def answer_callback_query(query: 'CallbackQuery') -> None:
+    """Answer the callback query unless it has already been answered
+    or the answer is deferred.
+    """
+    callback_answer = _get_callback_answer(query)
+    if not callback_answer.deferred:
+        await callback_answer.answer()
+
+
+def defer_callback_answer(
+    update: 'Update',
+    text: str | None = None,
+    timeout: float | None = None,
+    **kwargs: 'Any',
+) -> None:
+    """Postpone answering the callback query of the update until the handler
+    finishes, so that the answer can carry a notification or an alert.
+    If the handler does not finish within the timeout (the CALLBACK_ANSWER_TIMEOUT
+    setting by default), the callback query is answered automatically.
+    """
+    from hammett.conf import settings
+
+    query = update.callback_query
+    if query is None:
+        return
+
+    callback_answer = _get_callback_answer(query)
+    if text is not None or kwargs:
+        callback_answer.set(text, **kwargs)
+
+    callback_answer.defer(settings.CALLBACK_ANSWER_TIMEOUT if timeout is None else timeout)
+
+
+async def finish_callback_answer(update: 'Update') -> None:
+    """Answer the callback query of the update if it's still unanswered,
+    and forget about it.
+    """
+    query = update.callback_query
+    if query is None:
+        return
+
+    callback_answer = _callback_answers.pop(query.id, None)
+    if callback_answer is None:
+        return
+
+    try:
+        await callback_answer.answer()
+    except TelegramError:
+        LOGGER.exception('Failed to answer the callback query %s', query.id)
+
+
+async def finish_callback_answer_handler(update: object, _context: 'Any') -> None:
+    """Answer the callback query of the update when all other handlers
+    are done with it, if it's still unanswered.
+    """
+    if isinstance(update, Update):
+        await finish_callback_answer(update)
@@ -0,0 +1,220 @@
+"""The module contains the implementation of the compact callback data format.
+
+The callback data of version 1 consists of the fixed-width fields, so it's
+decoded by slicing rather than by parsing:
+
+    +---------+----------------+----------------+-----------------+---------+
+    | version | handler        | caption        | user ID         | payload |
+    | 1 char  | 6 chars        | 6 chars        | 11 chars        | rest    |
+    +---------+----------------+----------------+-----------------+---------+
+
+The version is a character which is not a digit, so that the current
+callback data never starts like the legacy one, which starts with the decimal
+checksum of the handler. The handler and the caption are represented by
+their 32-bit checksums and
+the user ID by a signed 64-bit integer, all encoded with URL-safe base64.
+The header takes 24 of the 64 bytes Telegram allows, leaving the rest
+for a payload. A payload that fits is packed inline after the '=' marker.
+Otherwise, it's put into the payload store under the short hash of its
+content, and the hash is packed after the '#' marker.
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+from hammett.core.exceptions import PayloadIsEmpty
+from hammett.core.handlers import calc_checksum, get_payload_storage
+from hammett.core.payload_store import get_payload_store
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from telegram.ext import CallbackContext
+    from telegram.ext._utils.types import BD, BT, CD, UD
+
+CALLBACK_DATA_VERSION = '~'
+
+MAX_CALLBACK_DATA_LENGTH = 64
+
+_CHECKSUM_LENGTH = 6
+
+_USER_ID_LENGTH = 11
+
+_VERSION_LENGTH = len(CALLBACK_DATA_VERSION)
+
+_HANDLER_END = _VERSION_LENGTH + _CHECKSUM_LENGTH
+
+_CAPTION_END = _HANDLER_END + _CHECKSUM_LENGTH
+
+HEADER_LENGTH = _CAPTION_END + _USER_ID_LENGTH
+
+MAX_PAYLOAD_LENGTH = MAX_CALLBACK_DATA_LENGTH - HEADER_LENGTH
+
+INLINE_PAYLOAD_MARKER = '='
+
+STORED_PAYLOAD_MARKER = '#'
+
+# 9 bytes of the hash are encoded with 12 characters without padding.
+_PAYLOAD_HASH_SIZE = 9
+
+# The header consists of the version and the fields encoded with URL-safe
+# base64, so the legacy callback data, which contains commas, never matches it.
+_HEADER_RE = re.compile(
+    rf'{re.escape(CALLBACK_DATA_VERSION)}[A-Za-z0-9_-]{{{HEADER_LENGTH - _VERSION_LENGTH}}}',
+)
+
+
+class CallbackData(NamedTuple):
+    """The class represents the decoded callback data."""
+
+    handler: str
+    button: str
+    user_id: int
+    payload: str
+
+
+def _encode_int(value: int, length: int) -> str:
+    """Encode the integer using URL-safe base64 without padding.
+
+    Returns
+    -------
+        Encoded integer.
+
+    """
+    return base64.urlsafe_b64encode(value.to_bytes(length, 'big', signed=True)).decode().rstrip('=')
+
+
+def encode_checksum(obj: 'Any') -> str:
+    """Encode the checksum of the handler or the button caption.
+
+    Returns
+    -------
+        Encoded checksum.
+
+    """
+    checksum = int(calc_checksum(obj)).to_bytes(4, 'big')
+    return base64.urlsafe_b64encode(checksum).decode().rstrip('=')
+
+
+def encode_callback_data_header(handler: 'Any', caption: str) -> str:
+    """Encode the part of the callback data which doesn't depend on the user.
+
+    Returns
+    -------
+        Beginning of the callback data.
+
+    """
+    return f'{CALLBACK_DATA_VERSION}{encode_checksum(handler)}{encode_checksum(caption)}'
+
+
+def encode_user_id(user_id: int | None) -> str:
+    """Encode the user ID for the callback data.
+
+    Returns
+    -------
+        Encoded user ID.
+
+    """
+    return _encode_int(user_id or 0, 8)
+
+
+def encode_payload(payload: str, header_length: int = HEADER_LENGTH) -> tuple[str, str | None]:
+    """Encode the payload for the callback data, packing it inline if it fits.
+
+    Returns
+    -------
+        Encoded payload and the key under which the payload must be put into
+        the payload store, or None if the payload is packed inline.
+
+    """
+    inline_payload = f'{INLINE_PAYLOAD_MARKER}{payload}'
+    if header_length + len(inline_payload.encode('utf8')) <= MAX_CALLBACK_DATA_LENGTH:
+        return inline_payload, None
+
+    digest = hashlib.blake2b(payload.encode('utf8'), digest_size=_PAYLOAD_HASH_SIZE).digest()
+    payload_hash = base64.urlsafe_b64encode(digest).decode()
+    return f'{STORED_PAYLOAD_MARKER}{payload_hash}', payload_hash
+
+
+def decode_callback_data(data: str) -> CallbackData | None:
+    """Decode the callback data.
+
+    Returns
+    -------
+        Decoded callback data or None if the data is not of the current version.
+
+    """
+    if not _HEADER_RE.match(data):
+        return None
+
+    try:
+        user_id = base64.urlsafe_b64decode(f'{data[_CAPTION_END:HEADER_LENGTH]}=')
+    except binascii.Error:
+        return None
+
+    return CallbackData(
+        handler=data[_VERSION_LENGTH:_HANDLER_END],
+        button=data[_HANDLER_END:_CAPTION_END],
+        user_id=int.from_bytes(user_id, 'big', signed=True),
+        payload=data[HEADER_LENGTH:],
+    )
+
+
+async def get_payload(
+    data: str,
+    context: 'CallbackContext[BT, UD, CD, BD]',
+    *,
+    keep_legacy: bool = False,
+) -> str:
+    """Return the payload of the button the callback data of which is specified.
+    The payload of a button with the legacy callback data is taken from
+    the payload storage in bot_data and removed from it unless keep_legacy
+    is True.
+
+    Returns
+    -------
+        Payload of the button.
+
+    Raises
+    ------
+        PayloadIsEmpty: If the button has no payload.
+
+    """
+    decoded_data = decode_callback_data(data)
+    try:
+        if decoded_data is None:
+            payload_storage = get_payload_storage(context)
+            return payload_storage[data] if keep_legacy else payload_storage.pop(data)
+
+        marker, value = decoded_data.payload[:1], decoded_data.payload[1:]
+        if marker == INLINE_PAYLOAD_MARKER:
+            return value
+
+    except KeyError as exc:
+        raise PayloadIsEmpty from exc
+
+    payload = None
+    if marker == STORED_PAYLOAD_MARKER:
+        payload = await get_payload_store(context).get(value)
+
+    if payload is None:
+        raise PayloadIsEmpty
+
+    return payload
+
+
+def get_handler_pattern(handler: 'Any') -> str:
+    """Return the pattern matching the callback data of the buttons
+    the handler is the source of. The pattern also matches the legacy
+    callback data, so that the keyboards sent before upgrading still work.
+
+    Returns
+    -------
+        Pattern matching the callback data.
+
+    """
+    header = re.escape(f'{CALLBACK_DATA_VERSION}{encode_checksum(handler)}')
+    return f'^(?:{header}|{calc_checksum(handler)},)'
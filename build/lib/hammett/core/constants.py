@@ -14,6 +14,18 @@ DEFAULT_STATE = cast('State', '0')
 
 EMPTY_KEYBOARD: 'Keyboard' = []
 
+# The group of the handler which answers the callback queries left unanswered
+# by the screens. The group must come after the groups of all other handlers.
+FINISH_CALLBACK_ANSWER_GROUP = 1000
+
+# The group of the handler which sheds the stale updates. The group must come
+# before the groups of all other handlers.
+STALE_UPDATE_FILTER_GROUP = -1000
+
+# The key of user_data under which the language chosen by the user is stored.
+# It takes precedence over the language of the user's Telegram client.
+LANGUAGE_CODE_KEY = 'language_code'
+
 LATEST_SENT_MSG_KEY = 'latest_sent_msg'
 
 
@@ -0,0 +1,240 @@
+"""The module contains the implementation of the preprocessing of the local
+covers, which downscales them to the size Telegram displays, converts them
+to JPEG or WebP and strips their metadata before they are uploaded.
+
+The preprocessing requires Pillow, which is an optional dependency.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from hammett.core.exceptions import ImproperlyConfigured
+from hammett.core.file_id_cache import get_content_hash
+
+if TYPE_CHECKING:
+    from os import PathLike
+    from typing import Any
+
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'WEBP': 'webp',
+}
+
+
+def _process_cover(
+    source: str,
+    destination: str,
+    image_format: str,
+    max_size: int,
+    quality: int,
+) -> None:
+    """Downscale the cover, convert it to the specified format and save it
+    without metadata. The function is run in a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original_image:
+        # Apply the orientation from EXIF, since EXIF is not preserved.
+        image = ImageOps.exif_transpose(original_image)
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        image.info.clear()
+
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG doesn't support transparency, so it's replaced with white.
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+
+    # The cover is written to a temporary file first, so that the other
+    # processes never see a partially written cover.
+    tmp_destination = f'{destination}.{os.getpid()}.tmp'
+    image.save(tmp_destination, format=image_format, quality=quality, optimize=True)
+    Path(tmp_destination).replace(destination)
+
+
+class CoverProcessor:
+    """The class implements the preprocessing of the local covers. The covers
+    are processed in a process pool, so that the event loop is not blocked,
+    and cached on disk by the hash of their content and the preprocessing
+    options.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        cache_dir: 'str | PathLike[str] | None' = None,
+        image_format: str = 'JPEG',
+        max_size: int = 1280,
+        max_workers: int | None = None,
+        quality: int = 85,
+    ) -> None:
+        """Initialize a cover processor object.
+
+        Raises
+        ------
+            ImproperlyConfigured: If Pillow is not installed or the format
+            is not supported.
+
+        """
+        if importlib.util.find_spec('PIL') is None:
+            msg = 'Pillow must be installed to preprocess the covers'
+            raise ImproperlyConfigured(msg)
+
+        image_format = image_format.upper()
+        if image_format not in _EXTENSIONS:
+            formats = ', '.join(_EXTENSIONS)
+            msg = f'FORMAT in the COVER_PREPROCESSING setting must be one of {formats}'
+            raise ImproperlyConfigured(msg)
+
+        self.cache_dir = Path(cache_dir or Path(tempfile.gettempdir()) / 'hammett-covers')
+        self.image_format = image_format
+        self.max_size = max_size
+        self.max_workers = max_workers
+        self.quality = quality
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: dict[Path, asyncio.Future[None]] = {}
+
+    #
+    # Private methods
+    #
+
+    def _get_executor(self: 'Self') -> ProcessPoolExecutor:
+        """Return the process pool, creating it on first use.
+
+        Returns
+        -------
+            Process pool.
+
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        return self._executor
+
+    def _prepare_cache_dir(self: 'Self', path: Path) -> bool:
+        """Create the cache directory if it doesn't exist and check if the
+        processed cover is already there.
+
+        Returns
+        -------
+            Result of checking if the processed cover is cached.
+
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return path.is_file()
+
+    #
+    # Public methods
+    #
+
+    async def process(self: 'Self', path: 'str | PathLike[str]') -> 'str | PathLike[str]':
+        """Return the path to the processed cover, processing it only if
+        it's not cached yet. The same cover requested concurrently is
+        processed once.
+
+        Returns
+        -------
+            Path to the processed cover or the path to the original cover
+            if it can't be processed.
+
+        """
+        try:
+            content_hash = await get_content_hash(path)
+        except OSError:  # a file ID or a missing file
+            return path
+
+        extension = _EXTENSIONS[self.image_format]
+        name = f'{content_hash}-{self.max_size}-{self.quality}.{extension}'
+        processed_path = self.cache_dir / name
+        if self._prepare_cache_dir(processed_path):
+            return processed_path
+
+        pending = self._pending.get(processed_path)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(
+                self._get_executor(),
+                _process_cover,
+                os.fspath(path),
+                os.fspath(processed_path),
+                self.image_format,
+                self.max_size,
+                self.quality,
+            )
+            self._pending[processed_path] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(processed_path, None))
+
+        try:
+            await asyncio.shield(pending)
+        except (OSError, ValueError):
+            LOGGER.warning('Failed to preprocess %s, sending it as is', path, exc_info=True)
+            return path
+
+        return processed_path
+
+    def shutdown(self: 'Self') -> None:
+        """Shut down the process pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _build_cover_processor(conf: 'dict[str, Any]') -> CoverProcessor:
+    """Return the cover processor configured via the specified
+    COVER_PREPROCESSING setting.
+
+    Returns
+    -------
+        Cover processor.
+
+    """
+    return CoverProcessor(
+        cache_dir=conf.get('CACHE_DIR'),
+        image_format=conf.get('FORMAT', 'JPEG'),
+        max_size=conf.get('MAX_SIZE', 1280),
+        max_workers=conf.get('MAX_WORKERS'),
+        quality=conf.get('QUALITY', 85),
+    )
+
+
+def get_cover_processor() -> CoverProcessor:
+    """Return the cover processor configured via the COVER_PREPROCESSING setting.
+
+    Returns
+    -------
+        Cover processor.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('COVER_PREPROCESSING', _build_cover_processor)
+
+
+async def preprocess_cover(path: 'str | PathLike[str]') -> 'str | PathLike[str]':
+    """Return the path to the preprocessed local cover, or the path to
+    the original cover if the preprocessing is disabled via
+    the COVER_PREPROCESSING setting.
+
+    Returns
+    -------
+        Path to the cover to be uploaded.
+
+    """
+    from hammett.conf import settings
+
+    if not settings.COVER_PREPROCESSING.get('ENABLED'):
+        return path
+
+    return await get_cover_processor().process(path)
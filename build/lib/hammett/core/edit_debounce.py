@@ -0,0 +1,135 @@
+"""The module contains the implementation of the debouncer which collapses
+the bursts of edits of the same message (e.g., when a user taps a button
+quickly several times) into the latest one.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from typing import Any
+
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+
+class EditDebouncer:
+    """The class implements the debouncer of the edits of the messages.
+    The first edit of a message is made immediately. The edits following it
+    within the window are not waited for: the latest of them is made by
+    a background task once the window is over, while the rest are dropped.
+    So, the handler making an edit never waits for the window, and the next
+    updates are processed in the meantime.
+    """
+
+    def __init__(self: 'Self', window: float) -> None:
+        """Initialize an edit debouncer object."""
+        self.window = window
+
+        # The messages are ordered by the time they were last edited,
+        # so that the ones edited earlier than the window can be forgotten.
+        self._edited_at: OrderedDict[tuple[int, int], float] = OrderedDict()
+        self._pending: dict[tuple[int, int], Callable[[], Awaitable[None]]] = {}
+        self._timers: dict[tuple[int, int], asyncio.Task[None]] = {}
+
+    #
+    # Private methods
+    #
+
+    async def _edit_later(self: 'Self', key: tuple[int, int], delay: float) -> None:
+        """Make the latest pending edit of the message once the window is over."""
+        await asyncio.sleep(delay)
+
+        del self._timers[key]
+        edit = self._pending.pop(key)
+        self._mark_edited(key)
+        try:
+            await edit()
+        except Exception:
+            LOGGER.exception('Failed to edit message %s in chat %s', key[1], key[0])
+
+    def _forget_old_edits(self: 'Self', now: float) -> None:
+        """Forget the messages edited earlier than the window."""
+        while self._edited_at:
+            key, edited_at = next(iter(self._edited_at.items()))
+            if now - edited_at < self.window:
+                break
+
+            del self._edited_at[key]
+
+    def _mark_edited(self: 'Self', key: tuple[int, int]) -> None:
+        """Remember the time the message was edited."""
+        self._edited_at.pop(key, None)
+        self._edited_at[key] = time.monotonic()
+
+    #
+    # Public methods
+    #
+
+    async def join(self: 'Self') -> None:
+        """Wait until all the pending edits are made."""
+        loop = asyncio.get_running_loop()
+        while timers := [
+            timer for timer in self._timers.values()
+            if not timer.done() and timer.get_loop() is loop
+        ]:
+            await asyncio.gather(*timers, return_exceptions=True)
+
+    async def submit(
+        self: 'Self',
+        chat_id: int,
+        message_id: int,
+        edit: 'Callable[[], Awaitable[None]]',
+    ) -> None:
+        """Make the edit of the message immediately if the message hasn't been
+        edited within the window, or schedule it otherwise, replacing the edit
+        of the same message scheduled earlier.
+        """
+        key = (chat_id, message_id)
+        loop = asyncio.get_running_loop()
+        timer = self._timers.get(key)
+        if timer is not None and not timer.done() and timer.get_loop() is loop:
+            self._pending[key] = edit
+            return
+
+        now = time.monotonic()
+        self._forget_old_edits(now)
+        edited_at = self._edited_at.get(key)
+        if edited_at is None:
+            self._mark_edited(key)
+            await edit()
+            return
+
+        self._pending[key] = edit
+        self._timers[key] = loop.create_task(
+            self._edit_later(key, self.window - (now - edited_at)),
+        )
+
+
+def _build_edit_debouncer(conf: 'dict[str, Any]') -> EditDebouncer:
+    """Return the edit debouncer configured via the specified EDIT_DEBOUNCE setting.
+
+    Returns
+    -------
+        Edit debouncer.
+
+    """
+    return EditDebouncer(conf.get('WINDOW', 0.3))
+
+
+def get_edit_debouncer() -> EditDebouncer:
+    """Return the edit debouncer configured via the EDIT_DEBOUNCE setting.
+
+    Returns
+    -------
+        Edit debouncer.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('EDIT_DEBOUNCE', _build_edit_debouncer)
@@ -11,6 +11,12 @@ class CommandNameIsEmpty(Exception):
     """
 
 
+class DataLoaderResultIsInvalid(Exception):
+    """Raised when the batch load function of a data loader returns
+    a number of values different from the number of keys.
+    """
+
+
 class FailedToGetDataAttributeOfQuery(Exception):
     """Raised when the attempt to get a data attribute of a query fails."""
 
@@ -0,0 +1,385 @@
+"""The module contains the implementation of the caches of the file IDs
+Telegram assigns to the uploaded covers, so that each cover is uploaded
+only once, even across restarts and worker processes.
+
+The cache can be warmed up before starting the bot, by uploading
+the covers to a service chat:
+
+    python -m hammett.core.file_id_cache --chat-id <chat ID> media/*.png
+
+The settings module is taken from the HAMMETT_SETTINGS_MODULE environment
+variable.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import redis.asyncio as redis
+
+from hammett.core.exceptions import ImproperlyConfigured
+from hammett.core.media_cache import _stat, read_media
+from hammett.utils.module_loading import import_string
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from os import PathLike
+
+    from telegram import Bot
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+# The content hashes of the files are remembered until the files
+# are modified, not to read the files on every render.
+_MAX_CONTENT_HASHES = 1000
+
+_content_hashes: 'OrderedDict[tuple[str, int, int], str]' = OrderedDict()
+
+
+class BaseFileIdCache:
+    """The class implements the interface of a file ID cache."""
+
+    def __init__(self: 'Self', **_kwargs: 'Any') -> None:
+        """Initialize a file ID cache object."""
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the file ID cached under the key.
+
+        Returns
+        -------
+            File ID or None if there is no file ID under the key.
+
+        """
+        raise NotImplementedError
+
+    async def set(self: 'Self', key: str, file_id: str) -> None:
+        """Cache the file ID under the key."""
+        raise NotImplementedError
+
+
+class MemoryFileIdCache(BaseFileIdCache):
+    """The class implements the file ID cache which keeps the file IDs
+    in memory, evicting the least recently used ones.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        max_entries: int | None = None,
+        **kwargs: 'Any',
+    ) -> None:
+        """Initialize a memory file ID cache object."""
+        super().__init__(**kwargs)
+
+        self.max_entries = max_entries
+
+        self._file_ids: OrderedDict[str, str] = OrderedDict()
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the file ID cached under the key, marking it as recently used.
+
+        Returns
+        -------
+            File ID or None if there is no file ID under the key.
+
+        """
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            self._file_ids.move_to_end(key)
+
+        return file_id
+
+    async def set(self: 'Self', key: str, file_id: str) -> None:
+        """Cache the file ID under the key, evicting the least recently used
+        file IDs if there are too many of them.
+        """
+        self._file_ids[key] = file_id
+        self._file_ids.move_to_end(key)
+        while self.max_entries is not None and len(self._file_ids) > self.max_entries:
+            self._file_ids.popitem(last=False)
+
+
+class SQLiteFileIdCache(BaseFileIdCache):
+    """The class implements the file ID cache which keeps the file IDs
+    in an SQLite database, so that they survive restarts and are shared
+    by the processes running on the same host.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        path: 'str | PathLike[str] | None' = None,
+        **kwargs: 'Any',
+    ) -> None:
+        """Initialize an SQLite file ID cache object.
+
+        Raises
+        ------
+            ImproperlyConfigured: If the path to the database is not specified.
+
+        """
+        super().__init__(**kwargs)
+
+        if not path:
+            msg = 'PATH is missing in the FILE_ID_CACHE setting'
+            raise ImproperlyConfigured(msg)
+
+        self.path = path
+
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    #
+    # Private methods
+    #
+
+    def _execute(self: 'Self', sql: str, params: tuple[str, ...]) -> list[tuple[str]]:
+        """Execute the statement, connecting to the database if needed.
+
+        Returns
+        -------
+            Fetched rows.
+
+        """
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute(
+                    'CREATE TABLE IF NOT EXISTS file_ids '
+                    '(key TEXT PRIMARY KEY, file_id TEXT NOT NULL)',
+                )
+
+            with self._conn:
+                return self._conn.execute(sql, params).fetchall()
+
+    #
+    # Public methods
+    #
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the file ID cached under the key.
+
+        Returns
+        -------
+            File ID or None if there is no file ID under the key.
+
+        """
+        rows = await asyncio.to_thread(
+            self._execute,
+            'SELECT file_id FROM file_ids WHERE key = ?',
+            (key, ),
+        )
+        return rows[0][0] if rows else None
+
+    async def set(self: 'Self', key: str, file_id: str) -> None:
+        """Cache the file ID under the key."""
+        await asyncio.to_thread(
+            self._execute,
+            'INSERT OR REPLACE INTO file_ids (key, file_id) VALUES (?, ?)',
+            (key, file_id),
+        )
+
+
+class RedisFileIdCache(BaseFileIdCache):
+    """The class implements the file ID cache which keeps the file IDs
+    in Redis, so that they are shared by all the processes of the bot.
+    """
+
+    def __init__(self: 'Self', **kwargs: 'Any') -> None:
+        """Initialize a Redis file ID cache object.
+
+        Raises
+        ------
+            ImproperlyConfigured: If the `DB` setting of `RedisFileIdCache` is empty.
+
+        """
+        from hammett.conf import settings
+
+        super().__init__(**kwargs)
+
+        try:
+            settings.REDIS_FILE_ID_CACHE['DB']
+        except KeyError as exc:
+            msg = f'{exc.args[0]} is missing in the REDIS_FILE_ID_CACHE setting.'
+            raise ImproperlyConfigured(msg) from exc
+
+        self.key_prefix = f'{settings.PAYLOAD_NAMESPACE}:file_id:'
+        self.redis_cli: redis.Redis[Any] = redis.Redis(
+            **{key.lower(): val for key, val in settings.REDIS_FILE_ID_CACHE.items()},
+        )
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the file ID cached under the key.
+
+        Returns
+        -------
+            File ID or None if there is no file ID under the key.
+
+        """
+        file_id = await self.redis_cli.get(f'{self.key_prefix}{key}')
+        if file_id is None:
+            return None
+
+        return file_id.decode('utf8') if isinstance(file_id, bytes) else str(file_id)
+
+    async def set(self: 'Self', key: str, file_id: str) -> None:
+        """Cache the file ID under the key."""
+        await self.redis_cli.set(f'{self.key_prefix}{key}', file_id)
+
+
+def _build_file_id_cache(conf: 'dict[str, Any]') -> BaseFileIdCache:
+    """Return the file ID cache configured via the specified FILE_ID_CACHE setting.
+
+    Returns
+    -------
+        File ID cache.
+
+    """
+    cache_class: type[BaseFileIdCache] = import_string(conf['BACKEND'])
+    return cache_class(
+        max_entries=conf.get('MAX_ENTRIES'),
+        path=conf.get('PATH'),
+    )
+
+
+def get_file_id_cache() -> BaseFileIdCache:
+    """Return the file ID cache configured via the FILE_ID_CACHE setting.
+
+    Returns
+    -------
+        File ID cache.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('FILE_ID_CACHE', _build_file_id_cache)
+
+
+def _resolve(path: 'str | PathLike[str]') -> Path:
+    """Return the absolute path to the file with the symbolic links resolved,
+    so that the same file is always cached under the same key.
+
+    Returns
+    -------
+        Absolute path to the file.
+
+    """
+    return Path(path).resolve()
+
+
+async def get_content_hash(path: 'str | PathLike[str]') -> str:
+    """Return the hash of the content of the local file. The hash is
+    remembered until the file is modified.
+
+    Returns
+    -------
+        Hash of the content of the file.
+
+    """
+    resolved_path = _resolve(path)
+    stat = _stat(resolved_path)
+    stat_key = (str(resolved_path), stat.st_mtime_ns, stat.st_size)
+    try:
+        content_hash = _content_hashes[stat_key]
+    except KeyError:
+        content = await read_media(resolved_path)
+        content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        _content_hashes[stat_key] = content_hash
+        if len(_content_hashes) > _MAX_CONTENT_HASHES:
+            _content_hashes.popitem(last=False)
+
+    return content_hash
+
+
+async def get_media_key(path: 'str | PathLike[str]') -> str:
+    """Return the key of the local file in the file ID cache, which consists
+    of the absolute path to the file and the hash of its content, so that
+    a modified file is uploaded again.
+
+    Returns
+    -------
+        Key of the file.
+
+    """
+    resolved_path = _resolve(path)
+    return f'{resolved_path}:{await get_content_hash(resolved_path)}'
+
+
+async def warm_up_file_id_cache(
+    bot: 'Bot',
+    chat_id: int,
+    paths: 'Iterable[str | PathLike[str]]',
+) -> int:
+    """Upload the covers missing in the file ID cache to the service chat
+    and cache their file IDs. The uploaded messages are deleted right away.
+
+    Returns
+    -------
+        Number of the uploaded covers.
+
+    """
+    from hammett.core.cover_processing import preprocess_cover
+
+    cache = get_file_id_cache()
+    uploaded = 0
+    for path in paths:
+        key = await get_media_key(path)
+        if await cache.get(key) is not None:
+            continue
+
+        content = await read_media(await preprocess_cover(path))
+        message = await bot.send_photo(chat_id, content, disable_notification=True)
+        await cache.set(key, message.photo[-1].file_id)
+        await bot.delete_message(chat_id, message.message_id)
+
+        LOGGER.info('Uploaded %s', path)
+        uploaded += 1
+
+    return uploaded
+
+
+async def _main(chat_id: int | None, paths: list[str]) -> None:
+    """Warm up the file ID cache using the bot specified in the settings.
+
+    Raises
+    ------
+        ImproperlyConfigured: If the service chat is not specified.
+
+    """
+    from telegram import Bot
+
+    from hammett.conf import settings
+
+    chat_id = chat_id or settings.FILE_ID_CACHE.get('WARMUP_CHAT_ID')
+    if not chat_id:
+        msg = 'Specify either --chat-id or WARMUP_CHAT_ID in the FILE_ID_CACHE setting'
+        raise ImproperlyConfigured(msg)
+
+    async with Bot(settings.TOKEN) as bot:
+        uploaded = await warm_up_file_id_cache(bot, chat_id, paths)
+
+    LOGGER.info('Uploaded %d of %d covers', uploaded, len(paths))
+
+
+def main() -> None:
+    """Parse the command line arguments and warm up the file ID cache."""
+    parser = argparse.ArgumentParser(
+        description='Upload the covers to a service chat to cache their file IDs.',
+    )
+    parser.add_argument('paths', nargs='+', help='paths to the covers')
+    parser.add_argument('--chat-id', type=int, help='ID of the service chat')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.chat_id, args.paths))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,11 @@
 """The module contains the implementation of the hider mechanism."""
 
 import asyncio
+import functools
 from typing import TYPE_CHECKING
 
 from hammett.core.exceptions import HiderIsUnregistered
+from hammett.core.loaders import run_once_per_update
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
@@ -80,6 +82,24 @@ class HidersChecker:
     # Private methods
     #
 
+    @staticmethod
+    async def _check(
+        hider_handler: 'Callable[[Any, Any], Any]',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+    ) -> bool:
+        """Run the check of the hider, whether it's a coroutine function or not.
+
+        Returns
+        -------
+            Result of the check.
+
+        """
+        if asyncio.iscoroutinefunction(hider_handler):
+            return bool(await hider_handler(update, context))
+
+        return bool(hider_handler(update, context))
+
     def _register_hiders(self: 'Self') -> None:
         self._registered_hiders = {
             ONLY_FOR_ADMIN: self.is_admin,
@@ -141,7 +161,9 @@ class HidersChecker:
     ) -> bool:
         """Run the checks associated with the registered hiders.
         The hiders are combined into chains using the OR operator, so the method
-        returns True if any of the checks is True.
+        returns True if any of the checks is True. Each check is run only once
+        per update, so the buttons sharing a hider, even if they are created
+        concurrently, share the result of its check.
         The method is invoked under the hood, so you should not run it directly.
 
         Returns
@@ -160,10 +182,12 @@ class HidersChecker:
                 msg = f"The hider '{hider}' is unregistered"
                 raise HiderIsUnregistered(msg) from exc
 
-            if asyncio.iscoroutinefunction(hider_handler):
-                if await hider_handler(update, context):
-                    return True
-            elif hider_handler(update, context):
+            if await run_once_per_update(
+                update,
+                context,
+                (HidersChecker, type(self), hider),
+                functools.partial(self._check, hider_handler, update, context),
+            ):
                 return True
 
         return False
@@ -0,0 +1,242 @@
+"""The module contains the implementation of the filter which sheds
+the stale updates replayed after a restart or an outage.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import ApplicationHandlerStop
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from telegram import CallbackQuery, Message
+    from telegram.ext import CallbackContext
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class IntakeStats:
+    """The class represents the statistics of the intake filter."""
+
+    drained: int = 0
+    processed: int = 0
+    acknowledged_callback_queries: int = 0
+    dropped_callback_queries: int = 0
+    dropped_messages: int = 0
+    collapsed_starts: int = 0
+
+
+class StaleUpdateFilter:
+    """The class implements the filter which runs before all other handlers.
+    The bot starts in the drain mode, which lasts until the first update
+    which is not a part of the backlog, i.e. a message sent after the filter
+    was created or a callback query made on a message sent after that, but
+    no longer than the specified time. While draining, the callback queries
+    made on the messages sent before the filter was created are dropped,
+    since the time to answer them has most likely passed, and the repeated
+    /start commands of the same user are collapsed into the first one.
+    The messages older than the specified age are dropped regardless
+    of the mode.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        answer_stale_callback_queries: bool = True,
+        collapse_starts: bool = True,
+        max_drain_time: float | None = None,
+        max_message_age: float | None = None,
+        started_at: datetime | None = None,
+    ) -> None:
+        """Initialize a stale update filter object."""
+        self.answer_stale_callback_queries = answer_stale_callback_queries
+        self.collapse_starts = collapse_starts
+        self.draining = True
+        self.max_drain_time = max_drain_time
+        self.max_message_age = max_message_age
+        # The dates of the messages are truncated to seconds, so is
+        # the startup time, in order not to mistake fresh messages for stale.
+        self.started_at = (started_at or datetime.now(tz=timezone.utc)).replace(microsecond=0)
+        self.stats = IntakeStats()
+
+        self._started_users: set[int] = set()
+
+    async def __call__(
+        self: 'Self',
+        update: object,
+        _context: 'CallbackContext[Any, Any, Any, Any]',
+    ) -> None:
+        """Check the update and stop processing it if it's stale.
+
+        Raises
+        ------
+            ApplicationHandlerStop: If the update is stale.
+
+        """
+        if not isinstance(update, Update):
+            return
+
+        in_backlog = None
+        if self.draining:
+            in_backlog = self._is_in_backlog(update)
+            if in_backlog is False or self._is_drain_time_over():
+                self._finish_draining()
+
+        if self.draining:
+            self.stats.drained += 1
+        else:
+            self.stats.processed += 1
+
+        if await self._is_stale(update, in_backlog=bool(in_backlog)):
+            raise ApplicationHandlerStop
+
+    #
+    # Private methods
+    #
+
+    def _finish_draining(self: 'Self') -> None:
+        """Leave the drain mode and report what was shed."""
+        self.draining = False
+        self._started_users.clear()
+
+        LOGGER.info(
+            'Drained the backlog of %d updates: %d stale callback queries dropped '
+            '(%d of them acknowledged), %d stale messages dropped, '
+            '%d repeated /start commands collapsed',
+            self.stats.drained,
+            self.stats.dropped_callback_queries,
+            self.stats.acknowledged_callback_queries,
+            self.stats.dropped_messages,
+            self.stats.collapsed_starts,
+        )
+
+    def _is_in_backlog(self: 'Self', update: 'Update') -> bool | None:
+        """Check if the update was sent before the bot started.
+
+        Returns
+        -------
+            Result of checking if the update is a part of the backlog,
+            or None if it can't be told by the update (e.g., it has no date).
+
+        """
+        if update.callback_query is not None:
+            # The callback queries have no date, so they are judged by
+            # the messages they are made on. A query made on a message sent
+            # before the bot started is assumed to be made before too, while
+            # draining. The inaccessible messages are dated 0, so they count.
+            message = update.callback_query.message
+            return None if message is None else message.date < self.started_at
+
+        message = update.effective_message
+        if message is None:
+            return None
+
+        return (message.edit_date or message.date) < self.started_at
+
+    def _is_drain_time_over(self: 'Self') -> bool:
+        """Check if the drain mode has lasted for too long, so that the callback
+        queries made on the old messages after the bot started are not dropped.
+
+        Returns
+        -------
+            Result of checking if the drain mode has lasted for too long.
+
+        """
+        if self.max_drain_time is None:
+            return False
+
+        elapsed = (datetime.now(tz=timezone.utc) - self.started_at).total_seconds()
+        return elapsed > self.max_drain_time
+
+    async def _is_stale(self: 'Self', update: 'Update', *, in_backlog: bool) -> bool:
+        """Check if the update is stale.
+
+        Returns
+        -------
+            Result of checking if the update is stale.
+
+        """
+        if update.callback_query is not None:
+            return in_backlog and await self._is_stale_callback_query(update.callback_query)
+
+        if update.message is not None:
+            return self._is_stale_message(update.message)
+
+        return False
+
+    async def _is_stale_callback_query(self: 'Self', query: 'CallbackQuery') -> bool:
+        """Check if the callback query is stale, acknowledging it if needed.
+
+        Returns
+        -------
+            Result of checking if the callback query is stale.
+
+        """
+        if not self.draining:
+            return False
+
+        self.stats.dropped_callback_queries += 1
+        if self.answer_stale_callback_queries:
+            try:
+                await query.answer()
+            except TelegramError:  # the query is too old to be answered
+                pass
+            else:
+                self.stats.acknowledged_callback_queries += 1
+
+        return True
+
+    def _is_stale_message(self: 'Self', message: 'Message') -> bool:
+        """Check if the message is stale.
+
+        Returns
+        -------
+            Result of checking if the message is stale.
+
+        """
+        if self.max_message_age is not None:
+            age = (datetime.now(tz=timezone.utc) - message.date).total_seconds()
+            if age > self.max_message_age:
+                self.stats.dropped_messages += 1
+                return True
+
+        if (
+            self.draining and
+            self.collapse_starts and
+            message.from_user is not None and
+            message.text is not None and
+            message.text.startswith('/start')
+        ):
+            if message.from_user.id in self._started_users:
+                self.stats.collapsed_starts += 1
+                return True
+
+            self._started_users.add(message.from_user.id)
+
+        return False
+
+
+def build_stale_update_filter() -> StaleUpdateFilter:
+    """Return the stale update filter configured via the STALE_UPDATES setting.
+
+    Returns
+    -------
+        Stale update filter.
+
+    """
+    from hammett.conf import settings
+
+    conf = settings.STALE_UPDATES
+    return StaleUpdateFilter(
+        answer_stale_callback_queries=conf.get('ANSWER_STALE_CALLBACK_QUERIES', True),
+        collapse_starts=conf.get('COLLAPSE_STARTS', True),
+        max_drain_time=conf.get('MAX_DRAIN_TIME'),
+        max_message_age=conf.get('MAX_MESSAGE_AGE'),
+    )
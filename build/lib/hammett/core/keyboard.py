@@ -0,0 +1,145 @@
+"""The module contains the implementation of the compiled keyboard, which is
+the keyboard of a screen that doesn't change between renders (e.g., the one
+cached per language by a cacheable screen).
+"""
+
+import asyncio
+from itertools import starmap
+from typing import TYPE_CHECKING, NamedTuple, cast
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from hammett.core import callback_data
+from hammett.core.button import Button
+from hammett.core.constants import SourceTypes
+from hammett.core.payload_store import get_payload_store
+
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import CallbackContext
+    from telegram.ext._utils.types import BD, BT, CD, UD
+    from typing_extensions import Self
+
+    from hammett.types import Keyboard
+
+# The sources of the buttons which have no callback data.
+_URL_SOURCE_TYPES = (SourceTypes.URL_SOURCE_TYPE, SourceTypes.WEB_APP_SOURCE_TYPE)
+
+
+class _CompiledButton(NamedTuple):
+    """The class represents the parts of an inline button which don't depend
+    on the user. Only one of the inline button and the callback data parts
+    is set, unless the button has hiders, in which case neither is set and
+    the button is created from scratch on every render.
+    """
+
+    button: Button
+    inline_button: InlineKeyboardButton | None = None
+    header: str | None = None
+    encoded_payload: str = ''
+    payload_key: str | None = None
+
+
+# The keyboard is a list, since the renderer accepts lists of rows only.
+class CompiledKeyboard(list[list[Button]]):  # noqa: FURB189
+    """The class implements the keyboard the inline buttons of which are
+    computed once, so that creating its markup boils down to patching
+    the user ID into the callback data. The buttons with hiders are still
+    checked on every render. The keyboard must not be modified after
+    its markup is created for the first time.
+    """
+
+    def __init__(self: 'Self', rows: 'Keyboard') -> None:
+        """Initialize a compiled keyboard object."""
+        super().__init__(rows)
+
+        self._compiled_rows: list[list[_CompiledButton]] | None = None
+
+    async def _compile(
+        self: 'Self',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+    ) -> list[list[_CompiledButton]]:
+        """Compute the parts of the inline buttons which don't depend on the user.
+
+        Returns
+        -------
+            Rows of the compiled buttons.
+
+        """
+        compiled_rows = []
+        for row in self:
+            compiled_row = []
+            for button in row:
+                if button.hiders:
+                    compiled_row.append(_CompiledButton(button))
+                elif button.source_type in _URL_SOURCE_TYPES:
+                    inline_button, _ = await button.create(update, context)
+                    compiled_row.append(_CompiledButton(button, inline_button=inline_button))
+                else:
+                    header, encoded_payload, payload_key = button.get_callback_data_parts()
+                    compiled_row.append(_CompiledButton(
+                        button,
+                        header=header,
+                        encoded_payload=encoded_payload,
+                        payload_key=payload_key,
+                    ))
+
+            compiled_rows.append(compiled_row)
+
+        self._compiled_rows = compiled_rows
+        return compiled_rows
+
+    async def create_markup(
+        self: 'Self',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+    ) -> InlineKeyboardMarkup:
+        """Create the markup of the keyboard for the user.
+
+        Returns
+        -------
+            Markup of the keyboard.
+
+        """
+        compiled_rows = self._compiled_rows or await self._compile(update, context)
+        dynamic_buttons = [
+            compiled.button for row in compiled_rows for compiled in row
+            if compiled.header is None and compiled.inline_button is None
+        ]
+        payloads = {
+            compiled.payload_key: cast('str', compiled.button.payload)
+            for row in compiled_rows for compiled in row if compiled.payload_key is not None
+        }
+        # The hiders and the payload store may query a database, so they
+        # are run concurrently.
+        created_buttons, _ = await asyncio.gather(
+            asyncio.gather(*(button.create(update, context) for button in dynamic_buttons)),
+            asyncio.gather(*starmap(get_payload_store(context).set, payloads.items())),
+        ) if dynamic_buttons or payloads else ([], [])
+        dynamic_inline_buttons = dict(zip(map(id, dynamic_buttons), created_buttons, strict=True))
+
+        user_id = Button._get_user_id(update, context)  # noqa: SLF001
+        encoded_user_id = callback_data.encode_user_id(user_id)
+        keyboard = []
+        for row in compiled_rows:
+            inline_buttons = []
+            for compiled in row:
+                if compiled.inline_button is not None:
+                    inline_buttons.append(compiled.inline_button)
+                elif compiled.header is not None:
+                    if not user_id:
+                        encoded_user_id = callback_data.encode_user_id(compiled.button.chat_id)
+
+                    data = f'{compiled.header}{encoded_user_id}{compiled.encoded_payload}'
+                    inline_buttons.append(
+                        InlineKeyboardButton(compiled.button.caption, callback_data=data),
+                    )
+                else:
+                    inline_button, visible = dynamic_inline_buttons[id(compiled.button)]
+                    if visible:
+                        inline_buttons.append(inline_button)
+
+            keyboard.append(inline_buttons)
+
+        return InlineKeyboardMarkup(keyboard)
@@ -0,0 +1,151 @@
+"""The module contains the implementation of the queue hiding the keyboards
+of the previous messages in the background, so that the user never waits for
+the keyboards to be hidden.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from telegram.error import TelegramError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from typing import Any
+
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+
+class KeyboardHidingQueue:
+    """The class implements the queue of the keyboards waiting to be hidden.
+    The keyboards of each chat are hidden one by one by a worker task of
+    the chat, while the different chats are served concurrently. The repeated
+    hides of the same message are coalesced into one.
+    """
+
+    def __init__(self: 'Self', *, max_pending: int | None = None) -> None:
+        """Initialize a keyboard hiding queue object."""
+        self.max_pending = max_pending
+
+        # The chats are ordered by the time their keyboards were last
+        # scheduled to be hidden, and so are the messages of each chat.
+        self._pending: OrderedDict[int, OrderedDict[int, Callable[[], Awaitable[None]]]] = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._workers: dict[int, asyncio.Task[None]] = {}
+
+    #
+    # Private methods
+    #
+
+    async def _drain(self: 'Self', chat_id: int) -> None:
+        """Hide the keyboards pending in the specified chat until there are
+        no more of them.
+        """
+        try:
+            while chat_id in self._pending:
+                messages = self._pending[chat_id]
+                message_id, hide = messages.popitem(last=False)
+                self._size -= 1
+                if not messages:
+                    del self._pending[chat_id]
+
+                try:
+                    await hide()
+                except TelegramError:
+                    LOGGER.warning(
+                        'Failed to hide the keyboard of message %s in chat %s',
+                        message_id,
+                        chat_id,
+                        exc_info=True,
+                    )
+        finally:
+            if self._workers.get(chat_id) is asyncio.current_task():
+                del self._workers[chat_id]
+
+    def _drop_oldest(self: 'Self') -> None:
+        """Forget the oldest keyboard of the chat whose keyboards were
+        scheduled to be hidden least recently.
+        """
+        chat_id, messages = next(iter(self._pending.items()))
+        message_id, _ = messages.popitem(last=False)
+        self._size -= 1
+        if not messages:
+            del self._pending[chat_id]
+
+        LOGGER.warning(
+            'Too many keyboards are waiting to be hidden, so the keyboard '
+            'of message %s in chat %s is left as is',
+            message_id,
+            chat_id,
+        )
+
+    #
+    # Public methods
+    #
+
+    async def join(self: 'Self') -> None:
+        """Wait until all the pending keyboards are hidden."""
+        loop = asyncio.get_running_loop()
+        while workers := [
+            worker for worker in self._workers.values()
+            if not worker.done() and worker.get_loop() is loop
+        ]:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    @property
+    def pending(self: 'Self') -> int:
+        """Number of the keyboards waiting to be hidden."""
+        return self._size
+
+    def schedule(
+        self: 'Self',
+        chat_id: int,
+        message_id: int,
+        hide: 'Callable[[], Awaitable[None]]',
+    ) -> None:
+        """Schedule hiding the keyboard of the message. If hiding the keyboard
+        of the same message is already pending, it's replaced.
+        """
+        messages = self._pending.setdefault(chat_id, OrderedDict())
+        self._pending.move_to_end(chat_id)
+        if messages.pop(message_id, None) is None:
+            self._size += 1
+
+        messages[message_id] = hide
+        while self.max_pending is not None and self._size > self.max_pending:
+            self._drop_oldest()
+
+        loop = asyncio.get_running_loop()
+        worker = self._workers.get(chat_id)
+        if worker is None or worker.done() or worker.get_loop() is not loop:
+            self._workers[chat_id] = loop.create_task(self._drain(chat_id))
+
+
+def _build_keyboard_hiding_queue(conf: 'dict[str, Any]') -> KeyboardHidingQueue:
+    """Return the keyboard hiding queue configured via the specified
+    KEYBOARD_HIDING setting.
+
+    Returns
+    -------
+        Keyboard hiding queue.
+
+    """
+    return KeyboardHidingQueue(max_pending=conf.get('MAX_PENDING'))
+
+
+def get_keyboard_hiding_queue() -> KeyboardHidingQueue:
+    """Return the keyboard hiding queue configured via the KEYBOARD_HIDING setting.
+
+    Returns
+    -------
+        Keyboard hiding queue.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('KEYBOARD_HIDING', _build_keyboard_hiding_queue)
@@ -0,0 +1,262 @@
+"""The module contains the routines for loading the data the screens need
+while processing an update.
+"""
+
+import asyncio
+from collections.abc import Mapping
+from functools import wraps
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from hammett.core.exceptions import DataLoaderResultIsInvalid
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable, Iterable, Sequence
+    from typing import Any
+
+    from telegram import Update
+    from telegram.ext import CallbackContext
+    from typing_extensions import Self
+
+    _T = TypeVar('_T')
+
+    LoaderAlias = Callable[..., Awaitable[_T]]
+
+_K = TypeVar('_K', bound='Hashable')
+
+_V = TypeVar('_V')
+
+# The memo is stored on the context, which lives as long as the update
+# it was created for is processed.
+_UPDATE_MEMO_ATTR = '_hammett_update_memo'
+
+
+def _get_update_memo(
+    update: 'Update | None',
+    context: 'CallbackContext[Any, Any, Any, Any]',
+) -> 'dict[Any, asyncio.Task[Any]]':
+    """Return the memo of the update, starting a new one if the context
+    was used to process a different update before.
+
+    Returns
+    -------
+        Memo of the update.
+
+    """
+    update_id = update.update_id if update else None
+    try:
+        memo_update_id, memo = getattr(context, _UPDATE_MEMO_ATTR)
+    except AttributeError:
+        pass
+    else:
+        if memo_update_id == update_id:
+            return memo  # type: ignore[no-any-return]
+
+    memo = {}
+    setattr(context, _UPDATE_MEMO_ATTR, (update_id, memo))
+    return memo
+
+
+def run_once_per_update(
+    update: 'Update | None',
+    context: 'CallbackContext[Any, Any, Any, Any]',
+    key: 'Hashable',
+    func: 'Callable[[], Awaitable[_T]]',
+) -> 'asyncio.Future[_T]':
+    """Run the function unless it has already been run under the same key
+    while processing the update. The later calls, even the concurrent ones,
+    get the same future, which is dropped when the update is processed.
+    If the function raises an exception, the result is not memoized.
+
+    Returns
+    -------
+        Future resolved with the result of the function.
+
+    """
+    memo = _get_update_memo(update, context)
+    try:
+        task = memo[key]
+    except KeyError:
+        task = asyncio.ensure_future(func())
+        memo[key] = task
+
+        def forget_failed(task: 'asyncio.Task[Any]') -> None:
+            if task.cancelled() or task.exception() is not None:
+                memo.pop(key, None)
+
+        task.add_done_callback(forget_failed)
+
+    return task
+
+
+def memoize_per_update(func: 'LoaderAlias[_T]') -> 'LoaderAlias[_T]':
+    """Decorate the screen method taking `update` and `context`, so that it's
+    run only once per update for the same arguments. The later calls made
+    while processing the same update, even the concurrent ones, get the same
+    value, which is dropped when the update is processed. If the method raises
+    an exception, the value is not memoized.
+
+    Returns
+    -------
+        Wrapped method.
+
+    """
+
+    @wraps(func)
+    async def wrapper(
+        self: 'Any',
+        update: 'Update | None',
+        context: 'CallbackContext[Any, Any, Any, Any]',
+        *args: 'Any',
+        **kwargs: 'Any',
+    ) -> '_T':
+        return await run_once_per_update(
+            update,
+            context,
+            (func, self, args, frozenset(kwargs.items())),
+            lambda: func(self, update, context, *args, **kwargs),
+        )
+
+    return wrapper
+
+
+class DataLoader(Generic[_K, _V]):
+    """The class implements the loader which collects the keys requested
+    within one iteration of the event loop, including the ones requested by
+    the handlers of the concurrent updates, and loads them with a single call
+    of the batch load function (e.g., `SELECT ... WHERE user_id IN (...)` or
+    Redis `MGET`). The batch load function takes the list of unique keys and
+    returns either the values in the same order or a mapping of the keys to
+    the values, in which case the missing keys get None. The values are not
+    cached between the batches.
+    """
+
+    def __init__(
+        self: 'Self',
+        batch_load: 'Callable[[list[_K]], Awaitable[Sequence[_V] | Mapping[_K, _V]]]',
+        *,
+        max_batch_size: int | None = None,
+    ) -> None:
+        """Initialize a data loader object."""
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+
+        self._batch: dict[_K, asyncio.Future[_V | None]] = {}
+        self._batch_loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    #
+    # Private methods
+    #
+
+    def _dispatch(self: 'Self') -> None:
+        """Start loading the collected keys."""
+        batch, self._batch = self._batch, {}
+        if not batch:
+            return
+
+        keys = list(batch)
+        size = self.max_batch_size or len(keys)
+        for start in range(0, len(keys), size):
+            chunk = {key: batch[key] for key in keys[start:start + size]}
+            task = asyncio.get_running_loop().create_task(self._load_batch(chunk))
+            # Keep a reference to the task, so that it's not garbage collected.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _enqueue(self: 'Self', key: '_K') -> 'asyncio.Future[_V | None]':
+        """Add the key to the current batch, scheduling the dispatch
+        of the batch if the key is the first one.
+
+        Returns
+        -------
+            Future resolved with the value of the key.
+
+        """
+        loop = asyncio.get_running_loop()
+        if self._batch_loop is not loop:
+            self._batch = {}
+            self._batch_loop = loop
+
+        try:
+            future = self._batch[key]
+        except KeyError:
+            if not self._batch:
+                loop.call_soon(self._dispatch)
+
+            future = loop.create_future()
+            self._batch[key] = future
+
+        return future
+
+    def _get_values(
+        self: 'Self',
+        keys: 'list[_K]',
+        result: 'Sequence[_V] | Mapping[_K, _V]',
+    ) -> 'list[_V | None]':
+        """Return the values of the keys from the result of the batch load function.
+
+        Returns
+        -------
+            Values of the keys.
+
+        Raises
+        ------
+            DataLoaderResultIsInvalid: If the number of the values differs
+            from the number of the keys.
+
+        """
+        if isinstance(result, Mapping):
+            return [result.get(key) for key in keys]
+
+        values: list[_V | None] = list(result)
+        if len(values) != len(keys):
+            msg = (
+                f'The batch load function of {self.__class__.__name__} returned '
+                f'{len(values)} values for {len(keys)} keys'
+            )
+            raise DataLoaderResultIsInvalid(msg)
+
+        return values
+
+    async def _load_batch(self: 'Self', batch: 'dict[_K, asyncio.Future[_V | None]]') -> None:
+        """Load the values of the batch and pass them to the waiting callers."""
+        keys = list(batch)
+        try:
+            values = self._get_values(keys, await self.batch_load(keys))
+        except Exception as exc:  # noqa: BLE001
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+
+            return
+
+        for future, value in zip(batch.values(), values, strict=True):
+            if not future.done():
+                future.set_result(value)
+
+    #
+    # Public methods
+    #
+
+    async def load(self: 'Self', key: '_K') -> '_V | None':
+        """Load the value of the key along with the other keys requested
+        within the same iteration of the event loop.
+
+        Returns
+        -------
+            Value of the key.
+
+        """
+        return await asyncio.shield(self._enqueue(key))
+
+    async def load_many(self: 'Self', keys: 'Iterable[_K]') -> 'list[_V | None]':
+        """Load the values of the keys along with the other keys requested
+        within the same iteration of the event loop.
+
+        Returns
+        -------
+            Values of the keys.
+
+        """
+        futures = [self._enqueue(key) for key in keys]
+        return list(await asyncio.gather(*(asyncio.shield(future) for future in futures)))
@@ -0,0 +1,209 @@
+"""The module contains the implementation of the cache of the contents
+of the local media files, so that the files sent repeatedly (e.g., covers)
+are not read from disk on every render.
+"""
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import aiofiles
+
+if TYPE_CHECKING:
+    from os import PathLike
+    from typing import Any
+
+    from typing_extensions import Self
+
+
+def _stat(path: 'str | PathLike[str]') -> os.stat_result:
+    """Return the status of the file. Unlike reading the file, it's cheap
+    enough not to be run in the thread pool.
+
+    Returns
+    -------
+        Status of the file.
+
+    """
+    return Path(path).stat()
+
+
+@dataclass
+class MediaCacheStats:
+    """The class represents the statistics of the media cache."""
+
+    entries: int = 0
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_read: int = 0
+    bytes_served: int = 0
+
+    @property
+    def hit_rate(self: 'Self') -> float:
+        """Share of the reads served from the cache.
+
+        Returns
+        -------
+            Share of the reads served from the cache.
+
+        """
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+
+class _Entry(NamedTuple):
+    """The class represents the contents of a cached file."""
+
+    # The file is considered modified if any of these changes.
+    inode: int
+    mtime: int
+    size: int
+
+    content: bytes
+
+
+class MediaCache:
+    """The class implements the cache which keeps the contents of the local
+    files in memory, evicting the least recently used ones when their total
+    size exceeds the limit. The cached contents are dropped when the inode,
+    the modification time or the size of the file changes. The files larger
+    than max_file_size are read from disk every time.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        max_bytes: int,
+        max_file_size: int | None = None,
+    ) -> None:
+        """Initialize a media cache object."""
+        self.max_bytes = max_bytes
+        self.max_file_size = max_bytes if max_file_size is None else max_file_size
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._stats = MediaCacheStats()
+
+    #
+    # Private methods
+    #
+
+    def _evict(self: 'Self') -> None:
+        """Remove the least recently used contents until the limit is met."""
+        while self._entries and self._stats.size > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._stats.size -= entry.size
+            self._stats.evictions += 1
+
+        self._stats.entries = len(self._entries)
+
+    def _remove(self: 'Self', key: str) -> None:
+        """Remove the contents of the file."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._stats.size -= entry.size
+            self._stats.entries = len(self._entries)
+
+    #
+    # Public methods
+    #
+
+    def clear(self: 'Self') -> None:
+        """Remove all the cached contents."""
+        self._entries.clear()
+        self._stats.entries = 0
+        self._stats.size = 0
+
+    def get_stats(self: 'Self') -> MediaCacheStats:
+        """Return the statistics of the cache.
+
+        Returns
+        -------
+            Statistics of the cache.
+
+        """
+        return MediaCacheStats(**vars(self._stats))
+
+    async def read(self: 'Self', path: 'str | os.PathLike[str]') -> bytes:
+        """Return the contents of the file, reading it from disk only if
+        it's not cached or has been modified since it was cached.
+
+        Returns
+        -------
+            Contents of the file.
+
+        """
+        key = os.fspath(path)
+        stat = _stat(key)
+        entry = self._entries.get(key)
+        if (
+            entry is not None and
+            (entry.inode, entry.mtime, entry.size) == (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        ):
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            self._stats.bytes_served += entry.size
+            return entry.content
+
+        self._remove(key)
+        async with aiofiles.open(key, 'rb') as infile:
+            content = await infile.read()
+
+        self._stats.misses += 1
+        self._stats.bytes_read += len(content)
+        self._stats.bytes_served += len(content)
+        # The size is checked again, since the file may be modified while reading.
+        if len(content) == stat.st_size and stat.st_size <= self.max_file_size:
+            self._entries[key] = _Entry(stat.st_ino, stat.st_mtime_ns, stat.st_size, content)
+            self._stats.size += stat.st_size
+            self._evict()
+
+        return content
+
+
+def _build_media_cache(conf: 'dict[str, Any]') -> MediaCache:
+    """Return the media cache configured via the specified MEDIA_CACHE setting.
+
+    Returns
+    -------
+        Media cache.
+
+    """
+    return MediaCache(
+        max_bytes=conf.get('MAX_BYTES', 0),
+        max_file_size=conf.get('MAX_FILE_SIZE'),
+    )
+
+
+def get_media_cache() -> MediaCache:
+    """Return the media cache configured via the MEDIA_CACHE setting.
+
+    Returns
+    -------
+        Media cache.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('MEDIA_CACHE', _build_media_cache)
+
+
+async def read_media(path: 'str | os.PathLike[str]') -> bytes:
+    """Return the contents of the local media file, using the media cache
+    unless it's disabled via the MEDIA_CACHE setting.
+
+    Returns
+    -------
+        Contents of the file.
+
+    """
+    from hammett.conf import settings
+
+    if not settings.MEDIA_CACHE.get('ENABLED'):
+        async with aiofiles.open(path, 'rb') as infile:
+            return await infile.read()
+
+    return await get_media_cache().read(path)
@@ -0,0 +1,529 @@
+"""The module contains the implementation of the stores for the button
+payloads which are too large to be packed into the callback data.
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import redis.asyncio as redis
+
+from hammett.core.exceptions import ImproperlyConfigured
+from hammett.utils.module_loading import import_string
+
+if TYPE_CHECKING:
+    from telegram.ext import CallbackContext
+    from telegram.ext._utils.types import BD, BT, CD, UD
+    from typing_extensions import Self
+
+    from hammett.types import PayloadStorage
+
+
+@dataclass
+class PayloadStoreStats:
+    """The class represents the statistics of a payload store."""
+
+    entries: int = 0
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class _Entry(NamedTuple):
+    """The class represents a payload stored in memory."""
+
+    value: str
+    size: int
+    expires_at: float
+
+
+class BasePayloadStore:
+    """The class implements the interface of a payload store."""
+
+    def __init__(self: 'Self', *, ttl: float | None = None, **_kwargs: 'Any') -> None:
+        """Initialize a payload store object."""
+        self.ttl = ttl
+
+        self._stats = PayloadStoreStats()
+
+    def bind(self: 'Self', _context: 'CallbackContext[BT, UD, CD, BD]') -> 'Self':
+        """Return the store to be used within the context. The store
+        doesn't depend on the context by default.
+
+        Returns
+        -------
+            Payload store.
+
+        """
+        return self
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the payload stored under the key.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        raise NotImplementedError
+
+    def get_stats(self: 'Self') -> PayloadStoreStats:
+        """Return the statistics of the store.
+
+        Returns
+        -------
+            Statistics of the store.
+
+        """
+        return PayloadStoreStats(**vars(self._stats))
+
+    async def pop(self: 'Self', key: str) -> str | None:
+        """Remove the payload stored under the key and return it.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        raise NotImplementedError
+
+    async def set(self: 'Self', key: str, value: str) -> None:
+        """Store the payload under the key."""
+        raise NotImplementedError
+
+
+class BotDataPayloadStore(BasePayloadStore):
+    """The class implements the payload store which keeps the payloads in
+    the payload storage in bot_data, so that they are saved along with
+    the rest of bot_data by the persistence. Each payload is stored along
+    with the time it was last accessed, so that the payloads expire and
+    are evicted the same way as in MemoryPayloadStore, even after restarts.
+    """
+
+    _KEY_PREFIX = 'payload:'
+
+    def __init__(
+        self: 'Self',
+        *,
+        max_bytes: int | None = None,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        **kwargs: 'Any',
+    ) -> None:
+        """Initialize a bot_data payload store object."""
+        super().__init__(ttl=ttl, **kwargs)
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._counted_storage: PayloadStorage | None = None
+        self._storage: PayloadStorage = {}
+
+    #
+    # Private methods
+    #
+
+    def _count(self: 'Self', storage: 'PayloadStorage') -> None:
+        """Count the payloads in the storage, which may have been loaded
+        by the persistence, when the store is bound to it for the first time.
+        """
+        self._counted_storage = storage
+        self._stats.entries = 0
+        self._stats.size = 0
+        for name, entry in storage.items():
+            if name.startswith(self._KEY_PREFIX):
+                self._stats.entries += 1
+                self._stats.size += self._get_size(name, entry)
+
+    def _evict(self: 'Self') -> None:
+        """Remove the expired payloads from the least recently used end,
+        then the least recently used payloads until the limits are met.
+        """
+        now = time.time()
+        while (name := self._get_least_recently_used()) is not None:
+            if not self._is_expired(self._storage[name], now):
+                break
+
+            self._remove(name)
+            self._stats.expirations += 1
+
+        while (
+            (self.max_entries is not None and self._stats.entries > self.max_entries) or
+            (self.max_bytes is not None and self._stats.size > self.max_bytes)
+        ) and (name := self._get_least_recently_used()) is not None:
+            self._remove(name)
+            self._stats.evictions += 1
+
+    def _get_least_recently_used(self: 'Self') -> str | None:
+        """Return the name of the least recently used payload. The payloads
+        are moved to the end of the storage when they are accessed, while
+        the legacy payloads stored under the callback data are skipped.
+
+        Returns
+        -------
+            Name of the payload or None if there are no payloads.
+
+        """
+        return next((name for name in self._storage if name.startswith(self._KEY_PREFIX)), None)
+
+    def _get_size(self: 'Self', name: str, entry: str) -> int:
+        """Return the size of the payload stored under the name.
+
+        Returns
+        -------
+            Size of the key and the payload in bytes.
+
+        """
+        _, _, value = entry.partition(':')
+        return len(name) - len(self._KEY_PREFIX) + len(value.encode('utf8'))
+
+    def _is_expired(self: 'Self', entry: str, now: float) -> bool:
+        """Check if the payload has not been accessed within the TTL.
+
+        Returns
+        -------
+            Result of checking the payload for expiration.
+
+        """
+        accessed_at, _, _ = entry.partition(':')
+        return self.ttl is not None and float(accessed_at) + self.ttl <= now
+
+    def _put(self: 'Self', name: str, value: str) -> None:
+        """Store the payload under the name at the most recently used end
+        of the storage along with the current time.
+        """
+        entry = f'{int(time.time())}:{value}'
+        self._storage[name] = entry
+        self._stats.entries += 1
+        self._stats.size += self._get_size(name, entry)
+
+    def _remove(self: 'Self', name: str) -> str | None:
+        """Remove the payload stored under the name.
+
+        Returns
+        -------
+            Removed payload or None if there is no payload under the name.
+
+        """
+        entry = self._storage.pop(name, None)
+        if entry is None:
+            return None
+
+        self._stats.entries -= 1
+        self._stats.size -= self._get_size(name, entry)
+        _, _, value = entry.partition(':')
+        return value
+
+    #
+    # Public methods
+    #
+
+    def bind(self: 'Self', context: 'CallbackContext[BT, UD, CD, BD]') -> 'Self':
+        """Return the store which keeps the payloads in the bot_data
+        of the context and shares the statistics with this one.
+
+        Returns
+        -------
+            Payload store.
+
+        """
+        from hammett.core.handlers import get_payload_storage
+
+        storage = get_payload_storage(context)
+        if storage is not self._counted_storage:
+            self._count(storage)
+
+        store = copy.copy(self)
+        store._storage = storage  # noqa: SLF001
+        return store
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the payload stored under the key, marking it as recently used
+        and extending its expiration time.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        name = f'{self._KEY_PREFIX}{key}'
+        entry = self._storage.get(name)
+        if entry is not None and self._is_expired(entry, time.time()):
+            self._remove(name)
+            self._stats.expirations += 1
+            entry = None
+
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        value = self._remove(name) or ''
+        self._put(name, value)
+        self._stats.hits += 1
+        return value
+
+    async def pop(self: 'Self', key: str) -> str | None:
+        """Remove the payload stored under the key and return it.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        value = await self.get(key)
+        self._remove(f'{self._KEY_PREFIX}{key}')
+        return value
+
+    async def set(self: 'Self', key: str, value: str) -> None:
+        """Store the payload under the key, evicting the least recently used
+        payloads if the limits are exceeded. If the same payload is already
+        stored, only its expiration time is extended.
+        """
+        name = f'{self._KEY_PREFIX}{key}'
+        if self._remove(name) != value:
+            self._stats.writes += 1
+
+        self._put(name, value)
+        self._evict()
+
+
+class MemoryPayloadStore(BasePayloadStore):
+    """The class implements the payload store which keeps the payloads in memory,
+    evicting the expired ones and the least recently used ones when the number
+    or the total size of the payloads exceeds the limits.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        max_bytes: int | None = None,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        **kwargs: 'Any',
+    ) -> None:
+        """Initialize a memory payload store object."""
+        super().__init__(ttl=ttl, **kwargs)
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    #
+    # Private methods
+    #
+
+    def _evict(self: 'Self') -> None:
+        """Remove the expired payloads from the least recently used end,
+        then the least recently used payloads until the limits are met.
+        """
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+
+            self._remove(key)
+            self._stats.expirations += 1
+
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries) or
+            (self.max_bytes is not None and self._stats.size > self.max_bytes)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._stats.size -= entry.size
+            self._stats.evictions += 1
+
+        self._stats.entries = len(self._entries)
+
+    def _get_expires_at(self: 'Self') -> float:
+        """Return the time when the payload stored now expires.
+
+        Returns
+        -------
+            Monotonic time when the payload expires.
+
+        """
+        return float('inf') if self.ttl is None else time.monotonic() + self.ttl
+
+    def _remove(self: 'Self', key: str) -> _Entry | None:
+        """Remove the payload stored under the key.
+
+        Returns
+        -------
+            Removed entry or None if there is no payload under the key.
+
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._stats.size -= entry.size
+            self._stats.entries = len(self._entries)
+
+        return entry
+
+    #
+    # Public methods
+    #
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the payload stored under the key, marking it as recently used
+        and extending its expiration time.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self._stats.expirations += 1
+            entry = None
+
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        self._entries[key] = entry._replace(expires_at=self._get_expires_at())
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return entry.value
+
+    async def pop(self: 'Self', key: str) -> str | None:
+        """Remove the payload stored under the key and return it.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        value = await self.get(key)
+        self._remove(key)
+        return value
+
+    async def set(self: 'Self', key: str, value: str) -> None:
+        """Store the payload under the key, evicting the least recently used
+        payloads if the limits are exceeded. If the same payload is already
+        stored, only its expiration time is extended.
+        """
+        entry = self._remove(key)
+        if entry is None or entry.value != value:
+            self._stats.writes += 1
+
+        size = len(key) + len(value.encode('utf8'))
+        self._entries[key] = _Entry(value, size, self._get_expires_at())
+        self._stats.size += size
+        self._evict()
+
+
+class RedisPayloadStore(BasePayloadStore):
+    """The class implements the payload store which keeps each payload in Redis
+    under its own key, letting Redis expire the payloads not accessed within
+    the TTL.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        ttl: float | None = None,
+        **kwargs: 'Any',
+    ) -> None:
+        """Initialize a Redis payload store object.
+
+        Raises
+        ------
+            ImproperlyConfigured: If the `DB` setting of `RedisPayloadStore` is empty.
+
+        """
+        from hammett.conf import settings
+
+        super().__init__(ttl=ttl, **kwargs)
+
+        try:
+            settings.REDIS_PAYLOAD_STORE['DB']
+        except KeyError as exc:
+            msg = f'{exc.args[0]} is missing in the REDIS_PAYLOAD_STORE setting.'
+            raise ImproperlyConfigured(msg) from exc
+
+        self.key_prefix = f'{settings.PAYLOAD_NAMESPACE}:payload:'
+        self.redis_cli: redis.Redis[Any] = redis.Redis(
+            **{key.lower(): val for key, val in settings.REDIS_PAYLOAD_STORE.items()},
+        )
+
+    async def get(self: 'Self', key: str) -> str | None:
+        """Return the payload stored under the key, extending its expiration time.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        name = f'{self.key_prefix}{key}'
+        if self.ttl is None:
+            value = await self.redis_cli.get(name)
+        else:
+            value = await self.redis_cli.getex(name, ex=int(self.ttl))
+
+        if value is None:
+            self._stats.misses += 1
+            return None
+
+        self._stats.hits += 1
+        return value.decode('utf8') if isinstance(value, bytes) else str(value)
+
+    async def pop(self: 'Self', key: str) -> str | None:
+        """Remove the payload stored under the key and return it.
+
+        Returns
+        -------
+            Payload or None if there is no payload under the key.
+
+        """
+        value = await self.redis_cli.getdel(f'{self.key_prefix}{key}')
+        if value is None:
+            self._stats.misses += 1
+            return None
+
+        self._stats.hits += 1
+        return value.decode('utf8') if isinstance(value, bytes) else str(value)
+
+    async def set(self: 'Self', key: str, value: str) -> None:
+        """Store the payload under the key with the expiration time."""
+        ttl = None if self.ttl is None else int(self.ttl)
+        await self.redis_cli.set(f'{self.key_prefix}{key}', value, ex=ttl)
+        self._stats.writes += 1
+
+
+def _build_payload_store(conf: 'dict[str, Any]') -> BasePayloadStore:
+    """Return the payload store configured via the specified PAYLOAD_STORE setting.
+
+    Returns
+    -------
+        Payload store.
+
+    """
+    store_class: type[BasePayloadStore] = import_string(conf['BACKEND'])
+    return store_class(
+        max_bytes=conf.get('MAX_BYTES'),
+        max_entries=conf.get('MAX_ENTRIES'),
+        ttl=conf.get('TTL'),
+    )
+
+
+def get_payload_store(context: 'CallbackContext[BT, UD, CD, BD]') -> BasePayloadStore:
+    """Return the payload store configured via the PAYLOAD_STORE setting
+    to be used within the context.
+
+    Returns
+    -------
+        Payload store.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('PAYLOAD_STORE', _build_payload_store).bind(context)
@@ -1,25 +1,42 @@
 """The module contains the implementation of the screen rendering."""
 
+import asyncio
 import contextlib
+import itertools
+import os
 import re
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, cast
 from uuid import uuid4
 
-import aiofiles
-from telegram import InlineKeyboardMarkup, InputMediaDocument, InputMediaPhoto, PhotoSize
+from telegram import (
+    InlineKeyboardMarkup,
+    InputMediaDocument,
+    InputMediaPhoto,
+    Message,
+    PhotoSize,
+)
 from telegram._utils.defaultvalue import DEFAULT_NONE
-from telegram.constants import ParseMode
+from telegram.constants import MessageLimit, ParseMode
 from telegram.error import BadRequest
 
 from hammett.core.constants import EMPTY_KEYBOARD, FinalRenderConfig
+from hammett.core.cover_processing import preprocess_cover
 from hammett.core.exceptions import ScreenDocumentDataIsEmpty
+from hammett.core.file_id_cache import get_file_id_cache, get_media_key
+from hammett.core.keyboard import CompiledKeyboard
+from hammett.core.send_queue import Priority, get_send_queue
+from hammett.core.uploads import Uploads, is_local_file
+from hammett.utils.chunking import split_message
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import Awaitable, Callable, Hashable, Iterator
     from os import PathLike
     from typing import Any
 
-    from telegram import Message, Update
+    from telegram import Update
     from telegram._utils.types import FileInput
     from telegram.ext import CallbackContext
     from telegram.ext._utils.types import BD, BT, CD, UD
@@ -29,10 +46,30 @@ if TYPE_CHECKING:
     from hammett.types import Document, Keyboard
 
 
+class MessageFingerprint(NamedTuple):
+    """The class represents the fingerprint of a rendered message.
+    The media is None if the message has no media, or an object
+    which is not equal to anything if the media can't be compared.
+    """
+
+    text: int
+    media: 'Hashable'
+    reply_markup: int | None
+
+
+class _RenderedMessage(NamedTuple):
+    """The class represents the fingerprint of a rendered message along
+    with the result of the request which rendered it.
+    """
+
+    fingerprint: MessageFingerprint
+    result: 'Any'
+
+
 class Renderer:
     """The class implements screen rendering."""
 
-    _cached_covers: 'dict[str | PathLike[str], str]' = {}
+    _fingerprints: 'OrderedDict[tuple[int | None, int], _RenderedMessage]' = OrderedDict()
 
     def __init__(self: 'Self', html_parse_mode: 'ParseMode') -> None:
         """Initialize a renderer object."""
@@ -65,7 +102,9 @@ class Renderer:
             msg = f'The document data of {self.__class__.__name__} is empty'
             raise ScreenDocumentDataIsEmpty(msg) from exc
 
-        document_kwargs = document.get('document_kwargs', {})
+        # The document is shared with the config of the screen, so its kwargs
+        # are copied not to keep the caption of the first render.
+        document_kwargs = {**document.get('document_kwargs', {})}
         if not document_kwargs.get('caption'):
             document_kwargs['caption'] = description
 
@@ -97,11 +136,18 @@ class Renderer:
         update: 'Update | None',
         context: 'CallbackContext[BT, UD, CD, BD]',
     ) -> InlineKeyboardMarkup:
+        if isinstance(rows, CompiledKeyboard):
+            return await rows.create_markup(update, context)
+
+        # The buttons are created concurrently, so that the checks of their
+        # hiders, which may query a database, don't wait for each other.
+        created_buttons = iter(await asyncio.gather(*(
+            button.create(update, context) for row in rows for button in row
+        )))
         keyboard = []
         for row in rows:
             buttons = []
-            for button in row:
-                inline_button, visible = await button.create(update, context)
+            for inline_button, visible in itertools.islice(created_buttons, len(row)):
                 if visible:
                     buttons.append(inline_button)
 
@@ -109,12 +155,70 @@ class Renderer:
 
         return InlineKeyboardMarkup(keyboard)
 
+    async def _delete_replaced_message(
+        self: 'Self',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+        latest_message: 'LatestMessage',
+        priority: Priority,
+    ) -> None:
+        """Delete the message replaced with the new ones. The messages which
+        can no longer be deleted by the bot get their keyboards hidden instead,
+        so that only the new messages remain interactive.
+        """
+        chat_id = latest_message['chat_id']
+        message_id = latest_message['message_id']
+        self._remember_fingerprint(chat_id, message_id, None)
+
+        try:
+            await self._send(context.bot.delete_message, {
+                'chat_id': chat_id,
+                'message_id': message_id,
+            }, priority)
+        except BadRequest:
+            await self.hide_keyboard(context, latest_message)
+
+    @staticmethod
+    def _get_caption(config: 'FinalRenderConfig') -> str:
+        """Return the text or the caption of the message.
+
+        Returns
+        -------
+            Text or caption of the message.
+
+        """
+        if config.document:
+            document_kwargs = config.document.get('document_kwargs', {})
+            return document_kwargs.get('caption') or config.description
+
+        return config.description
+
+    @staticmethod
+    async def _get_cover_file_id(cover: 'str | PathLike[str]') -> str | None:
+        """Return the file ID of the local cover uploaded earlier.
+
+        Returns
+        -------
+            File ID of the cover or None if the cover has not been uploaded
+            or is not a local file.
+
+        """
+        try:
+            key = await get_media_key(cover)
+        except OSError:  # a file ID or a missing file
+            return None
+
+        return await get_file_id_cache().get(key)
+
     async def _get_edit_render_method(
         self: 'Self',
         context: 'CallbackContext[BT, UD, CD, BD]',
         config: 'FinalRenderConfig',
+        uploads: 'Uploads',
+        fingerprint: 'MessageFingerprint | None' = None,
     ) -> tuple['Callable[..., Awaitable[Any]] | None', dict[str, 'Any']]:
         """Return the render method and its kwargs for editing a message.
+        If the fingerprint of the message is known, the method edits only
+        the parts of the message which differ, or nothing at all.
 
         Returns
         -------
@@ -126,6 +230,21 @@ class Renderer:
             'message_id': config.message_id,
         }
 
+        rendered_message = self._fingerprints.get((config.chat_id, config.message_id))
+        prev_fingerprint = rendered_message.fingerprint if rendered_message else None
+        if fingerprint is not None and prev_fingerprint is not None:
+            if fingerprint == prev_fingerprint:
+                return None, {}
+
+            if fingerprint.media == prev_fingerprint.media:
+                if fingerprint.text == prev_fingerprint.text:
+                    return context.bot.edit_message_reply_markup, kwargs
+
+                if fingerprint.media is not None:
+                    kwargs['caption'] = self._get_caption(config)
+                    kwargs['parse_mode'] = ParseMode.HTML if self.html_parse_mode else DEFAULT_NONE
+                    return context.bot.edit_message_caption, kwargs
+
         send: Callable[..., Awaitable[Any]] | None = None
         if config.document or config.cover:
             media = config.document or config.cover
@@ -133,6 +252,7 @@ class Renderer:
                 cache_covers=config.cache_covers,
                 description=config.description,
                 media=media,
+                uploads=uploads,
             )
             kwargs.update(media_kwargs)
 
@@ -151,6 +271,7 @@ class Renderer:
         *,
         description: str = '',
         cache_covers: bool = False,
+        uploads: 'Uploads',
     ) -> 'Any':
         """Return the kwargs for edit render method with media.
 
@@ -161,7 +282,10 @@ class Renderer:
         """
         kwargs: Any = {}
         if isinstance(media, dict):
-            kwargs['media'] = self._create_input_media_document(media, description)
+            kwargs['media'] = self._create_input_media_document(
+                await self._prepare_document(media, uploads),
+                description,
+            )
         elif isinstance(media, PhotoSize):
             kwargs['media'] = self._create_input_media_photo(
                 caption=description,
@@ -172,25 +296,77 @@ class Renderer:
                 caption=description,
                 media=str(media) if cache_covers else f'{media}?{uuid4()}',
             )
-        elif media in self._cached_covers:
-            kwargs['media'] = self._create_input_media_photo(
-                caption=description,
-                media=self._cached_covers[media],
-            )
         else:
-            async with aiofiles.open(media, 'rb') as infile:
-                file = await infile.read()
+            file_id = await self._get_cover_file_id(media)
+            if file_id is not None:
+                kwargs['media'] = self._create_input_media_photo(
+                    caption=description,
+                    media=file_id,
+                )
+            else:
                 kwargs['media'] = self._create_input_media_photo(
                     caption=description,
-                    media=file,
+                    media=await uploads.add(await preprocess_cover(media), attach=True),
                 )
 
         return kwargs
 
+    def _get_fingerprint(
+        self: 'Self',
+        config: 'FinalRenderConfig',
+        reply_markup: 'InlineKeyboardMarkup | None',
+    ) -> MessageFingerprint:
+        """Return the fingerprint of the message rendered using the config.
+
+        Returns
+        -------
+            Fingerprint of the message.
+
+        """
+        return MessageFingerprint(
+            text=hash((self._get_caption(config), self.html_parse_mode)),
+            media=self._get_media_fingerprint(config),
+            reply_markup=None if reply_markup is None else hash(reply_markup),
+        )
+
+    def _get_media_fingerprint(self: 'Self', config: 'FinalRenderConfig') -> 'Hashable':
+        """Return the fingerprint of the media of the message. The media is
+        considered the same if it's a file already uploaded to Telegram,
+        a local file which is not modified, or a URL of a cached cover.
+
+        Returns
+        -------
+            Fingerprint of the media.
+
+        """
+        media: Any = config.document['media'] if config.document else config.cover
+        if not media:
+            return None
+
+        kind = 'document' if config.document else 'photo'
+        if isinstance(media, PhotoSize):
+            return kind, media.file_unique_id
+
+        if isinstance(media, str | os.PathLike):
+            if self._is_url(media):
+                if config.cache_covers:
+                    return kind, str(media)
+            else:
+                try:
+                    stat = Path(media).stat()
+                except OSError:
+                    # A file ID or a missing file.
+                    return kind, str(media)
+
+                return kind, str(media), stat.st_mtime_ns, stat.st_size
+
+        return object()
+
     async def _get_new_message_render_method(
         self: 'Self',
         context: 'CallbackContext[BT, UD, CD, BD]',
         config: 'FinalRenderConfig',
+        uploads: 'Uploads',
     ) -> tuple['Callable[..., Awaitable[Any]]', dict[str, 'Any']]:
         """Return the render method and its kwargs for sending a new message.
 
@@ -210,16 +386,18 @@ class Renderer:
             if self._is_url(cover) and config.cache_covers:
                 cover = f'{cover}?{uuid4()}'
             elif config.cache_covers:
-                cover_file_id = self._cached_covers.get(cover)
+                cover_file_id = await self._get_cover_file_id(cover)
                 cover = cover_file_id or cover
 
             kwargs['caption'] = config.description
-            kwargs['photo'] = cover
+            kwargs['photo'] = (
+                await uploads.add(await preprocess_cover(cover)) if is_local_file(cover) else cover
+            )
 
             send = context.bot.send_photo
         elif config.document:
             input_media_document = self._create_input_media_document(
-                config.document,
+                await self._prepare_document(config.document, uploads),
                 config.description,
             )
             kwargs['caption'] = input_media_document.caption
@@ -237,6 +415,26 @@ class Renderer:
 
         return send, kwargs
 
+    @staticmethod
+    def _get_priority(
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+    ) -> Priority:
+        """Return the priority of the request depending on what caused it.
+
+        Returns
+        -------
+            Priority of the request.
+
+        """
+        if update is not None:
+            return Priority.INTERACTIVE
+
+        if context.job is not None:
+            return Priority.JOB
+
+        return Priority.NOTIFICATION
+
     @staticmethod
     def _is_url(cover: 'str | PathLike[str]') -> bool:
         """Check if the cover is specified using either a local path or a URL.
@@ -248,6 +446,211 @@ class Renderer:
         """
         return bool(re.search(r'^https?://', str(cover)))
 
+    @staticmethod
+    async def _prepare_document(document: 'Document', uploads: 'Uploads') -> 'Document':
+        """Replace the path to the local file of the document with the file
+        added to the uploads.
+
+        Returns
+        -------
+            Document ready to be sent.
+
+        """
+        media = document.get('media')
+        if not is_local_file(media):
+            return document
+
+        return {**document, 'media': await uploads.add(media, attach=True)}
+
+    @staticmethod
+    def _replace_split_message(
+        config: 'FinalRenderConfig',
+        remaining_chunks: 'Iterator[str] | None',
+    ) -> tuple['FinalRenderConfig', 'LatestMessage | None']:
+        """Turn the config of the edited message which is split into chunks
+        into the config of the new message replacing it. The chunks following
+        the edited message couldn't be edited along with it, so the message
+        is never split in place.
+
+        Returns
+        -------
+            Config of the new message and the info of the replaced message,
+            or the config as is and None if no message is replaced.
+
+        """
+        if remaining_chunks is None or config.as_new_message:
+            return config, None
+
+        replaced_message: LatestMessage = {
+            'chat_id': cast('int', config.chat_id),
+            'hide_keyboard': True,
+            'message_id': config.message_id,
+        }
+        return replace(config, as_new_message=True), replaced_message
+
+    def _remember_fingerprint(
+        self: 'Self',
+        chat_id: int | None,
+        message_id: int,
+        fingerprint: MessageFingerprint | None,
+        result: 'Any' = None,
+    ) -> None:
+        """Remember the fingerprint of the message and the result of the request
+        which rendered it, forgetting the fingerprints of the least recently
+        rendered messages if there are too many of them. The fingerprint is
+        forgotten if it's None.
+        """
+        from hammett.conf import settings
+
+        key = (chat_id, message_id)
+        self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+
+        self._fingerprints[key] = _RenderedMessage(fingerprint, result)
+        max_messages = settings.RENDER_DIFF.get('MAX_MESSAGES')
+        while max_messages is not None and len(self._fingerprints) > max_messages:
+            self._fingerprints.popitem(last=False)
+
+    async def _remember_rendered_message(
+        self: 'Self',
+        config: 'FinalRenderConfig',
+        send_object: 'Any',
+        fingerprint: MessageFingerprint | None,
+    ) -> None:
+        """Remember the fingerprint of the message which has just been
+        sent or edited, and the file ID of its cover if it's cached.
+        """
+        if not config.as_new_message:
+            self._remember_fingerprint(
+                config.chat_id,
+                config.message_id,
+                fingerprint,
+                send_object,
+            )
+        elif isinstance(send_object, Message):
+            self._remember_fingerprint(
+                send_object.chat_id,
+                send_object.message_id,
+                fingerprint,
+                send_object,
+            )
+
+        if (
+            config.cover
+            and config.cache_covers
+            and isinstance(send_object, Message)
+            and send_object.photo
+            and not self._is_url(config.cover)
+        ):
+            photo_size_object = send_object.photo[-1]
+            with contextlib.suppress(OSError):
+                key = await get_media_key(config.cover)
+                await get_file_id_cache().set(key, photo_size_object.file_id)
+
+    @staticmethod
+    async def _send(
+        send: 'Callable[..., Awaitable[Any]]',
+        kwargs: 'dict[str, Any]',
+        priority: Priority,
+        uploads: 'Uploads | None' = None,
+    ) -> 'Any':
+        """Send the request either directly or through the send queue
+        depending on the SEND_QUEUE setting.
+
+        Returns
+        -------
+            Result of the request.
+
+        """
+        from hammett.conf import settings
+
+        if not settings.SEND_QUEUE.get('ENABLED'):
+            async with uploads.reserve() if uploads else contextlib.nullcontext():
+                return await send(**kwargs)
+
+        return await get_send_queue().send(
+            send,
+            kwargs,
+            chat_id=kwargs['chat_id'],
+            priority=priority,
+            uploads=uploads,
+        )
+
+    async def _send_remaining_chunks(
+        self: 'Self',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+        config: 'FinalRenderConfig',
+        chunks: 'Iterator[str]',
+        reply_markup: 'InlineKeyboardMarkup | None',
+        priority: Priority,
+    ) -> 'Message | None':
+        """Send the chunks of the text following the first one as separate
+        messages, one after another, attaching the keyboard to the last one.
+
+        Returns
+        -------
+            Last sent message.
+
+        """
+        message = None
+        next_chunk = next(chunks, None)
+        while next_chunk is not None:
+            chunk, next_chunk = next_chunk, next(chunks, None)
+            kwargs: Any = {
+                'chat_id': config.chat_id,
+                'parse_mode': ParseMode.HTML if self.html_parse_mode else DEFAULT_NONE,
+                'text': chunk,
+            }
+            if next_chunk is None and reply_markup is not None:
+                kwargs['reply_markup'] = reply_markup
+
+            message = await self._send(context.bot.send_message, kwargs, priority)
+
+        return message
+
+    def _split_caption(
+        self: 'Self',
+        config: 'FinalRenderConfig',
+    ) -> tuple['FinalRenderConfig', 'Iterator[str] | None']:
+        """Split the text or the caption of the message which exceeds
+        the limit Telegram imposes into chunks. The first chunk replaces
+        the text or the caption in the config, while the rest are sent
+        as separate messages.
+
+        Returns
+        -------
+            Config with the first chunk and the iterator over the rest of
+            the chunks, or the config as is and None if the text fits.
+
+        """
+        # The captions of the attachments are set by the attachments themselves.
+        if config.attachments:
+            return config, None
+
+        caption = self._get_caption(config)
+        chunks = split_message(
+            caption,
+            MessageLimit.MAX_TEXT_LENGTH,
+            first_limit=(
+                MessageLimit.CAPTION_LENGTH if config.cover or config.document
+                else MessageLimit.MAX_TEXT_LENGTH
+            ),
+            parse_html=bool(self.html_parse_mode),
+        )
+        first_chunk = next(chunks, caption)
+        next_chunk = next(chunks, None)
+        if next_chunk is None:
+            return config, None
+
+        document = config.document
+        if document and document.get('document_kwargs', {}).get('caption'):
+            document_kwargs = {**document['document_kwargs'], 'caption': first_chunk}
+            document = {**document, 'document_kwargs': document_kwargs}
+
+        config = replace(config, description=first_chunk, document=document)
+        return config, itertools.chain((next_chunk, ), chunks)
+
     #
     # Public methods
     #
@@ -258,18 +661,22 @@ class Renderer:
         latest_message: 'LatestMessage',
     ) -> None:
         """Remove the keyboard from the old message, leaving the cover and
-        description unchanged.
+        description unchanged. The request is sent with the lowest priority,
+        so that it never delays the messages the users are waiting for.
         """
         message_id = latest_message['message_id']
         chat_id = latest_message['chat_id']
+        # The message is about to change, so it must not be mistaken for
+        # the one which has been rendered.
+        self._remember_fingerprint(chat_id, message_id, None)
 
         with contextlib.suppress(BadRequest):
             reply_markup = await self._create_markup_keyboard(EMPTY_KEYBOARD, None, context)
-            await context.bot.edit_message_reply_markup(
-                chat_id=chat_id,
-                message_id=message_id,
-                reply_markup=reply_markup,
-            )
+            await self._send(context.bot.edit_message_reply_markup, {
+                'chat_id': chat_id,
+                'message_id': message_id,
+                'reply_markup': reply_markup,
+            }, Priority.JOB)
 
     async def render(
         self: 'Self',
@@ -286,34 +693,75 @@ class Renderer:
             Rendered object of `Message` type.
 
         """
+        from hammett.conf import settings
+
+        # Unfortunately, it's currently not possible to send a keyboard along
+        # with a group of attachments
+        reply_markup = None
+        if not config.attachments:
+            reply_markup = await self._create_markup_keyboard(config.keyboard, update, context)
+
+        # The texts which are too long are split into several messages,
+        # and the keyboard is attached to the last one.
+        config, remaining_chunks = self._split_caption(config)
+        config, replaced_message = self._replace_split_message(config, remaining_chunks)
+
+        fingerprint = None
+        if settings.RENDER_DIFF.get('ENABLED') and remaining_chunks is None:
+            fingerprint = self._get_fingerprint(config, reply_markup)
+
         send: Callable[..., Awaitable[Any]] | None = None
         method_kwargs: Any = {}
-        if config.as_new_message:
-            send, method_kwargs = await self._get_new_message_render_method(context, config)
-        else:
-            send, method_kwargs = await self._get_edit_render_method(context, config)
-
         message: Message | None = None
-        if send and method_kwargs:
-            # Unfortunately, it's currently not possible to send a keyboard along
-            # with a group of attachments
-            if not config.attachments:
-                method_kwargs['reply_markup'] = await self._create_markup_keyboard(
-                    config.keyboard,
-                    update,
+        priority = self._get_priority(update, context)
+        # The large local files are streamed, so the uploads must be closed
+        # even if nothing is sent.
+        uploads = Uploads()
+        try:
+            if config.as_new_message:
+                send, method_kwargs = await self._get_new_message_render_method(
                     context,
+                    config,
+                    uploads,
                 )
+            else:
+                send, method_kwargs = await self._get_edit_render_method(
+                    context,
+                    config,
+                    uploads,
+                    fingerprint,
+                )
+
+            if send and method_kwargs:
+                if reply_markup is not None and remaining_chunks is None:
+                    method_kwargs['reply_markup'] = reply_markup
+
+                try:
+                    message = await self._send(send, method_kwargs, priority, uploads)
+                except Exception:
+                    # The state of the message is unknown now.
+                    await self._remember_rendered_message(config, None, None)
+                    raise
+
+                await self._remember_rendered_message(config, message, fingerprint)
+            elif not config.as_new_message:
+                # Nothing has changed since the previous render, so the result
+                # of the request which rendered the message is returned again.
+                rendered_message = self._fingerprints[config.chat_id, config.message_id]
+                message = rendered_message.result
+        finally:
+            uploads.close()
+
+        if remaining_chunks is not None:
+            message = await self._send_remaining_chunks(
+                context,
+                config,
+                remaining_chunks,
+                reply_markup,
+                priority,
+            )
 
-            send_object = await send(**method_kwargs)
-
-            message = send_object
-            if (
-                config.cover
-                and config.cache_covers
-                and send_object.photo
-                and not self._is_url(config.cover)
-            ):
-                photo_size_object = send_object.photo[-1]
-                self._cached_covers[config.cover] = photo_size_object.file_id
+        if replaced_message is not None:
+            await self._delete_replaced_message(context, replaced_message, priority)
 
         return message
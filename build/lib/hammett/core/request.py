@@ -0,0 +1,131 @@
+"""The module contains the implementation of the HTTP transport used for
+the outbound Bot API requests.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import httpx
+from telegram.request import HTTPXRequest
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """The class represents the statistics of waiting for a connection
+    from the connection pool.
+    """
+
+    requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def avg_wait(self: 'Self') -> float:
+        """Average time spent waiting for a connection."""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+    def record(self: 'Self', wait: float) -> None:
+        """Take into account the time spent waiting for a connection."""
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class InstrumentedHTTPXRequest(HTTPXRequest):
+    """The class extends the native HTTPXRequest class making it possible
+    to tune the keep-alive connections and measure the time requests spend
+    waiting for a connection from the pool.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = 5.0,
+        **kwargs: 'Any',
+    ) -> None:
+        """Initialize an instrumented request object."""
+        self.pool_stats = PoolStats()
+
+        connection_pool_size = kwargs.get('connection_pool_size', 1)
+        limits = httpx.Limits(
+            max_connections=connection_pool_size,
+            max_keepalive_connections=(
+                connection_pool_size if keepalive_connections is None
+                else keepalive_connections
+            ),
+            keepalive_expiry=keepalive_expiry,
+        )
+
+        httpx_kwargs = kwargs.pop('httpx_kwargs', None) or {}
+        httpx_kwargs.setdefault('event_hooks', {'request': [self._trace_pool_wait]})
+        httpx_kwargs.setdefault('limits', limits)
+
+        # When the transport is passed explicitly, httpx ignores the limits
+        # passed to the client, so they must be passed to the transport instead.
+        socket_options = kwargs.pop('socket_options', None)
+        if socket_options:
+            http1 = kwargs.get('http_version', '1.1') == '1.1'
+            httpx_kwargs.setdefault('transport', httpx.AsyncHTTPTransport(
+                http1=http1,
+                http2=not http1,
+                limits=limits,
+                socket_options=socket_options,
+            ))
+
+        super().__init__(httpx_kwargs=httpx_kwargs, **kwargs)
+
+    async def _trace_pool_wait(self: 'Self', request: httpx.Request) -> None:
+        """Attach the trace extension to the request to measure the time
+        the request spends waiting for a connection from the pool.
+        The first event httpcore emits after the connection is acquired
+        (either establishing a new connection or sending the request headers
+        over the existing one) marks the end of waiting.
+        """
+        started_at: float | None = time.perf_counter()
+
+        async def trace(event_name: str, _info: 'dict[str, Any]') -> None:  # noqa: RUF029
+            nonlocal started_at
+            if started_at is not None:
+                wait = time.perf_counter() - started_at
+                started_at = None
+
+                self.pool_stats.record(wait)
+                LOGGER.debug('Waited %.4fs for a connection (%s)', wait, event_name)
+
+        request.extensions['trace'] = trace
+
+
+def build_request(
+    request_conf: 'dict[str, Any]',
+    read_timeout: float | None = None,
+    request_class: type[InstrumentedHTTPXRequest] = InstrumentedHTTPXRequest,
+) -> InstrumentedHTTPXRequest:
+    """Build a request object based on the specified settings.
+
+    Returns
+    -------
+        Instrumented request object.
+
+    """
+    kwargs: dict[str, Any] = {
+        'connection_pool_size': request_conf.get('CONNECTION_POOL_SIZE', 1),
+        'http_version': request_conf.get('HTTP_VERSION', '1.1'),
+        'keepalive_connections': request_conf.get('KEEPALIVE_CONNECTIONS'),
+        'keepalive_expiry': request_conf.get('KEEPALIVE_EXPIRY', 5.0),
+        'pool_timeout': request_conf.get('POOL_TIMEOUT', 1.0),
+        'socket_options': request_conf.get('SOCKET_OPTIONS'),
+    }
+    if read_timeout is not None:
+        kwargs['read_timeout'] = read_timeout
+
+    return request_class(**kwargs)
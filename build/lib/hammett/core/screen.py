@@ -2,22 +2,35 @@
 (i.e., cover, description and keyboard).
 """
 
+import asyncio
+import functools
 import logging
-from dataclasses import asdict
 from typing import TYPE_CHECKING, cast
 
 from telegram._utils.defaultvalue import DEFAULT_NONE
 
-from hammett.core import handlers
-from hammett.core.constants import DEFAULT_STATE, EMPTY_KEYBOARD, FinalRenderConfig, RenderConfig
+from hammett.core import callback_data
+from hammett.core.constants import (
+    DEFAULT_STATE,
+    EMPTY_KEYBOARD,
+    LANGUAGE_CODE_KEY,
+    RenderConfig,
+)
+from hammett.core.edit_debounce import get_edit_debouncer
 from hammett.core.exceptions import (
     FailedToGetDataAttributeOfQuery,
-    PayloadIsEmpty,
+    ImproperlyConfigured,
     ScreenDescriptionIsEmpty,
 )
+from hammett.core.keyboard import CompiledKeyboard
+from hammett.core.keyboard_hiding import get_keyboard_hiding_queue
 from hammett.core.renderer import Renderer
 from hammett.utils.misc import get_callback_query
-from hammett.utils.render_config import get_latest_message, save_latest_message
+from hammett.utils.render_config import (
+    finalize_render_config,
+    get_latest_message,
+    save_latest_message,
+)
 
 if TYPE_CHECKING:
     from os import PathLike
@@ -30,6 +43,7 @@ if TYPE_CHECKING:
     from telegram.ext._utils.types import BD, BT, CD, UD
     from typing_extensions import Self
 
+    from hammett.core.constants import FinalRenderConfig
     from hammett.types import Document, Keyboard, State
 
 LOGGER = logging.getLogger(__name__)
@@ -39,6 +53,10 @@ class Screen:
     """The class implements the interface of a screen."""
 
     cache_covers: bool = False
+    # Makes the screen run its getters (e.g., get_description or add_default_keyboard)
+    # only once per language and reuse their values on subsequent renders.
+    # Suitable only for the screens whose getters don't depend on the user.
+    cacheable: bool = False
     cover: 'str | PathLike[str]' = ''
     description: str = ''
     document: 'Document | None' = None
@@ -46,6 +64,11 @@ class Screen:
     hide_keyboard: bool = False
     renderer_class = Renderer
 
+    # Maps the name of a getter (e.g., get_description) to the names of
+    # the getters that must finish before it starts. The other getters
+    # are run concurrently.
+    getter_dependencies: 'dict[str, tuple[str, ...]]' = {}
+
     _initialized: bool = False
     _instance: 'Screen | None' = None
 
@@ -57,6 +80,7 @@ class Screen:
                 self.html_parse_mode = settings.HTML_PARSE_MODE
 
             self.renderer = Renderer(self.html_parse_mode)  # type: ignore[arg-type]
+            self._render_cache: dict[str, dict[str, Any]] = {}
 
             self._initialized = True
 
@@ -94,20 +118,45 @@ class Screen:
             ScreenDescriptionIsEmpty: If the `description` attribute of the screen is empty.
 
         """
-        final_config = FinalRenderConfig(**asdict(config)) if config else FinalRenderConfig()
-        final_config.cache_covers = (
-            final_config.cache_covers or await self.get_cache_covers(update, context)
-        )
-        final_config.cover = final_config.cover or await self.get_cover(update, context)
+        final_config = finalize_render_config(config)
         final_config.chat_id = final_config.chat_id or context._chat_id  # noqa: SLF001
-        final_config.hide_keyboard = (
-            final_config.hide_keyboard or await self.get_hide_keyboard(update, context)
-        )
-
-        final_config.description = (
-            final_config.description or await self.get_description(update, context)
-        )
-        final_config.document = final_config.document or await self.get_document(update, context)
+
+        # Maps the getters to the attributes of the config they provide,
+        # skipping the attributes already supplied by the config.
+        getters = {
+            name: attr for name, attr in (
+                ('get_cache_covers', 'cache_covers'),
+                ('get_cover', 'cover'),
+                ('get_hide_keyboard', 'hide_keyboard'),
+                ('get_description', 'description'),
+                ('get_document', 'document'),
+            ) if not getattr(final_config, attr)
+        }
+        if (not config or config.keyboard is None) and not final_config.keyboard:
+            getters['add_default_keyboard'] = 'keyboard'
+
+        if self.cacheable:
+            language = await self.get_language(update, context)
+            cached_values = self._render_cache.setdefault(language, {})
+            missing = tuple(name for name in getters if name not in cached_values)
+            if missing:
+                resolved_values = await self._resolve_getters(update, context, missing)
+                # The keyboard is compiled, so that creating its markup
+                # boils down to patching the user ID into the callback data.
+                if 'add_default_keyboard' in resolved_values:
+                    resolved_values['add_default_keyboard'] = CompiledKeyboard(
+                        resolved_values['add_default_keyboard'],
+                    )
+
+                cached_values.update(resolved_values)
+
+            values = {name: cached_values[name] for name in getters}
+        else:
+            values = await self._resolve_getters(update, context, tuple(getters))
+
+        for name, value in values.items():
+            setattr(final_config, getters[name], value)
+
         if (
             not final_config.description and not final_config.document and
             not final_config.attachments and not final_config.cover
@@ -115,11 +164,6 @@ class Screen:
             msg = f'The description of {self.__class__.__name__} is empty'
             raise ScreenDescriptionIsEmpty(msg)
 
-        if not config or config.keyboard is None:
-            final_config.keyboard = (
-                final_config.keyboard or await self.add_default_keyboard(update, context)
-            )
-
         if not final_config.message_id and update:
             query = await get_callback_query(update)
             if query and query.message:
@@ -127,6 +171,71 @@ class Screen:
 
         return final_config
 
+    async def _resolve_getters(
+        self: 'Self',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+        names: tuple[str, ...],
+    ) -> 'dict[str, Any]':
+        """Run the specified getters concurrently, respecting the dependencies
+        declared in the `getter_dependencies` attribute of the screen. If no more
+        than one of the getters is overridden, they are run one after another,
+        since the default getters only return the attributes of the screen.
+
+        Returns
+        -------
+            Values returned by the getters.
+
+        Raises
+        ------
+            ImproperlyConfigured: If the getter dependencies are circular.
+
+        """
+        overridden = [
+            name for name in names if getattr(type(self), name) is not getattr(Screen, name)
+        ]
+        if len(overridden) < 2:  # noqa: PLR2004
+            return {name: await getattr(self, name)(update, context) for name in names}
+
+        tasks: dict[str, asyncio.Future[Any]] = {}
+
+        async def run_getter(name: str, dependencies: 'list[asyncio.Future[Any]]') -> 'Any':
+            if dependencies:
+                await asyncio.gather(*dependencies)
+
+            return await getattr(self, name)(update, context)
+
+        def schedule(name: str, chain: tuple[str, ...] = ()) -> 'asyncio.Future[Any]':
+            if name in chain:
+                msg = (
+                    f'The getter dependencies of {self.__class__.__name__} '
+                    f'are circular: {" -> ".join((*chain, name))}'
+                )
+                raise ImproperlyConfigured(msg)
+
+            if name not in tasks:
+                dependencies = [
+                    schedule(dependency, (*chain, name))
+                    for dependency in self.getter_dependencies.get(name, ())
+                    if dependency in names
+                ]
+                tasks[name] = asyncio.ensure_future(run_getter(name, dependencies))
+
+            return tasks[name]
+
+        try:
+            for name in names:
+                schedule(name)
+
+            values = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+
+            raise
+
+        return dict(zip(tasks, values, strict=True))
+
     async def _pre_render(
         self: 'Self',
         update: 'Update | None',
@@ -153,7 +262,15 @@ class Screen:
         if config.as_new_message:
             prev_message = get_latest_message(context, message)
             if prev_message and prev_message['hide_keyboard']:
-                await self.renderer.hide_keyboard(context, prev_message)
+                hide = functools.partial(self.renderer.hide_keyboard, context, prev_message)
+                if settings.KEYBOARD_HIDING.get('DEFERRED'):
+                    get_keyboard_hiding_queue().schedule(
+                        prev_message['chat_id'],
+                        prev_message['message_id'],
+                        hide,
+                    )
+                else:
+                    await hide()
 
         if settings.SAVE_LATEST_MESSAGE:
             await save_latest_message(context, config, message)
@@ -165,6 +282,57 @@ class Screen:
                 'set the SAVE_LATEST_MESSAGE setting to True.',
             )
 
+    async def _get_edited_message_key(
+        self: 'Self',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+        config: 'RenderConfig | None',
+    ) -> tuple[int, int] | None:
+        """Return the chat ID and the message ID of the message the screen
+        is rendered into.
+
+        Returns
+        -------
+            Chat ID and message ID of the edited message, or None if
+            the screen is rendered as a new message.
+
+        """
+        if config and config.as_new_message:
+            return None
+
+        chat_id = (config and config.chat_id) or context._chat_id  # noqa: SLF001
+        message_id = config and config.message_id
+        if not message_id and update:
+            query = await get_callback_query(update)
+            if query and query.message:
+                message_id = query.message.message_id
+
+        if not chat_id or not message_id:
+            return None
+
+        return chat_id, message_id
+
+    async def _render_now(
+        self: 'Self',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+        config: 'RenderConfig | None',
+        **kwargs: 'Any',
+    ) -> None:
+        """Render the screen components without debouncing."""
+        final_config = await self._finalize_config(update, context, config)
+
+        # It's necessary for unit tests. So, if you override this method,
+        # don't forget these lines to avoid breaking the tests.
+        from hammett.test import utils as test_utils
+        await test_utils.hook_final_render_config(final_config)
+
+        await self._pre_render(update, context, final_config, **kwargs)
+
+        message = await self.renderer.render(update, context, final_config, **kwargs)
+        if message:
+            await self._post_render(update, context, message, final_config, **kwargs)
+
     #
     # Public methods
     #
@@ -197,6 +365,10 @@ class Screen:
         """
         return self.cache_covers
 
+    def clear_render_cache(self: 'Self') -> None:
+        """Forget the values of the getters cached for the cacheable screen."""
+        self._render_cache.clear()
+
     async def get_config(
         self: 'Self',
         _update: 'Update | None',
@@ -282,6 +454,33 @@ class Screen:
         """
         return self.hide_keyboard
 
+    async def get_language(
+        self: 'Self',
+        update: 'Update | None',
+        context: 'CallbackContext[BT, UD, CD, BD]',
+    ) -> str:
+        """Return the language the screen is rendered in, which is the language
+        chosen by the user and stored in user_data, the language of the user's
+        Telegram client or the LANGUAGE_CODE setting, whichever is known first.
+
+        Returns
+        -------
+            Language the screen is rendered in.
+
+        """
+        from hammett.conf import settings
+
+        user_data = context.user_data
+        if isinstance(user_data, dict) and user_data.get(LANGUAGE_CODE_KEY):
+            return cast('str', user_data[LANGUAGE_CODE_KEY])
+
+        user = update.effective_user if update else None
+        if user and user.language_code:
+            return user.language_code
+
+        language: str = settings.LANGUAGE_CODE
+        return language
+
     @staticmethod
     async def get_payload(
         update: 'Update',
@@ -305,11 +504,7 @@ class Screen:
         if data is None:
             raise FailedToGetDataAttributeOfQuery
 
-        try:
-            payload_storage = handlers.get_payload_storage(context)
-            return payload_storage.pop(data)
-        except KeyError as exc:
-            raise PayloadIsEmpty from exc
+        return await callback_data.get_payload(data, context)
 
     async def render(
         self: 'Self',
@@ -319,19 +514,20 @@ class Screen:
         config: 'RenderConfig | None' = None,
         **kwargs: 'Any',
     ) -> None:
-        """Render the screen components (i.e., cover, description and keyboard)."""
-        final_config = await self._finalize_config(update, context, config)
-
-        # It's necessary for unit tests. So, if you override this method,
-        # don't forget these lines to avoid breaking the tests.
-        from hammett.test import utils as test_utils
-        await test_utils.hook_final_render_config(final_config)
+        """Render the screen components (i.e., cover, description and keyboard).
+        If the EDIT_DEBOUNCE setting is enabled, the edits of the same message
+        made in a burst are collapsed into the latest one.
+        """
+        from hammett.conf import settings
 
-        await self._pre_render(update, context, final_config, **kwargs)
+        if settings.EDIT_DEBOUNCE.get('ENABLED'):
+            key = await self._get_edited_message_key(update, context, config)
+            if key is not None:
+                edit = functools.partial(self._render_now, update, context, config, **kwargs)
+                await get_edit_debouncer().submit(*key, edit)
+                return
 
-        message = await self.renderer.render(update, context, final_config, **kwargs)
-        if message:
-            await self._post_render(update, context, message, final_config, **kwargs)
+        await self._render_now(update, context, config, **kwargs)
 
     async def jump(
         self: 'Self',
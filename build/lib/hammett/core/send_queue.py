@@ -0,0 +1,383 @@
+"""The module contains the implementation of the queue the outbound requests
+of the renderer go through to stay within the Telegram rate limits.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+from telegram.error import RetryAfter
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from typing import Any
+
+    from typing_extensions import Self
+
+    from hammett.core.uploads import Uploads
+
+LOGGER = logging.getLogger(__name__)
+
+_MAX_CHAT_BUCKETS = 10000
+
+
+class Priority(IntEnum):
+    """The class enumerates the priorities of the outbound requests.
+    The lower the value, the sooner the request is sent.
+    """
+
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+    JOB = 2
+
+
+class TokenBucket:
+    """The class implements the token bucket algorithm."""
+
+    def __init__(self: 'Self', rate: float, capacity: float) -> None:
+        """Initialize a token bucket object."""
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self: 'Self', now: float) -> None:
+        """Add the tokens accumulated since the last refill."""
+        elapsed = max(now - self._updated_at, 0.0)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def consume(self: 'Self', now: float) -> None:
+        """Take a token from the bucket."""
+        self._refill(now)
+        self._tokens -= 1
+
+    def get_delay(self: 'Self', now: float) -> float:
+        """Return the time to wait until a token is available.
+
+        Returns
+        -------
+            Time in seconds to wait until a token is available.
+
+        """
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+
+        return (1 - self._tokens) / self.rate
+
+    def is_full(self: 'Self', now: float) -> bool:
+        """Check if the bucket is full.
+
+        Returns
+        -------
+            Result of checking if the bucket is full.
+
+        """
+        self._refill(now)
+        return self._tokens >= self.capacity
+
+
+@dataclass(order=True)
+class _Waiter:
+    """The class represents a request waiting for its turn to be sent."""
+
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: 'asyncio.Future[float]' = field(compare=False)
+
+
+@dataclass
+class SendQueueStats:
+    """The class represents the statistics of the send queue."""
+
+    submitted: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    paused_chats: int = 0
+    pending: dict[Priority, int] = field(default_factory=dict)
+
+
+class SendQueue:
+    """The class implements the queue which enforces the global and per-chat
+    Telegram rate limits, sends the requests in the order of their priorities
+    and pauses only the affected chat when Telegram responds with RetryAfter.
+    """
+
+    def __init__(
+        self: 'Self',
+        *,
+        global_rate: float = 30,
+        global_burst: float = 30,
+        per_chat_rate: float = 1,
+        per_chat_burst: float = 3,
+        group_chat_rate: float = 20 / 60,
+        group_chat_burst: float = 3,
+        max_retries: int = 3,
+    ) -> None:
+        """Initialize a send queue object."""
+        self.group_chat_burst = group_chat_burst
+        self.group_chat_rate = group_chat_rate
+        self.max_retries = max_retries
+        self.per_chat_burst = per_chat_burst
+        self.per_chat_rate = per_chat_rate
+
+        self._chat_buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._global_bucket = TokenBucket(global_rate, global_burst)
+        self._paused_until: dict[int, float] = {}
+        self._seq = itertools.count()
+        self._stats = SendQueueStats()
+        self._waiters: list[_Waiter] = []
+        self._wakeup: asyncio.Event | None = None
+
+    #
+    # Private methods
+    #
+
+    async def _acquire(self: 'Self', chat_id: int, priority: Priority) -> None:
+        """Wait until the request is allowed to be sent."""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            chat_id=chat_id,
+            enqueued_at=time.monotonic(),
+            future=loop.create_future(),
+        )
+        bisect.insort(self._waiters, waiter)
+
+        if (
+            self._dispatcher is None or
+            self._dispatcher.done() or
+            self._dispatcher.get_loop() is not loop
+        ):
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+        elif self._wakeup is not None:
+            self._wakeup.set()
+
+        try:
+            wait = await waiter.future
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+        self._stats.total_wait += wait
+        self._stats.max_wait = max(self._stats.max_wait, wait)
+
+    async def _dispatch(self: 'Self') -> None:
+        """Grant the waiting requests their turn as soon as the limits allow."""
+        while self._waiters:
+            delay = self._grant(time.monotonic())
+            if delay is None:
+                continue
+
+            wakeup = self._wakeup
+            if wakeup is None:
+                break
+
+            wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(wakeup.wait(), delay)
+
+    def _get_chat_bucket(self: 'Self', chat_id: int) -> TokenBucket:
+        """Return the token bucket of the specified chat.
+
+        Returns
+        -------
+            Token bucket of the chat.
+
+        """
+        try:
+            bucket = self._chat_buckets[chat_id]
+        except KeyError:
+            # Negative IDs belong to groups and channels which have stricter limits.
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_chat_rate, self.group_chat_burst)
+            else:
+                bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+
+            self._chat_buckets[chat_id] = bucket
+            if len(self._chat_buckets) > _MAX_CHAT_BUCKETS:
+                self._evict_chat_bucket()
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+
+        return bucket
+
+    def _evict_chat_bucket(self: 'Self') -> None:
+        """Forget the least recently used bucket if it's full, since such
+        a bucket is no different from a new one.
+        """
+        now = time.monotonic()
+        chat_id, bucket = next(iter(self._chat_buckets.items()))
+        if bucket.is_full(now):
+            del self._chat_buckets[chat_id]
+
+    def _grant(self: 'Self', now: float) -> float | None:
+        """Let the waiting request with the highest priority, whose chat
+        is not limited, go.
+
+        Returns
+        -------
+            None if a request was granted its turn, or time in seconds
+            to wait before trying again otherwise.
+
+        """
+        global_delay = self._global_bucket.get_delay(now)
+        delay = float('inf')
+        for waiter in list(self._waiters):
+            if waiter.future.done():  # the waiting coroutine was cancelled
+                self._waiters.remove(waiter)
+                continue
+
+            bucket = self._get_chat_bucket(waiter.chat_id)
+            chat_delay = max(
+                self._paused_until.get(waiter.chat_id, 0.0) - now,
+                bucket.get_delay(now),
+            )
+            if chat_delay > 0:
+                delay = min(delay, chat_delay)
+                continue
+
+            if global_delay > 0:
+                return global_delay
+
+            self._global_bucket.consume(now)
+            bucket.consume(now)
+            self._paused_until.pop(waiter.chat_id, None)
+            self._waiters.remove(waiter)
+            waiter.future.set_result(now - waiter.enqueued_at)
+            return None
+
+        return delay
+
+    #
+    # Public methods
+    #
+
+    def get_stats(self: 'Self') -> SendQueueStats:
+        """Return the statistics of the queue.
+
+        Returns
+        -------
+            Statistics of the queue.
+
+        """
+        now = time.monotonic()
+        pending: dict[Priority, int] = dict.fromkeys(Priority, 0)
+        for waiter in self._waiters:
+            pending[Priority(waiter.priority)] += 1
+
+        return SendQueueStats(
+            submitted=self._stats.submitted,
+            sent=self._stats.sent,
+            retried=self._stats.retried,
+            failed=self._stats.failed,
+            total_wait=self._stats.total_wait,
+            max_wait=self._stats.max_wait,
+            paused_chats=sum(1 for until in self._paused_until.values() if until > now),
+            pending=pending,
+        )
+
+    def pause_chat(self: 'Self', chat_id: int, retry_after: float) -> None:
+        """Stop sending requests to the specified chat for the specified time."""
+        until = time.monotonic() + retry_after
+        self._paused_until[chat_id] = max(self._paused_until.get(chat_id, 0.0), until)
+
+    async def send(
+        self: 'Self',
+        method: 'Callable[..., Awaitable[Any]]',
+        kwargs: 'dict[str, Any]',
+        *,
+        chat_id: int,
+        priority: Priority = Priority.INTERACTIVE,
+        uploads: 'Uploads | None' = None,
+    ) -> 'Any':
+        """Wait for the turn of the request and send it. If Telegram responds
+        with RetryAfter, pause the chat and send the request again. The files
+        of the request are reserved in the upload limiter only once its turn
+        has come, and released while the chat is paused.
+
+        Returns
+        -------
+            Result of the request.
+
+        Raises
+        ------
+            RetryAfter: If Telegram keeps responding with RetryAfter after
+            the maximum number of retries.
+
+        """
+        self._stats.submitted += 1
+        for attempt in itertools.count():
+            await self._acquire(chat_id, priority)
+            try:
+                async with uploads.reserve() if uploads else contextlib.nullcontext():
+                    result = await method(**kwargs)
+            except RetryAfter as exc:
+                LOGGER.warning(
+                    'Flood control exceeded for chat %s. Retry in %s seconds',
+                    chat_id,
+                    exc.retry_after,
+                )
+                self.pause_chat(chat_id, exc.retry_after)
+                if attempt >= self.max_retries:
+                    self._stats.failed += 1
+                    raise
+
+                self._stats.retried += 1
+            except Exception:
+                self._stats.failed += 1
+                raise
+            else:
+                self._stats.sent += 1
+                return result
+
+        return None  # pragma: no cover
+
+
+def _build_send_queue(conf: 'dict[str, Any]') -> SendQueue:
+    """Return the send queue configured via the specified SEND_QUEUE setting.
+
+    Returns
+    -------
+        Send queue.
+
+    """
+    return SendQueue(
+        global_rate=conf.get('GLOBAL_RATE', 30),
+        global_burst=conf.get('GLOBAL_BURST', 30),
+        per_chat_rate=conf.get('PER_CHAT_RATE', 1),
+        per_chat_burst=conf.get('PER_CHAT_BURST', 3),
+        group_chat_rate=conf.get('GROUP_CHAT_RATE', 20 / 60),
+        group_chat_burst=conf.get('GROUP_CHAT_BURST', 3),
+        max_retries=conf.get('MAX_RETRIES', 3),
+    )
+
+
+def get_send_queue() -> SendQueue:
+    """Return the send queue configured via the SEND_QUEUE setting.
+
+    Returns
+    -------
+        Send queue.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('SEND_QUEUE', _build_send_queue)
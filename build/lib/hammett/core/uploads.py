@@ -0,0 +1,211 @@
+"""The module contains the routines for uploading the local files, which
+stream the large files to Telegram instead of reading them into memory
+and limit the number of bytes uploaded concurrently.
+"""
+
+import asyncio
+import contextlib
+import os
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from telegram import InputFile
+
+from hammett.core.media_cache import read_media
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+    from os import PathLike
+    from typing import Any, TypeGuard
+
+    from typing_extensions import Self
+
+
+def _open_large_file(path: Path, threshold: int) -> tuple[IO[bytes], int] | None:
+    """Open the file for reading if it's larger than the threshold.
+
+    Returns
+    -------
+        File handle and the size of the file, or None if the file is smaller.
+
+    """
+    size = path.stat().st_size
+    if size <= threshold:
+        return None
+
+    return path.open('rb'), size
+
+
+class UploadLimiter:
+    """The class implements the semaphore which limits the total size of
+    the files uploaded concurrently. An upload larger than the limit is
+    started once nothing else is being uploaded.
+    """
+
+    def __init__(self: 'Self', max_bytes: int) -> None:
+        """Initialize an upload limiter object."""
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_condition(self: 'Self') -> asyncio.Condition:
+        """Return the condition bound to the running event loop.
+
+        Returns
+        -------
+            Condition bound to the running event loop.
+
+        """
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+
+        return self._condition
+
+    async def acquire(self: 'Self', size: int) -> None:
+        """Wait until the specified number of bytes fits into the limit
+        and reserve them.
+        """
+        if not size:
+            return
+
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(
+                lambda: not self.in_flight or self.in_flight + size <= self.max_bytes,
+            )
+            self.in_flight += size
+
+    async def release(self: 'Self', size: int) -> None:
+        """Release the reserved bytes when the upload is finished."""
+        if not size:
+            return
+
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= size
+            condition.notify_all()
+
+
+class Uploads:
+    """The class collects the local files uploaded by a single request.
+    The files larger than the streaming threshold are passed to the request
+    as open file handles, so that they are streamed by chunks, while
+    the smaller ones are read through the media cache. The total size of
+    the files is reserved in the upload limiter only while the request is
+    being sent, and the file handles are closed once it's done.
+    """
+
+    def __init__(self: 'Self') -> None:
+        """Initialize an uploads object."""
+        from hammett.conf import settings
+
+        self.streaming_threshold: int | None = settings.UPLOADS.get('STREAMING_THRESHOLD')
+        self.size = 0
+
+        self._files: list[IO[bytes]] = []
+
+    async def add(
+        self: 'Self',
+        path: 'str | PathLike[str]',
+        *,
+        attach: bool = False,
+    ) -> 'bytes | InputFile':
+        """Add the local file to the uploads. The attach argument must be True
+        if the file is uploaded as a part of an InputMedia object.
+
+        Returns
+        -------
+            Contents of the file or the object streaming the file.
+
+        """
+        if self.streaming_threshold is not None:
+            large_file = _open_large_file(Path(path), self.streaming_threshold)
+            if large_file is not None:
+                file, size = large_file
+                self._files.append(file)
+                self.size += size
+                return InputFile(
+                    file,
+                    filename=Path(path).name,
+                    attach=attach,
+                    read_file_handle=False,
+                )
+
+        content = await read_media(path)
+        self.size += len(content)
+        return content
+
+    def close(self: 'Self') -> None:
+        """Close the file handles."""
+        for file in self._files:
+            file.close()
+
+        self._files.clear()
+
+    @contextlib.asynccontextmanager
+    async def reserve(self: 'Self') -> 'AsyncGenerator[None, None]':
+        """Reserve the total size of the files in the upload limiter while
+        the request is being sent. The streamed files are rewound, so that
+        they are uploaded in full when the request is sent again.
+
+        Yields
+        ------
+            None once the files fit into the limit.
+
+        """
+        for file in self._files:
+            file.seek(0)
+
+        size = self.size
+        limiter = get_upload_limiter()
+        await limiter.acquire(size)
+        try:
+            yield
+        finally:
+            await limiter.release(size)
+
+
+def _build_upload_limiter(conf: 'dict[str, Any]') -> UploadLimiter:
+    """Return the upload limiter configured via the specified UPLOADS setting.
+
+    Returns
+    -------
+        Upload limiter.
+
+    """
+    return UploadLimiter(conf.get('MAX_BYTES_IN_FLIGHT', 0))
+
+
+def get_upload_limiter() -> UploadLimiter:
+    """Return the upload limiter configured via the UPLOADS setting.
+
+    Returns
+    -------
+        Upload limiter.
+
+    """
+    from hammett.conf.configured import get_configured_object
+
+    return get_configured_object('UPLOADS', _build_upload_limiter)
+
+
+def is_local_file(media: 'Any') -> 'TypeGuard[str | PathLike[str]]':
+    """Check if the media is a path to a local file.
+
+    Returns
+    -------
+        Result of checking if the media is a path to a local file.
+
+    """
+    if not isinstance(media, str | os.PathLike):
+        return False
+
+    try:
+        return Path(media).is_file()
+    except (OSError, ValueError):  # e.g., a file ID which is too long to be a path
+        return False
@@ -0,0 +1,343 @@
+"""The module contains the implementation of the webhook mode in which
+the answer to a callback query is returned inline in the response to
+the webhook request, saving a full round trip to the Bot API.
+"""
+
+# See https://core.telegram.org/bots/api#making-requests-when-getting-updates
+
+import asyncio
+import contextlib
+import json
+import logging
+import ssl
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import tornado.web
+from telegram._utils.defaultvalue import DefaultValue
+from telegram.error import TelegramError
+from telegram.ext import Updater
+from telegram.ext._utils.webhookhandler import TelegramHandler, WebhookAppClass, WebhookServer
+
+from hammett.core.request import InstrumentedHTTPXRequest
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from socket import socket
+    from typing import Any
+
+    from telegram import Bot
+    from telegram._utils.types import ODVInput
+    from telegram.ext import Application
+    from telegram.request import RequestData
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+# Only the methods the result of which is not used can be piggybacked,
+# since it's not possible to know the result of such a request.
+_PIGGYBACKED_METHODS = ('answerCallbackQuery', )
+
+_PIGGYBACKED_RESULT = json.dumps({'ok': True, 'result': True}).encode()
+
+_pending_replies: 'dict[str, asyncio.Future[dict[str, Any]]]' = {}
+
+
+def _read_cert(cert: 'str | Path | None') -> bytes | None:
+    """Read the certificate to be passed to the Bot API along with the webhook.
+
+    Returns
+    -------
+        Contents of the certificate or None if there is no certificate.
+
+    """
+    return Path(cert).read_bytes() if cert else None
+
+
+def expect_reply(callback_query_id: str) -> 'asyncio.Future[dict[str, Any]]':
+    """Register the callback query, the answer to which is to be returned
+    inline in the response to the webhook request.
+
+    Returns
+    -------
+        Future resolved with the method to be returned in the response.
+
+    """
+    future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+    _pending_replies[callback_query_id] = future
+    return future
+
+
+def forget_reply(callback_query_id: str) -> None:
+    """Stop waiting for the answer to the callback query, so that the answer
+    is sent as a separate request.
+    """
+    future = _pending_replies.pop(callback_query_id, None)
+    if future is not None and not future.done():
+        future.cancel()
+
+
+def take_reply(method: str, parameters: 'dict[str, Any]') -> bool:
+    """Pass the method call to the pending webhook response if there is one
+    waiting for it.
+
+    Returns
+    -------
+        True if the method call is passed to the webhook response, or False otherwise.
+
+    """
+    if method not in _PIGGYBACKED_METHODS:
+        return False
+
+    future = _pending_replies.pop(str(parameters.get('callback_query_id')), None)
+    if future is None or future.done():
+        return False
+
+    future.set_result({'method': method, **parameters})
+    return True
+
+
+class WebhookReplyRequest(InstrumentedHTTPXRequest):
+    """The class implements the request which, instead of sending the answers
+    to callback queries, passes them to the pending webhook responses.
+    """
+
+    async def do_request(
+        self: 'Self',
+        url: str,
+        method: str,
+        request_data: 'RequestData | None' = None,
+        read_timeout: 'ODVInput[float]' = InstrumentedHTTPXRequest.DEFAULT_NONE,
+        write_timeout: 'ODVInput[float]' = InstrumentedHTTPXRequest.DEFAULT_NONE,
+        connect_timeout: 'ODVInput[float]' = InstrumentedHTTPXRequest.DEFAULT_NONE,
+        pool_timeout: 'ODVInput[float]' = InstrumentedHTTPXRequest.DEFAULT_NONE,
+    ) -> tuple[int, bytes]:
+        """Pass the answer to a callback query to the pending webhook response
+        or send the request to the Bot API otherwise.
+
+        Returns
+        -------
+            Status code and body of the response.
+
+        """
+        api_method = url.rsplit('/', 1)[-1]
+        if (
+            request_data is not None and
+            not request_data.contains_files and
+            take_reply(api_method, request_data.parameters)
+        ):
+            return 200, _PIGGYBACKED_RESULT
+
+        return await super().do_request(
+            url,
+            method,
+            request_data,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        )
+
+
+class WebhookReplyHandler(TelegramHandler):
+    """The class implements the webhook handler which waits for the answer
+    to the callback query for a short time and returns it in the response.
+    """
+
+    def initialize(
+        self: 'Self',
+        bot: 'Any',
+        update_queue: 'asyncio.Queue[object]',
+        secret_token: str,
+        reply_timeout: float = 0.5,
+    ) -> None:
+        """Initialize the handler for each request."""
+        super().initialize(bot, update_queue, secret_token)
+        self.reply_timeout = reply_timeout
+
+    async def post(self: 'Self') -> None:
+        """Put the update to the update queue and wait for the answer
+        to the callback query, if the update contains one.
+        """
+        reply = None
+        callback_query_id = None
+        with contextlib.suppress(KeyError, TypeError, ValueError):
+            data = json.loads(self.request.body)
+            callback_query_id = str(data['callback_query']['id'])
+            reply = expect_reply(callback_query_id)
+
+        try:
+            await super().post()
+        except Exception:
+            if callback_query_id is not None:
+                forget_reply(callback_query_id)
+
+            raise
+
+        if reply is None or callback_query_id is None:
+            return
+
+        try:
+            method = await asyncio.wait_for(asyncio.shield(reply), self.reply_timeout)
+        except asyncio.TimeoutError:
+            forget_reply(callback_query_id)
+            LOGGER.debug(
+                'The callback query %s was not answered in time, so the answer '
+                'will be sent as a separate request',
+                callback_query_id,
+            )
+        else:
+            self.write(json.dumps(method))
+
+
+class WebhookReplyAppClass(WebhookAppClass):
+    """The class implements the web application of the webhook server which
+    handles the webhook requests using WebhookReplyHandler.
+    """
+
+    def __init__(
+        self: 'Self',
+        webhook_path: str,
+        bot: 'Any',
+        update_queue: 'asyncio.Queue[object]',
+        secret_token: str | None = None,
+        *,
+        reply_timeout: float = 0.5,
+    ) -> None:
+        """Initialize a web application object."""
+        # The constructor of the parent class is bypassed, since it routes
+        # the requests to TelegramHandler.
+        self.shared_objects = {
+            'bot': bot,
+            'update_queue': update_queue,
+            'secret_token': secret_token,
+            'reply_timeout': reply_timeout,
+        }
+        tornado.web.Application.__init__(self, [
+            (rf'{webhook_path}/?', WebhookReplyHandler, self.shared_objects),
+        ])
+
+
+class WebhookReplyUpdater(Updater):
+    """The class implements the updater which runs the webhook server
+    the web application of which is WebhookReplyAppClass.
+    """
+
+    def __init__(
+        self: 'Self',
+        bot: 'Bot',
+        update_queue: 'asyncio.Queue[object]',
+        *,
+        reply_timeout: float = 0.5,
+    ) -> None:
+        """Initialize an updater object."""
+        super().__init__(bot, update_queue)
+        self.reply_timeout = reply_timeout
+
+    #
+    # Private methods
+    #
+
+    @staticmethod
+    def _create_ssl_context(
+        cert: 'str | Path | None',
+        key: 'str | Path | None',
+    ) -> ssl.SSLContext | None:
+        """Create the SSL context of the webhook server. The certificate is
+        used only along with the key, since otherwise the server may not be
+        in charge of the SSL handshake, e.g. behind a reverse proxy.
+
+        Returns
+        -------
+            SSL context or None if the certificate or the key is missing.
+
+        Raises
+        ------
+            TelegramError: If the private key does not match the certificate.
+
+        """
+        if cert is None or key is None:
+            return None
+
+        try:
+            ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_ctx.load_cert_chain(cert, key)
+        except ssl.SSLError as exc:
+            msg = 'Invalid SSL Certificate'
+            raise TelegramError(msg) from exc
+
+        return ssl_ctx
+
+    async def _start_webhook(  # noqa: PLR0913, PLR0917
+        self: 'Self',
+        listen: str,
+        port: int,
+        url_path: str,
+        bootstrap_retries: int,
+        allowed_updates: 'Sequence[str] | None',
+        cert: 'str | Path | None' = None,
+        key: 'str | Path | None' = None,
+        drop_pending_updates: bool | None = None,  # noqa: FBT001
+        webhook_url: str | None = None,
+        ready: asyncio.Event | None = None,
+        ip_address: str | None = None,
+        max_connections: int = 40,
+        secret_token: str | None = None,
+        unix: 'str | Path | socket | None' = None,
+    ) -> None:
+        """Start the webhook server the same way as the parent class does,
+        but with WebhookReplyAppClass as its web application.
+        """
+        if not url_path.startswith('/'):
+            url_path = f'/{url_path}'
+
+        app = WebhookReplyAppClass(
+            url_path,
+            self.bot,
+            self.update_queue,
+            secret_token,
+            reply_timeout=self.reply_timeout,
+        )
+        ssl_ctx = self._create_ssl_context(cert, key)
+        self._httpd = WebhookServer(listen, port, app, ssl_ctx, unix)
+
+        if not webhook_url:
+            webhook_url = self._gen_webhook_url(
+                protocol='https' if ssl_ctx else 'http',
+                listen=DefaultValue.get_value(listen),
+                port=port,
+                url_path=url_path,
+            )
+
+        await self._bootstrap(
+            cert=_read_cert(cert),
+            max_retries=bootstrap_retries,
+            drop_pending_updates=drop_pending_updates,
+            webhook_url=webhook_url,
+            allowed_updates=allowed_updates,
+            ip_address=ip_address,
+            max_connections=max_connections,
+            secret_token=secret_token,
+        )
+
+        await self._httpd.serve_forever(ready=ready)
+
+
+def run_webhook_with_replies(
+    application: 'Application[Any, Any, Any, Any, Any, Any]',
+    *,
+    reply_timeout: float = 0.5,
+    **kwargs: 'Any',
+) -> None:
+    """Run the webhook server which returns the answers to callback queries
+    inline in the responses to the webhook requests. The server is run by
+    Application.run_webhook, which the rest of the arguments are passed to,
+    so the secret token, the certificate, the stop signals, etc. are handled
+    the same way as in the regular webhook mode.
+    """
+    application.updater = WebhookReplyUpdater(
+        application.bot,
+        application.update_queue,
+        reply_timeout=reply_timeout,
+    )
+    application.run_webhook(**kwargs)
@@ -1,13 +1,86 @@
-"""The module contains functions for working with dynamic descriptions."""
+"""The module contains functions for working with dynamic descriptions.
+
+The templates are compiled once and kept in a bounded cache, so rendering
+the same description again costs only the rendering itself.
+"""
 
 import html
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 from jinja2 import BaseLoader, Environment
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any
 
+    from jinja2 import Template
+
+# The markers of the Jinja2 syntax. The strings without them are not
+# worth precompiling.
+_TEMPLATE_MARKERS = ('{{', '{%', '{#')
+
+_environment = Environment(loader=BaseLoader())  # noqa: S701
+
+_async_environment = Environment(loader=BaseLoader(), enable_async=True)  # noqa: S701
+
+# The templates are keyed by their sources, so a hit costs a single
+# hash lookup of the source, which Python caches in the string.
+_templates: 'OrderedDict[tuple[str, bool], Template]' = OrderedDict()
+
+
+def _get_template(template: str, *, enable_async: bool = False) -> 'Template':
+    """Return the compiled template, compiling it only if it's not cached.
+    The least recently used templates are evicted when there are more of them
+    than the TEMPLATE_CACHE setting allows.
+
+    Returns
+    -------
+        Compiled template.
+
+    """
+    key = (template, enable_async)
+    try:
+        compiled_template = _templates[key]
+    except KeyError:
+        from hammett.conf import settings
+
+        environment = _async_environment if enable_async else _environment
+        compiled_template = environment.from_string(html.unescape(template))
+        _templates[key] = compiled_template
+        max_entries = settings.TEMPLATE_CACHE.get('MAX_ENTRIES')
+        while max_entries is not None and len(_templates) > max_entries:
+            _templates.popitem(last=False)
+    else:
+        _templates.move_to_end(key)
+
+    return compiled_template
+
+
+def clear_template_cache() -> None:
+    """Remove all the compiled templates from the cache."""
+    _templates.clear()
+
+
+def precompile_templates(templates: 'Iterable[str]', *, enable_async: bool = False) -> int:
+    """Compile the templates in advance, so that their first renders are not
+    slowed down by compiling. The strings without the Jinja2 syntax are skipped.
+    The enable_async argument must be True if the templates are rendered
+    using render_template_from_string_async.
+
+    Returns
+    -------
+        Number of the compiled templates.
+
+    """
+    compiled = 0
+    for template in templates:
+        if isinstance(template, str) and any(marker in template for marker in _TEMPLATE_MARKERS):
+            _get_template(template, enable_async=enable_async)
+            compiled += 1
+
+    return compiled
+
 
 def render_template_from_string(template: str, context: dict[str, 'Any'] | None = None) -> str:
     """Return a description after formatting it using passed data.
@@ -17,10 +90,21 @@ def render_template_from_string(template: str, context: dict[str, 'Any'] | None
         Formatted description with passed data.
 
     """
-    return Environment(  # noqa: S701
-        loader=BaseLoader(),
-    ).from_string(
-        html.unescape(template),
-    ).render(
-        **({} if context is None else context),
-    )
+    return _get_template(template).render(**({} if context is None else context))
+
+
+async def render_template_from_string_async(
+    template: str,
+    context: dict[str, 'Any'] | None = None,
+) -> str:
+    """Return a description after formatting it using passed data.
+    Unlike render_template_from_string, the context may contain awaitables
+    and async generators.
+
+    Returns
+    -------
+        Formatted description with passed data.
+
+    """
+    compiled_template = _get_template(template, enable_async=True)
+    return await compiled_template.render_async(**({} if context is None else context))
@@ -32,7 +32,6 @@ import asyncio
 import difflib
 import pprint
 import unittest
-from dataclasses import asdict
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 from unittest.util import _common_shorten_repr
@@ -45,6 +44,7 @@ from telegram.ext import Application, ApplicationBuilder, CallbackContext
 
 from hammett.conf import settings
 from hammett.core.constants import FinalRenderConfig, RenderConfig
+from hammett.utils.render_config import finalize_render_config
 
 if TYPE_CHECKING:
     from telegram._utils.types import JSONDict, ODVInput
@@ -203,7 +203,7 @@ class BaseTestCase(unittest.TestCase):
             if config.keyboard is None:
                 config.keyboard = []
 
-            config = FinalRenderConfig(**asdict(config))
+            config = finalize_render_config(config)
 
         config.chat_id = self.chat.id
         return config
@@ -0,0 +1,199 @@
+"""The module contains the routines for splitting the texts which are too long
+to be sent in a single message into chunks. The texts are split on the safest
+boundaries available (i.e., paragraphs, lines, words), and the HTML tags open
+at a boundary are closed at the end of the chunk and reopened at the beginning
+of the next one, so that each chunk is valid HTML on its own.
+"""
+
+import html
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_HTML_TOKEN_RE = re.compile(r'<[^<>]*>|&#?\w+;|\n|[^\S\n]+|[^<&\s]+|[<&]')
+
+_TEXT_TOKEN_RE = re.compile(r'\n|[^\S\n]+|\S+')
+
+_TAG_RE = re.compile(r'<(/?)([a-zA-Z][\w-]*)')
+
+# The priorities of breaking a text after a token.
+_NO_BREAK = 0
+
+_WORD_BREAK = 1
+
+_LINE_BREAK = 2
+
+_PARAGRAPH_BREAK = 3
+
+
+class _Token(NamedTuple):
+    """The class represents a token of the text being split."""
+
+    text: str
+    # Telegram limits the length of a text after parsing the entities,
+    # in UTF-16 code units.
+    length: int
+    # The name of the HTML tag, or None if the token is not a tag.
+    tag: str | None = None
+    closing: bool = False
+    break_priority: int = _NO_BREAK
+
+
+def _get_length(text: str) -> int:
+    """Return the length of the text in UTF-16 code units.
+
+    Returns
+    -------
+        Length of the text.
+
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _tokenize(text: str, max_token_length: int, *, parse_html: bool) -> 'Iterator[_Token]':
+    """Split the text into the tags, the entities and the pieces of text
+    no longer than max_token_length.
+
+    Yields
+    ------
+        Tokens of the text.
+
+    """
+    pattern = _HTML_TOKEN_RE if parse_html else _TEXT_TOKEN_RE
+    follows_newline = False
+    for match in pattern.finditer(text):
+        value = match.group()
+        tag = _TAG_RE.match(value) if parse_html else None
+        if tag is not None:
+            yield _Token(value, 0, tag.group(2).lower(), bool(tag.group(1)))
+        elif value == '\n':
+            priority = _PARAGRAPH_BREAK if follows_newline else _LINE_BREAK
+            follows_newline = True
+            yield _Token(value, 1, break_priority=priority)
+        elif parse_html and len(value) > 1 and value.startswith('&'):
+            follows_newline = False
+            yield _Token(value, _get_length(html.unescape(value)))
+        else:
+            follows_newline = False
+            priority = _WORD_BREAK if value.isspace() else _NO_BREAK
+            # A character takes at most 2 code units.
+            step = max(max_token_length // 2, 1)
+            for start in range(0, len(value), step):
+                piece = value[start:start + step]
+                is_last = start + step >= len(value)
+                yield _Token(
+                    piece,
+                    _get_length(piece),
+                    break_priority=priority if is_last else _NO_BREAK,
+                )
+
+
+def _update_open_tags(open_tags: list[_Token], token: _Token) -> None:
+    """Push the opening tag onto the stack of the open tags or pop the tag
+    the closing tag matches.
+    """
+    if token.tag is None:
+        return
+
+    if not token.closing:
+        open_tags.append(token)
+        return
+
+    for i in range(len(open_tags) - 1, -1, -1):
+        if open_tags[i].tag == token.tag:
+            del open_tags[i]
+            break
+
+
+def _split_long_text(
+    text: str,
+    limit: int,
+    first_limit: int,
+    *,
+    parse_html: bool,
+) -> 'Iterator[str]':
+    """Split the text exceeding the limit of the first chunk into chunks.
+
+    Yields
+    ------
+        Chunks of the text.
+
+    """
+    tokens = list(_tokenize(text, min(limit, first_limit), parse_html=parse_html))
+    current_limit = first_limit
+    chunk_start = 0
+    # The tags open at the beginning of the current chunk.
+    open_tags: list[_Token] = []
+    length = 0
+    # The positions the current chunk may be cut at, with the priorities of
+    # breaking there and the lengths of the chunk up to them.
+    breaks: list[tuple[int, int, int]] = []
+    yielded = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if length + token.length > current_limit and i > chunk_start:
+            # Prefer the breaks which don't make the chunk too short.
+            cut, _, cut_length = max(
+                breaks,
+                key=lambda item: (item[2] >= current_limit // 2, item[1], item[0]),
+                default=(i, _NO_BREAK, length),
+            )
+            chunk_tags = list(open_tags)
+            for chunk_token in tokens[chunk_start:cut]:
+                _update_open_tags(open_tags, chunk_token)
+
+            # Telegram rejects the messages consisting of whitespaces only.
+            if any(not t.tag and not t.text.isspace() for t in tokens[chunk_start:cut]):
+                yielded = True
+                yield ''.join((
+                    *(tag.text for tag in chunk_tags),
+                    *(chunk_token.text for chunk_token in tokens[chunk_start:cut]),
+                    *(f'</{tag.tag}>' for tag in reversed(open_tags)),
+                ))
+
+            chunk_start = cut
+            length -= cut_length
+            breaks = [
+                (position, priority, break_length - cut_length)
+                for position, priority, break_length in breaks
+                if position > cut
+            ]
+            current_limit = limit
+            continue
+
+        length += token.length
+        if token.break_priority:
+            breaks.append((i + 1, token.break_priority, length))
+
+        i += 1
+
+    rest = tokens[chunk_start:]
+    if not yielded or any(not t.tag and not t.text.isspace() for t in rest):
+        yield ''.join((*(tag.text for tag in open_tags), *(t.text for t in rest)))
+
+
+def split_message(
+    text: str,
+    limit: int,
+    *,
+    first_limit: int | None = None,
+    parse_html: bool = True,
+) -> 'Iterator[str]':
+    """Split the text into the chunks no longer than the limit. The first chunk
+    may have its own limit (e.g., when it's a caption). The chunks are produced
+    lazily, so that the first one can be sent before the rest are built.
+
+    Returns
+    -------
+        Iterator over the chunks of the text.
+
+    """
+    first_limit = limit if first_limit is None else first_limit
+    # The length in code units is never less than the length after parsing.
+    if _get_length(text) <= first_limit:
+        return iter((text, ))
+
+    return _split_long_text(text, limit, first_limit, parse_html=parse_html)
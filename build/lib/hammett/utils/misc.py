@@ -14,11 +14,14 @@ async def get_callback_query(update: 'Update') -> 'CallbackQuery | None':
         CallbackQuery from Update.
 
     """
+    from hammett.core.callback_answer import answer_callback_query
+
     query = update.callback_query
     # CallbackQueries need to be answered, even if no notification to the user is needed.
-    # Some clients may have trouble otherwise.
+    # Some clients may have trouble otherwise. The query is answered only once per update,
+    # no matter how many times this function is called.
     # See https://core.telegram.org/bots/api#callbackquery
     if query:
-        await query.answer()
+        await answer_callback_query(query)
 
     return query
@@ -1,8 +1,9 @@
 """The module contains helpers for working with RenderConfig."""
 
+from dataclasses import fields
 from typing import TYPE_CHECKING
 
-from hammett.core.constants import LATEST_SENT_MSG_KEY
+from hammett.core.constants import LATEST_SENT_MSG_KEY, FinalRenderConfig, RenderConfig
 from hammett.core.exceptions import MissingPersistence
 
 if TYPE_CHECKING:
@@ -10,7 +11,9 @@ if TYPE_CHECKING:
     from telegram.ext import CallbackContext
     from telegram.ext._utils.types import BD, BT, CD, UD
 
-    from hammett.core.constants import FinalRenderConfig, LatestMessage
+    from hammett.core.constants import LatestMessage
+
+_RENDER_CONFIG_FIELDS = tuple(field.name for field in fields(RenderConfig))
 
 
 def get_latest_message(
@@ -40,6 +43,25 @@ def get_latest_message(
     return state
 
 
+def finalize_render_config(config: 'RenderConfig | None') -> 'FinalRenderConfig':
+    """Return an object of FinalRenderConfig with the values of the specified
+    RenderConfig. Unlike `FinalRenderConfig(**asdict(config))`, the values are
+    not deep-copied, so the keyboard, attachments and document are shared with
+    the original config and must not be modified in place, while the buttons,
+    along with the screen methods and hiders they refer to, are not copied on
+    every render.
+
+    Returns
+    -------
+        Object of FinalRenderConfig.
+
+    """
+    if config is None:
+        return FinalRenderConfig()
+
+    return FinalRenderConfig(**{name: getattr(config, name) for name in _RENDER_CONFIG_FIELDS})
+
+
 async def save_latest_message(
     context: 'CallbackContext[BT, UD, CD, BD]',
     config: 'FinalRenderConfig',
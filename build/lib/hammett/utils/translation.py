@@ -1,13 +1,70 @@
-"""The module contains tools for localization."""
+"""The module contains tools for localization.
 
+The translation catalogs are loaded once per language and the translated
+strings are memoized, so translating a caption again costs a dict lookup.
+The catalogs are never installed globally, so the handlers serving users
+with different languages concurrently don't affect each other.
+"""
+
+import functools
 import gettext as native_gettext
+from pathlib import Path
 
 from hammett.conf import settings
 from hammett.core.exceptions import LocalePathIsNotSpecified
 
+# The translated strings are memoized per (language, caption). Unlike
+# the captions of the screens and buttons, the strings built from user data
+# are unlikely to repeat, so the memo is bounded.
+_MAX_TRANSLATIONS = 10_000
+
+_catalogs: dict[str, native_gettext.NullTranslations] = {}
+
+
+def _get_catalog(language: str) -> native_gettext.NullTranslations:
+    """Return the translation catalog of the language, loading it on first use.
+
+    Returns
+    -------
+        Translation catalog of the language.
+
+    """
+    try:
+        return _catalogs[language]
+    except KeyError:
+        catalog = native_gettext.translation(
+            settings.DOMAIN,
+            localedir=str(settings.LOCALE_PATH),
+            languages=[language],
+            fallback=True,
+        )
+        _catalogs[language] = catalog
+        return catalog
+
+
+@functools.lru_cache(maxsize=_MAX_TRANSLATIONS)
+def _translate(language: str, caption: str) -> str:
+    """Return the caption translated into the language.
+
+    Returns
+    -------
+        Translated caption.
+
+    """
+    return _get_catalog(language).gettext(caption)
+
 
-def gettext(caption: str, language: str = settings.LANGUAGE_CODE) -> str:
-    """Return translated text by its caption.
+def clear_translation_cache() -> None:
+    """Forget the loaded translation catalogs and the translated strings,
+    so that the modified catalogs are loaded again.
+    """
+    _catalogs.clear()
+    _translate.cache_clear()
+
+
+def gettext(caption: str, language: str | None = None) -> str:
+    """Return translated text by its caption. The language defaults to
+    the LANGUAGE_CODE setting.
 
     Returns
     -------
@@ -21,12 +78,29 @@ def gettext(caption: str, language: str = settings.LANGUAGE_CODE) -> str:
     if not settings.LOCALE_PATH:
         raise LocalePathIsNotSpecified
 
-    translation = native_gettext.translation(
-        settings.DOMAIN,
-        localedir=str(settings.LOCALE_PATH),
-        languages=[language],
-        fallback=True,
+    return _translate(language or settings.LANGUAGE_CODE, caption)
+
+
+def preload_catalogs() -> list[str]:
+    """Load the translation catalogs of all the languages found in LOCALE_PATH.
+
+    Returns
+    -------
+        Languages the catalogs of which are loaded.
+
+    Raises
+    ------
+        LocalePathIsNotSpecified: If the `LOCALE_PATH` attribute of settings is not specified.
+
+    """
+    if not settings.LOCALE_PATH:
+        raise LocalePathIsNotSpecified
+
+    languages = sorted(
+        path.parent.parent.name
+        for path in Path(settings.LOCALE_PATH).glob(f'*/LC_MESSAGES/{settings.DOMAIN}.mo')
     )
-    translation.install()
+    for language in languages:
+        _get_catalog(language)
 
-    return translation.gettext(caption)
+    return languages
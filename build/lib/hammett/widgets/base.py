@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING, cast
 import telegram
 
 from hammett.core import Button, Screen
+from hammett.core.callback_data import get_payload
 from hammett.core.constants import (
     DEFAULT_STATE,
     EMPTY_KEYBOARD,
@@ -19,7 +20,7 @@ from hammett.core.exceptions import (
     MissingPersistence,
     PayloadIsEmpty,
 )
-from hammett.core.handlers import get_payload_storage, register_button_handler
+from hammett.core.handlers import register_button_handler
 from hammett.utils.misc import get_callback_query
 from hammett.widgets.exceptions import (
     ChoiceEmojisAreUndefined,
@@ -459,8 +460,7 @@ class BaseChoiceWidget(BaseWidget):
         if data is None:
             raise FailedToGetDataAttributeOfQuery
 
-        payload_storage = get_payload_storage(context)
-        payload = payload_storage.get(data)
+        payload = await get_payload(data, context, keep_legacy=True)
         if not payload:
             raise PayloadIsEmpty
 
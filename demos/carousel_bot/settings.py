@@ -8,6 +8,12 @@ with contextlib.suppress(ImportError):
     from dotenv import load_dotenv
     load_dotenv()
 
+# Collapses the edits made by tapping the buttons quickly into the latest one.
+EDIT_DEBOUNCE = {
+    'ENABLED': True,
+    'WINDOW': 0.3,
+}
+
 MEDIA_ROOT = Path(__file__).resolve().parent / 'media'
 
 REDIS_PERSISTENCE = {
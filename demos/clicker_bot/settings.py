@@ -7,6 +7,12 @@ with contextlib.suppress(ImportError):
     from dotenv import load_dotenv
     load_dotenv()
 
+# Collapses the edits made by tapping the buttons quickly into the latest one.
+EDIT_DEBOUNCE = {
+    'ENABLED': True,
+    'WINDOW': 0.3,
+}
+
 REDIS_PERSISTENCE = {
     'HOST': os.getenv('REDIS_PERSISTENCE_HOST', 'valkey'),
     'PORT': 6379,
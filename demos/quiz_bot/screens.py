@@ -29,6 +29,12 @@ class BaseScreen(Screen):
         language_code = context.user_data.get('language_code', 'en')
         return _(self.caption, language_code)
 
+    async def get_language(self, _update, context):
+        """Return the language chosen by the user, which the screens are
+        rendered in.
+        """
+        return context.user_data.get('language_code', 'en')
+
     @staticmethod
     def get_next_choice_widget(next_correct_answer):
         """Return the widget screen based on the type of answer for the next question."""
@@ -144,6 +150,8 @@ class LanguageSwitcherScreen(BaseScreen, SingleChoiceWidget):
 class MainMenuScreen(BaseScreen, StartMixin):
     """The class implements MainMenuScreen."""
 
+    cacheable = True
+
     caption = 'main_menu_screen'
 
     async def add_default_keyboard(self, _update, context):
@@ -7,14 +7,37 @@ import unittest
 
 from tests.test_bot import BotTests
 from tests.test_buttons import ButtonsTests
+from tests.test_callback_answer import CallbackAnswerTests
+from tests.test_callback_data import CallbackDataTests
+from tests.test_chunking import ChunkingTests
+from tests.test_cover_processing import CoverProcessingTests
+from tests.test_edit_debounce import EditDebounceTests
+from tests.test_file_id_cache import FileIdCacheTests
 from tests.test_handers_render import HandlersRenderTests
 from tests.test_handlers import HandlersTests
 from tests.test_hiders_check_mechanism import HidersCheckerTests
+from tests.test_intake import StaleUpdateFilterTests
+from tests.test_keyboard import KeyboardTests
+from tests.test_keyboard_hiding import KeyboardHidingTests
+from tests.test_loaders import DataLoaderTests, LoadersTests
+from tests.test_media_cache import MediaCacheTests
 from tests.test_mixins import MixinTests
+from tests.test_payload_store import (
+    BotDataPayloadStoreTests,
+    MemoryPayloadStoreTests,
+    RedisPayloadStoreTests,
+)
 from tests.test_permissions_mechanism import PermissionsTests
 from tests.test_persistence import PersistenceTests
+from tests.test_renderer import RendererTests
+from tests.test_request import RequestTests
 from tests.test_screens import ScreenTests
+from tests.test_send_queue import SendQueueTests
 from tests.test_start_marker import StartMarkerTests
+from tests.test_template import TemplateTests
+from tests.test_translation import TranslationTests
+from tests.test_uploads import UploadsTests
+from tests.test_webhook import WebhookTests
 from tests.test_widgets.test_carousel import CarouselWidgetTests
 
 if __name__ == '__main__':
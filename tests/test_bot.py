@@ -9,9 +9,9 @@ from telegram.ext import CommandHandler
 
 from hammett.core.bot import Bot
 from hammett.core.button import Button
+from hammett.core.callback_data import get_handler_pattern
 from hammett.core.constants import DEFAULT_STATE, SourceTypes
 from hammett.core.exceptions import CallbackNotProvided, JobKwargsNotProvided, TokenIsNotSpecified
-from hammett.core.handlers import calc_checksum
 from hammett.core.mixins import RouteMixin
 from hammett.core.persistence import RedisPersistence
 from hammett.error_handler import default_error_handler
@@ -163,7 +163,7 @@ class BotTests(BaseTestCase):
         bot = get_bot([TestScreenWithKeyboard])
 
         handlers = bot._native_application.handlers[0][0]
-        pattern = calc_checksum('TestScreenWithKeyboard.move')
+        pattern = get_handler_pattern(TestScreenWithKeyboard().move)
 
         self.assertIsInstance(handlers.entry_points[0], CommandHandler)
         self.assertEqual(handlers.name, BOT_TEST_NAME)
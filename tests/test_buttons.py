@@ -1,6 +1,7 @@
 """The module contains the tests for buttons."""
 
 from hammett.core.button import Button
+from hammett.core.callback_data import decode_callback_data
 from hammett.core.constants import SourceTypes
 from hammett.core.exceptions import UnknownSourceType
 from hammett.test.base import BaseTestCase
@@ -10,6 +11,8 @@ _TEST_PAYLOAD = 'test payload'
 
 _UNKNOWN_SOURCE_TYPE = 100
 
+_OTHER_USER_ID = 456
+
 
 class AnythingElseButScreen:
     """A dummy class used for the testing purposes."""
@@ -47,3 +50,24 @@ class ButtonsTests(BaseTestCase):
                 AnythingElseButScreen,  # is not a subclass of Screen, so it's invalid
                 source_type=SourceTypes.MOVE_SOURCE_TYPE,
             )
+
+    async def test_only_user_part_of_callback_data_differs(self):
+        """Test that the callback data of the same button created for different
+        users differs only in the user ID, and the URL buttons are reused.
+        """
+        button = Button('Test', TestScreen, source_type=SourceTypes.MOVE_SOURCE_TYPE)
+        url_button = Button('Test', 'https://example.com', source_type=SourceTypes.URL_SOURCE_TYPE)
+
+        inline_button, _ = await button.create(self.update, self.context)
+        self.context._user_id = _OTHER_USER_ID  # noqa: SLF001
+        other_inline_button, _ = await button.create(None, self.context)
+        data = decode_callback_data(inline_button.callback_data)
+        other_data = decode_callback_data(other_inline_button.callback_data)
+
+        self.assertEqual(data.user_id, self.user_id)
+        self.assertEqual(other_data.user_id, _OTHER_USER_ID)
+        self.assertEqual(data._replace(user_id=_OTHER_USER_ID), other_data)
+        self.assertIs(
+            (await url_button.create(self.update, self.context))[0],
+            (await url_button.create(None, self.context))[0],
+        )
@@ -0,0 +1,103 @@
+"""The module contains the tests for the callback answer mechanism."""
+
+# ruff: noqa: SLF001
+
+import asyncio
+
+from telegram import Update
+from telegram.error import NetworkError
+
+from hammett.core.callback_answer import (
+    defer_callback_answer,
+    finish_callback_answer,
+    finish_callback_answer_handler,
+)
+from hammett.test.base import BaseTestCase
+from hammett.utils.misc import get_callback_query
+
+_CALLBACK_QUERY_ID = '42'
+
+_TEXT = 'Done'
+
+
+class _CallbackQuery:
+    """The class imitates a callback query recording its answers."""
+
+    def __init__(self, query_id):
+        self.answers = []
+        self.failures = 0
+        self.id = query_id
+
+    async def answer(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            msg = 'Timed out'
+            raise NetworkError(msg)
+
+        self.answers.append(kwargs)
+        return True
+
+
+class CallbackAnswerTests(BaseTestCase):
+    """The class implements the tests for the callback answer mechanism."""
+
+    def setUp(self):
+        """Initialize an update with a fake callback query."""
+        super().setUp()
+
+        self.query = _CallbackQuery(_CALLBACK_QUERY_ID)
+        self.callback_update = Update(self.update_id)
+        self.callback_update._unfreeze()
+        self.callback_update.callback_query = self.query
+
+    async def test_callback_query_is_answered_once_per_update(self):
+        """Test that the callback query is answered only once, no matter
+        how many times it's requested.
+        """
+        for _ in range(3):
+            await get_callback_query(self.callback_update)
+
+        await finish_callback_answer(self.callback_update)
+
+        self.assertEqual(self.query.answers, [{}])
+
+    async def test_deferred_answer_carries_text(self):
+        """Test that the deferred answer is sent when the handler finishes
+        and carries the specified text.
+        """
+        defer_callback_answer(self.callback_update, _TEXT, show_alert=True)
+        await get_callback_query(self.callback_update)
+
+        self.assertEqual(self.query.answers, [])
+
+        await finish_callback_answer_handler(self.callback_update, self.context)
+
+        self.assertEqual(self.query.answers, [{'text': _TEXT, 'show_alert': True}])
+
+    async def test_deferred_answer_is_sent_on_timeout(self):
+        """Test that the deferred answer is sent automatically when
+        the timeout expires.
+        """
+        defer_callback_answer(self.callback_update, _TEXT, timeout=0.01)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.query.answers, [{'text': _TEXT}])
+
+        await finish_callback_answer(self.callback_update)
+
+        self.assertEqual(self.query.answers, [{'text': _TEXT}])
+
+    async def test_failed_answer_on_timeout_is_logged(self):
+        """Test that the failure to answer on timeout is logged and the callback
+        query is answered again when the handler finishes.
+        """
+        self.query.failures = 1
+        defer_callback_answer(self.callback_update, _TEXT, timeout=0.01)
+        with self.assertLogs('hammett.core.callback_answer', level='ERROR'):
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(self.query.answers, [])
+
+        await finish_callback_answer(self.callback_update)
+
+        self.assertEqual(self.query.answers, [{'text': _TEXT}])
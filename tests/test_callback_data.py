@@ -0,0 +1,132 @@
+"""The module contains the tests for the callback data format."""
+
+import re
+
+from hammett.core.button import Button
+from hammett.core.callback_data import (
+    HEADER_LENGTH,
+    MAX_CALLBACK_DATA_LENGTH,
+    decode_callback_data,
+    encode_callback_data_header,
+    encode_checksum,
+    encode_payload,
+    encode_user_id,
+    get_handler_pattern,
+    get_payload,
+)
+from hammett.core.constants import SourceTypes
+from hammett.core.exceptions import PayloadIsEmpty
+from hammett.core.handlers import calc_checksum, get_payload_storage
+from hammett.core.payload_store import get_payload_store
+from hammett.test.base import BaseTestCase
+from tests.base import TestScreen
+
+_CAPTION = 'Test'
+
+_GROUP_CHAT_ID = -1001234567890
+
+_PAYLOAD = 'page=2'
+
+_LONG_PAYLOAD = 'Поздравляем! Вы нажали на кнопку номер 42.'
+
+
+class CallbackDataTests(BaseTestCase):
+    """The class implements the tests for the callback data format."""
+
+    async def test_encoding_and_decoding(self):
+        """Test that the decoded callback data contains the encoded fields."""
+        handler = TestScreen().move
+        data = (
+            f'{encode_callback_data_header(handler, _CAPTION)}'
+            f'{encode_user_id(_GROUP_CHAT_ID)}{_PAYLOAD}'
+        )
+        decoded_data = decode_callback_data(data)
+
+        self.assertLessEqual(len(data), MAX_CALLBACK_DATA_LENGTH)
+        self.assertEqual(len(data), HEADER_LENGTH + len(_PAYLOAD))
+        self.assertEqual(decoded_data.handler, encode_checksum(handler))
+        self.assertEqual(decoded_data.button, encode_checksum(_CAPTION))
+        self.assertEqual(decoded_data.user_id, _GROUP_CHAT_ID)
+        self.assertEqual(decoded_data.payload, _PAYLOAD)
+
+    async def test_decoding_legacy_callback_data(self):
+        """Test that the legacy callback data is not decoded, even if its
+        checksum starts like the current version.
+        """
+        self.assertIsNone(decode_callback_data(f'1,button=2,user_id={self.user_id}'))
+        self.assertIsNone(decode_callback_data('1234567890,button=987654321,user_id=123456789'))
+
+    async def test_handler_pattern_matches_legacy_callback_data(self):
+        """Test that the handler pattern matches both the current
+        and the legacy callback data of the handler.
+        """
+        handler = TestScreen().move
+        pattern = re.compile(get_handler_pattern(handler))
+        legacy_data = (
+            f'{calc_checksum(handler)},button={calc_checksum(_CAPTION)},user_id={self.user_id}'
+        )
+        data = f'{encode_callback_data_header(handler, _CAPTION)}{encode_user_id(self.user_id)}'
+
+        self.assertIsNotNone(pattern.match(data))
+        self.assertIsNotNone(pattern.match(legacy_data))
+        self.assertIsNone(pattern.match(f'{calc_checksum(handler)}0,button=1,user_id=1'))
+
+    async def test_small_payload_is_packed_inline(self):
+        """Test that a small payload is packed into the callback data
+        and the payload store is not touched.
+        """
+        button = Button(
+            _CAPTION,
+            TestScreen,
+            source_type=SourceTypes.MOVE_SOURCE_TYPE,
+            payload=_PAYLOAD,
+        )
+        writes = get_payload_store(self.context).get_stats().writes
+        inline_button, _ = await button.create(self.update, self.context)
+
+        self.assertEqual(await get_payload(inline_button.callback_data, self.context), _PAYLOAD)
+        self.assertEqual(get_payload_store(self.context).get_stats().writes, writes)
+
+    async def test_oversized_payload_is_stored_by_hash(self):
+        """Test that an oversized payload is put into the payload store once
+        under the hash of its content and can be read repeatedly.
+        """
+        button = Button(
+            _CAPTION,
+            TestScreen,
+            source_type=SourceTypes.MOVE_SOURCE_TYPE,
+            payload=_LONG_PAYLOAD,
+        )
+        other_button = Button(
+            _CAPTION * 2,
+            TestScreen,
+            source_type=SourceTypes.MOVE_SOURCE_TYPE,
+            payload=_LONG_PAYLOAD,
+        )
+        writes = get_payload_store(self.context).get_stats().writes
+        inline_button, _ = await button.create(self.update, self.context)
+        await other_button.create(self.update, self.context)
+        data = inline_button.callback_data
+        _, payload_key = encode_payload(_LONG_PAYLOAD)
+
+        self.assertLessEqual(len(data.encode()), MAX_CALLBACK_DATA_LENGTH)
+        self.assertEqual(get_payload_store(self.context).get_stats().writes, writes + 1)
+        self.assertEqual(await get_payload_store(self.context).get(payload_key), _LONG_PAYLOAD)
+        self.assertEqual(list(get_payload_storage(self.context)), [f'payload:{payload_key}'])
+        for _ in range(2):
+            self.assertEqual(await get_payload(data, self.context), _LONG_PAYLOAD)
+
+    async def test_legacy_payload(self):
+        """Test that the payload of a button with the legacy callback data
+        is taken from the payload storage.
+        """
+        for data in (
+            f'1,button=2,user_id={self.user_id}',
+            '1234567890,button=987654321,user_id=123456789',
+        ):
+            get_payload_storage(self.context)[data] = _PAYLOAD
+
+            self.assertEqual(await get_payload(data, self.context, keep_legacy=True), _PAYLOAD)
+            self.assertEqual(await get_payload(data, self.context), _PAYLOAD)
+            with self.assertRaises(PayloadIsEmpty):
+                await get_payload(data, self.context)
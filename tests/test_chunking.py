@@ -0,0 +1,59 @@
+"""The module contains the tests for splitting the long texts into chunks."""
+
+import html
+import re
+
+from hammett.test.base import BaseTestCase
+from hammett.utils.chunking import split_message
+
+_TAG_RE = re.compile(r'<[^<>]*>')
+
+
+def _get_visible_text(text):
+    """Return the text as Telegram displays it."""
+    return html.unescape(_TAG_RE.sub('', text))
+
+
+class ChunkingTests(BaseTestCase):
+    """The class implements the tests for splitting the long texts into chunks."""
+
+    def test_not_splitting_short_text(self):
+        """Test that a text which fits is returned as is."""
+        self.assertEqual(list(split_message('<b>text</b>', 4)), ['<b>text</b>'])
+
+    def test_splitting_on_line_boundaries(self):
+        """Test that a text is split on the line boundaries rather than
+        inside the lines, and that each chunk fits after parsing.
+        """
+        lines = [f'<i>Release {i}</i> &amp; more' for i in range(20)]
+        chunks = list(split_message('\n'.join(lines), 100))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(_get_visible_text(chunk)), 100)
+            self.assertTrue(chunk.endswith(('\n', 'more')))
+
+        self.assertEqual(''.join(chunks), '\n'.join(lines))
+
+    def test_reopening_tags(self):
+        """Test that the tags open at a boundary are closed at the end of
+        the chunk and reopened at the beginning of the next one.
+        """
+        chunks = list(split_message('<a href="url">one two three</a> four', 10))
+
+        self.assertEqual(chunks, [
+            '<a href="url">one two </a>',
+            '<a href="url">three</a> four',
+        ])
+
+    def test_splitting_long_words(self):
+        """Test that a word longer than the limit is split, counting
+        the characters in UTF-16 code units as Telegram does.
+        """
+        self.assertEqual(list(split_message('😀' * 5, 4)), ['😀😀', '😀😀', '😀'])
+
+    def test_first_limit(self):
+        """Test that the first chunk has its own limit."""
+        chunks = list(split_message('a b c d e f', 6, first_limit=2, parse_html=False))
+
+        self.assertEqual(chunks, ['a ', 'b c d ', 'e f'])
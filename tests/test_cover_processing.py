@@ -0,0 +1,118 @@
+"""The module contains the tests for the preprocessing of the covers."""
+
+# ruff: noqa: RUF029
+
+import asyncio
+import io
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from hammett.core.constants import FinalRenderConfig
+from hammett.core.cover_processing import CoverProcessor, get_cover_processor
+from hammett.core.renderer import Renderer
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_MAX_SIZE = 64
+
+
+class CoverProcessingTests(BaseTestCase):
+    """The class implements the tests for the preprocessing of the covers."""
+
+    def setUp(self):
+        """Create a temporary directory for the covers and a cover processor
+        caching the processed covers in it.
+        """
+        super().setUp()
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        self.processor = CoverProcessor(
+            cache_dir=Path(self.tmp_dir.name) / 'cache',
+            max_size=_MAX_SIZE,
+            max_workers=1,
+        )
+        self.addCleanup(self.processor.shutdown)
+
+    def _create_cover(self, name, size=(256, 128)):
+        """Create a transparent PNG cover with EXIF in the temporary directory."""
+        path = Path(self.tmp_dir.name) / name
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'  # Make
+        Image.new('RGBA', size, (255, 0, 0, 128)).save(path, exif=exif)
+        return path
+
+    async def test_processing_cover(self):
+        """Test that the cover is downscaled, converted to JPEG and stripped
+        of its metadata.
+        """
+        processed_path = await self.processor.process(self._create_cover('cover.png'))
+
+        with Image.open(processed_path) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.mode, 'RGB')
+            self.assertEqual(image.size, (_MAX_SIZE, _MAX_SIZE // 2))
+            self.assertFalse(image.getexif())
+
+    async def test_caching_processed_cover(self):
+        """Test that a cover is processed only once, even if it's requested
+        concurrently or under another path.
+        """
+        path = self._create_cover('cover.png')
+        copy_path = Path(self.tmp_dir.name) / 'copy.png'
+        copy_path.write_bytes(path.read_bytes())
+
+        processed_paths = set(await asyncio.gather(
+            self.processor.process(path),
+            self.processor.process(path),
+            self.processor.process(copy_path),
+        ))
+        processed_path = processed_paths.pop()
+        mtime = processed_path.stat().st_mtime_ns
+
+        self.assertFalse(processed_paths)
+        self.assertEqual(await self.processor.process(path), processed_path)
+        self.assertEqual(processed_path.stat().st_mtime_ns, mtime)
+
+    async def test_sending_unprocessable_cover_as_is(self):
+        """Test that a cover which can't be processed is sent as is."""
+        path = Path(self.tmp_dir.name) / 'cover.png'
+        path.write_bytes(b'not an image')
+
+        with self.assertLogs('hammett.core.cover_processing', level='WARNING'):
+            self.assertEqual(await self.processor.process(path), path)
+
+    async def test_sending_processed_cover(self):
+        """Test that the renderer sends the processed cover if the preprocessing
+        is enabled.
+        """
+        sent_kwargs = []
+
+        async def send(_send, kwargs, _priority, _uploads=None):
+            sent_kwargs.append(kwargs)
+            return True
+
+        config = FinalRenderConfig(
+            as_new_message=True,
+            chat_id=self.chat_id,
+            cover=str(self._create_cover('cover.png')),
+        )
+        with (
+            override_settings(COVER_PREPROCESSING={
+                'CACHE_DIR': Path(self.tmp_dir.name) / 'cache',
+                'ENABLED': True,
+                'MAX_SIZE': _MAX_SIZE,
+                'MAX_WORKERS': 1,
+            }),
+            patch.object(Renderer, '_send', side_effect=send),
+        ):
+            self.addCleanup(get_cover_processor().shutdown)
+            await Renderer(html_parse_mode=True).render(self.update, self.context, config)
+
+        with Image.open(io.BytesIO(sent_kwargs[0]['photo'])) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertLessEqual(max(image.size), _MAX_SIZE)
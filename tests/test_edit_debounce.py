@@ -0,0 +1,157 @@
+"""The module contains the tests for the edit debouncer."""
+
+# ruff: noqa: RUF029, S106, SLF001
+
+import asyncio
+from unittest.mock import patch
+
+from telegram import Update
+from telegram.ext import TypeHandler
+
+from hammett.core.constants import RenderConfig
+from hammett.core.edit_debounce import EditDebouncer, get_edit_debouncer
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+from tests.base import (
+    CHAT_ID,
+    MESSAGE_ID,
+    BaseTestScreenWithDescription,
+    TestRenderer,
+    get_bot,
+)
+
+_OTHER_MESSAGE_ID = 2
+
+_WINDOW = 0.05
+
+
+class TestCountingRenderer(TestRenderer):
+    """The class implements a renderer which remembers the rendered descriptions."""
+
+    def __init__(self, html_parse_mode):
+        """Initialize a renderer object."""
+        super().__init__(html_parse_mode)
+        self.rendered = []
+
+    async def render(self, update, context, config, **kwargs):
+        """Remember the description of the rendered screen."""
+        self.rendered.append(config.description)
+        return await super().render(update, context, config, **kwargs)
+
+
+class TestScreenWithCountingRenderer(BaseTestScreenWithDescription):
+    """The class implements a screen which remembers the rendered descriptions."""
+
+    def __init__(self):
+        """Initialize a screen object."""
+        super().__init__()
+        self.renderer = TestCountingRenderer(self.html_parse_mode)
+
+
+class EditDebounceTests(BaseTestCase):
+    """The class implements the tests for the edit debouncer."""
+
+    def _get_edit(self, name):
+        """Return the function making the edit which remembers its name."""
+        async def edit():
+            self.edits.append(name)
+
+        return edit
+
+    def setUp(self):
+        """Initialize the list of the made edits."""
+        super().setUp()
+        self.edits = []
+
+    async def test_collapsing_burst_of_edits(self):
+        """Test that the first edit is made immediately and the edits following
+        it within the window are collapsed into the latest one, without waiting.
+        """
+        debouncer = EditDebouncer(_WINDOW)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        for i in range(4):
+            await debouncer.submit(CHAT_ID, MESSAGE_ID, self._get_edit(i))
+
+        self.assertLess(loop.time() - start, _WINDOW)
+        self.assertEqual(self.edits, [0])
+
+        await debouncer.join()
+
+        self.assertEqual(self.edits, [0, 3])
+
+    async def test_edits_of_different_messages_are_independent(self):
+        """Test that the edits of different messages are not collapsed."""
+        debouncer = EditDebouncer(_WINDOW)
+
+        await debouncer.submit(CHAT_ID, MESSAGE_ID, self._get_edit(MESSAGE_ID))
+        await debouncer.submit(CHAT_ID, _OTHER_MESSAGE_ID, self._get_edit(_OTHER_MESSAGE_ID))
+
+        self.assertEqual(self.edits, [MESSAGE_ID, _OTHER_MESSAGE_ID])
+
+    async def test_edit_after_window_is_made_immediately(self):
+        """Test that an edit made after the window is over is not deferred."""
+        debouncer = EditDebouncer(_WINDOW)
+
+        await debouncer.submit(CHAT_ID, MESSAGE_ID, self._get_edit(0))
+        await asyncio.sleep(_WINDOW)
+        await debouncer.submit(CHAT_ID, MESSAGE_ID, self._get_edit(1))
+
+        self.assertEqual(self.edits, [0, 1])
+
+    @override_settings(EDIT_DEBOUNCE={'ENABLED': True, 'WINDOW': _WINDOW}, TOKEN='secret-token')
+    async def test_rendering_latest_state(self):
+        """Test that the renders of the same message made by the updates
+        processed one by one are collapsed into the latest one, while
+        the handlers are called on every update.
+        """
+        screen = TestScreenWithCountingRenderer()
+        handled = []
+
+        async def handler(update, context):
+            handled.append(update.update_id)
+            await screen.render(update, context, config=RenderConfig(
+                chat_id=CHAT_ID,
+                description=f'Click {update.update_id}',
+                message_id=MESSAGE_ID + 100,
+            ))
+
+        application = self.get_native_application()
+        application.add_handler(TypeHandler(Update, handler))
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        # Initializing the application would request getMe, so the check is skipped.
+        with patch.object(application, '_check_initialized'):
+            for update_id in range(3):
+                await application.process_update(Update(update_id, message=self.message))
+
+        self.assertLess(loop.time() - start, _WINDOW)
+        self.assertEqual(handled, [0, 1, 2])
+
+        debouncer = get_edit_debouncer()
+        self.assertEqual(debouncer.window, _WINDOW)
+        await debouncer.join()
+        await screen.render(self.update, self.context, config=RenderConfig(
+            as_new_message=True,
+            description='New message',
+        ))
+
+        self.assertEqual(screen.renderer.rendered, ['Click 0', 'Click 2', 'New message'])
+
+    @override_settings(EDIT_DEBOUNCE={'ENABLED': True, 'WINDOW': _WINDOW}, TOKEN='secret-token')
+    async def test_making_pending_edits_on_stop(self):
+        """Test that the edits still waiting in the debouncer are made
+        when the application stops.
+        """
+        application = get_bot()._native_application
+        debouncer = get_edit_debouncer()
+        for i in range(2):
+            await debouncer.submit(CHAT_ID, MESSAGE_ID + 200, self._get_edit(i))
+
+        self.assertEqual(self.edits, [0])
+
+        await application.post_stop(application)
+
+        self.assertEqual(self.edits, [0, 1])
@@ -0,0 +1,132 @@
+"""The module contains the tests for the file ID caches."""
+
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from fakeredis import FakeAsyncRedis
+
+from hammett.core.file_id_cache import (
+    MemoryFileIdCache,
+    RedisFileIdCache,
+    SQLiteFileIdCache,
+    get_file_id_cache,
+    get_media_key,
+    warm_up_file_id_cache,
+)
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_FILE_ID = 'AgACAgIAAxkBAAIBZ2Z'
+
+_KEY = 'key'
+
+
+class TestBot:
+    """The class implements a bot which records the uploads for the tests."""
+
+    def __init__(self):
+        """Initialize a bot object."""
+        self.deleted_messages = []
+        self.uploads = []
+
+    async def delete_message(self, _chat_id, message_id):
+        """Record deleting the message."""
+        self.deleted_messages.append(message_id)
+
+    async def send_photo(self, _chat_id, photo, **_kwargs):
+        """Record uploading the photo."""
+        self.uploads.append(photo)
+        return SimpleNamespace(
+            message_id=len(self.uploads),
+            photo=[SimpleNamespace(file_id=f'{_FILE_ID}{len(self.uploads)}')],
+        )
+
+
+class FileIdCacheTests(BaseTestCase):
+    """The class implements the tests for the file ID caches."""
+
+    def setUp(self):
+        """Create a temporary directory for the files of the tests."""
+        super().setUp()
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _create_file(self, name, content):
+        """Create a file with the specified content in the temporary directory."""
+        path = Path(self.tmp_dir.name) / name
+        path.write_bytes(content)
+        return path
+
+    async def test_evicting_least_recently_used_file_ids(self):
+        """Test that the memory cache evicts the least recently used file ID."""
+        cache = MemoryFileIdCache(max_entries=2)
+        await cache.set('1', _FILE_ID)
+        await cache.set('2', _FILE_ID)
+        await cache.get('1')
+        await cache.set('3', _FILE_ID)
+
+        self.assertEqual(await cache.get('1'), _FILE_ID)
+        self.assertIsNone(await cache.get('2'))
+        self.assertEqual(await cache.get('3'), _FILE_ID)
+
+    async def test_media_key_depends_on_content(self):
+        """Test that the key of a file changes when its content changes."""
+        path = self._create_file('cover.png', b'cover')
+        key = await get_media_key(path)
+
+        self.assertTrue(key.startswith(str(path.resolve())))
+        self.assertEqual(await get_media_key(path), key)
+
+        path.write_bytes(b'modified cover')
+        self.assertNotEqual(await get_media_key(path), key)
+
+    async def test_redis_cache(self):
+        """Test that the Redis cache keeps the file IDs."""
+        cache = RedisFileIdCache()
+        cache.redis_cli = FakeAsyncRedis()
+        await cache.set(_KEY, _FILE_ID)
+
+        self.assertEqual(await cache.get(_KEY), _FILE_ID)
+        self.assertIsNone(await cache.get(f'{_KEY}2'))
+
+    async def test_sqlite_cache_survives_restart(self):
+        """Test that the file IDs cached in SQLite are available
+        to another cache using the same database.
+        """
+        path = Path(self.tmp_dir.name) / 'file_ids.sqlite3'
+        await SQLiteFileIdCache(path=path).set(_KEY, _FILE_ID)
+        cache = SQLiteFileIdCache(path=path)
+
+        self.assertEqual(await cache.get(_KEY), _FILE_ID)
+        self.assertIsNone(await cache.get(f'{_KEY}2'))
+
+    async def test_configuring_sqlite_cache(self):
+        """Test that the SQLite cache is used when it's configured via
+        the FILE_ID_CACHE setting.
+        """
+        path = Path(self.tmp_dir.name) / 'file_ids.sqlite3'
+        with override_settings(FILE_ID_CACHE={
+            'BACKEND': 'hammett.core.file_id_cache.SQLiteFileIdCache',
+            'PATH': path,
+        }):
+            await get_file_id_cache().set(_KEY, _FILE_ID)
+
+        self.assertIsNone(await get_file_id_cache().get(_KEY))
+        self.assertEqual(await SQLiteFileIdCache(path=path).get(_KEY), _FILE_ID)
+
+    async def test_warming_up_cache(self):
+        """Test that the warmup uploads only the covers missing in the cache
+        and deletes the uploaded messages.
+        """
+        paths = [self._create_file(f'{i}.png', f'cover {i}'.encode()) for i in range(2)]
+        bot = TestBot()
+
+        self.assertEqual(await warm_up_file_id_cache(bot, self.chat_id, paths), 2)
+        self.assertEqual(await warm_up_file_id_cache(bot, self.chat_id, paths), 0)
+        self.assertEqual(bot.deleted_messages, [1, 2])
+        self.assertEqual(
+            await get_file_id_cache().get(await get_media_key(paths[1])),
+            f'{_FILE_ID}2',
+        )
@@ -1,5 +1,9 @@
 """The module contains the tests for the hiders mechanism."""
 
+import asyncio
+
+from telegram import Update
+
 from hammett.conf import settings
 from hammett.core.button import Button
 from hammett.core.constants import SourceTypes
@@ -11,6 +15,7 @@ from hammett.core.hider import (
     Hider,
     HidersChecker,
 )
+from hammett.core.renderer import Renderer
 from hammett.test.base import BaseTestCase
 from hammett.test.utils import override_settings
 
@@ -47,9 +52,27 @@ class TestAsyncHidersChecker(HidersChecker):
         return settings.IS_MODERATOR
 
 
+class TestCountingHidersChecker(HidersChecker):
+    """The class implements a hiders checker which counts the checks
+    for the tests. The checks are counted in the settings, since the checker
+    is imported by its dotted path, which may differ from the path
+    the tests are imported by.
+    """
+
+    async def is_admin(self, _update, _context):
+        """Represent a stub hiders checker for the testing purposes."""
+        settings.HIDER_CHECKS += 1
+        await asyncio.sleep(0)
+        return True
+
+
 class HidersCheckerTests(BaseTestCase):
     """The class implements the tests for the hiders checker mechanism."""
 
+    def _get_next_update(self):
+        """Return the update following the one of the test case."""
+        return Update(self.update_id + 1, message=self.message)
+
     async def _test_hider(self):
         """Implement a method with common logic shared by some tests here."""
         settings.IS_ADMIN = True
@@ -69,7 +92,8 @@ class HidersCheckerTests(BaseTestCase):
             hiders=Hider(ONLY_FOR_ADMIN),
             source_type=SourceTypes.URL_SOURCE_TYPE,
         )
-        _, visibility = await button.create(self.update, self.context)
+        # The results of the checks are memoized per update, so use another one.
+        _, visibility = await button.create(self._get_next_update(), self.context)
         self.assertFalse(visibility)
 
     @override_settings(HIDERS_CHECKER='tests.test_hiders_check_mechanism.TestAsyncHidersChecker')
@@ -110,6 +134,31 @@ class HidersCheckerTests(BaseTestCase):
         """
         await self._test_hider()
 
+    @override_settings(
+        HIDERS_CHECKER='tests.test_hiders_check_mechanism.TestCountingHidersChecker',
+    )
+    async def test_hider_checked_once_per_update(self):
+        """Test that the check of a hider shared by several buttons is run
+        only once per update, even if the buttons are created concurrently.
+        """
+        settings.HIDER_CHECKS = 0
+        keyboard = [[
+            Button(
+                f'{_TEST_BUTTON_NAME} {i}',
+                _TEST_URL,
+                hiders=Hider(ONLY_FOR_ADMIN),
+                source_type=SourceTypes.URL_SOURCE_TYPE,
+            ) for i in range(3)
+        ]]
+        create_markup_keyboard = Renderer._create_markup_keyboard  # noqa: SLF001
+        markup = await create_markup_keyboard(keyboard, self.update, self.context)
+
+        self.assertEqual(len(markup.inline_keyboard[0]), 3)
+        self.assertEqual(settings.HIDER_CHECKS, 1)
+
+        await create_markup_keyboard(keyboard, self._get_next_update(), self.context)
+        self.assertEqual(settings.HIDER_CHECKS, 2)
+
     @override_settings(HIDERS_CHECKER='tests.test_hiders_check_mechanism.TestHidersChecker')
     async def test_hiders_chain(self):
         """Test the case when hiders are combined using the OR operator."""
@@ -132,7 +181,7 @@ class HidersCheckerTests(BaseTestCase):
             hiders=Hider(ONLY_FOR_ADMIN) | Hider(ONLY_FOR_MODERATORS),
             source_type=SourceTypes.URL_SOURCE_TYPE,
         )
-        _, visibility = await button.create(self.update, self.context)
+        _, visibility = await button.create(self._get_next_update(), self.context)
         self.assertFalse(visibility)
 
     @override_settings(HIDERS_CHECKER='test')
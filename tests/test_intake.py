@@ -0,0 +1,187 @@
+"""The module contains the tests for the stale update filter."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from telegram import CallbackQuery, Message, Update
+from telegram.ext import ApplicationHandlerStop
+
+from hammett.core.intake import StaleUpdateFilter
+from hammett.test.base import BaseTestCase
+
+_BACKLOG_SIZE = 250
+
+_MAX_MESSAGE_AGE = 60
+
+_STARTUP_DELAY = 10
+
+
+class StaleUpdateFilterTests(BaseTestCase):
+    """The class implements the tests for the stale update filter."""
+
+    def setUp(self):
+        """Initialize the filter started after the backlog was sent."""
+        super().setUp()
+        self.started_at = datetime.now(tz=timezone.utc)
+        self.stale_update_filter = StaleUpdateFilter(started_at=self.started_at)
+
+    def _get_callback_query_update(self, update_id, date=None):
+        """Return an update containing a callback query made on a message
+        sent at the specified date.
+        """
+        message = Message(self.message_id, date or datetime.now(tz=timezone.utc), self.chat)
+        query = CallbackQuery(str(update_id), self.user, 'chat', data='data', message=message)
+        return Update(update_id, callback_query=query)
+
+    def _get_message_update(self, text, date=None, update_id=None):
+        """Return an update containing a message with the specified text."""
+        message = Message(
+            self.message_id,
+            date or datetime.now(tz=timezone.utc),
+            self.chat,
+            from_user=self.user,
+            text=text,
+        )
+        return Update(update_id or self.update_id, message=message)
+
+    def _get_backlog_date(self):
+        """Return the date of a message sent before the bot started."""
+        return self.started_at - timedelta(seconds=_STARTUP_DELAY)
+
+    async def test_repeated_starts_are_collapsed_while_draining(self):
+        """Test that only the first /start command of a user is processed
+        while draining the backlog.
+        """
+        date = self._get_backlog_date()
+        await self.stale_update_filter(self._get_message_update('/start', date), self.context)
+        with self.assertRaises(ApplicationHandlerStop):
+            await self.stale_update_filter(
+                self._get_message_update('/start', date),
+                self.context,
+            )
+
+        self.assertTrue(self.stale_update_filter.draining)
+        self.assertEqual(self.stale_update_filter.stats.collapsed_starts, 1)
+
+    async def test_drain_mode_ends_with_first_fresh_update(self):
+        """Test that the drain mode ends with the first update sent after
+        the bot started and the /start commands are no longer collapsed.
+        """
+        date = self._get_backlog_date()
+        await self.stale_update_filter(self._get_message_update('/start', date), self.context)
+        await self.stale_update_filter(self._get_message_update('/start'), self.context)
+        await self.stale_update_filter(self._get_message_update('/start'), self.context)
+
+        self.assertFalse(self.stale_update_filter.draining)
+        self.assertEqual(self.stale_update_filter.stats.drained, 1)
+        self.assertEqual(self.stale_update_filter.stats.processed, 2)
+        self.assertEqual(self.stale_update_filter.stats.collapsed_starts, 0)
+
+    async def test_fresh_callback_query_after_start_is_processed(self):
+        """Test that a callback query made on a message sent after the bot
+        started is processed and ends the drain mode.
+        """
+        with patch.object(CallbackQuery, 'answer') as answer:
+            await self.stale_update_filter(
+                self._get_callback_query_update(self.update_id),
+                self.context,
+            )
+
+        answer.assert_not_called()
+        self.assertFalse(self.stale_update_filter.draining)
+        self.assertEqual(self.stale_update_filter.stats.dropped_callback_queries, 0)
+
+    async def test_backlog_of_callback_queries(self):
+        """Test that a backlog consisting only of the callback queries made
+        on the old messages is dropped, and the callback queries are processed
+        once a fresh message ends the drain mode.
+        """
+        date = self._get_backlog_date()
+        with patch.object(CallbackQuery, 'answer') as answer:
+            for update_id in range(_BACKLOG_SIZE):
+                with self.assertRaises(ApplicationHandlerStop):
+                    await self.stale_update_filter(
+                        self._get_callback_query_update(update_id, date),
+                        self.context,
+                    )
+
+            self.assertTrue(self.stale_update_filter.draining)
+
+            await self.stale_update_filter(
+                self._get_message_update('text', update_id=_BACKLOG_SIZE),
+                self.context,
+            )
+            await self.stale_update_filter(
+                self._get_callback_query_update(_BACKLOG_SIZE + 1, date),
+                self.context,
+            )
+
+        stats = self.stale_update_filter.stats
+        self.assertEqual(answer.call_count, _BACKLOG_SIZE)
+        self.assertFalse(self.stale_update_filter.draining)
+        self.assertEqual(stats.drained, _BACKLOG_SIZE)
+        self.assertEqual(stats.dropped_callback_queries, _BACKLOG_SIZE)
+        self.assertEqual(stats.acknowledged_callback_queries, _BACKLOG_SIZE)
+        self.assertEqual(stats.processed, 2)
+
+    async def test_backlog_larger_than_batch(self):
+        """Test that the whole backlog of the messages and the callback queries
+        arriving in order is drained regardless of how it's split into batches,
+        and the updates following it are processed.
+        """
+        date = self._get_backlog_date()
+        with patch.object(CallbackQuery, 'answer'):
+            for update_id in range(0, _BACKLOG_SIZE, 2):
+                update = self._get_message_update('text', date, update_id)
+                await self.stale_update_filter(update, self.context)
+                with self.assertRaises(ApplicationHandlerStop):
+                    await self.stale_update_filter(
+                        self._get_callback_query_update(update_id + 1, date),
+                        self.context,
+                    )
+
+            self.assertTrue(self.stale_update_filter.draining)
+
+            await self.stale_update_filter(
+                self._get_message_update('text', update_id=_BACKLOG_SIZE),
+                self.context,
+            )
+            await self.stale_update_filter(
+                self._get_callback_query_update(_BACKLOG_SIZE + 1, date),
+                self.context,
+            )
+
+        self.assertFalse(self.stale_update_filter.draining)
+        self.assertEqual(self.stale_update_filter.stats.drained, _BACKLOG_SIZE)
+        self.assertEqual(
+            self.stale_update_filter.stats.dropped_callback_queries,
+            _BACKLOG_SIZE // 2,
+        )
+        self.assertEqual(self.stale_update_filter.stats.processed, 2)
+
+    async def test_drain_mode_ends_after_max_drain_time(self):
+        """Test that a callback query made on an old message is processed
+        when the drain mode has lasted for too long.
+        """
+        stale_update_filter = StaleUpdateFilter(
+            max_drain_time=_STARTUP_DELAY,
+            started_at=self.started_at - timedelta(seconds=_STARTUP_DELAY * 2),
+        )
+        date = self.started_at - timedelta(seconds=_STARTUP_DELAY * 3)
+        update = self._get_callback_query_update(self.update_id, date)
+        await stale_update_filter(update, self.context)
+
+        self.assertFalse(stale_update_filter.draining)
+        self.assertEqual(stale_update_filter.stats.dropped_callback_queries, 0)
+
+    async def test_old_messages_are_dropped(self):
+        """Test that the messages older than the maximum age are dropped."""
+        stale_update_filter = StaleUpdateFilter(max_message_age=_MAX_MESSAGE_AGE)
+        date = datetime.now(tz=timezone.utc) - timedelta(seconds=_MAX_MESSAGE_AGE * 2)
+
+        with self.assertRaises(ApplicationHandlerStop):
+            await stale_update_filter(self._get_message_update('text', date), self.context)
+
+        await stale_update_filter(self._get_message_update('text'), self.context)
+
+        self.assertEqual(stale_update_filter.stats.dropped_messages, 1)
@@ -0,0 +1,83 @@
+"""The module contains the tests for the compiled keyboards."""
+
+from telegram import Update
+
+from hammett.conf import settings
+from hammett.core.button import Button
+from hammett.core.callback_data import decode_callback_data
+from hammett.core.constants import SourceTypes
+from hammett.core.hider import ONLY_FOR_ADMIN, Hider
+from hammett.core.keyboard import CompiledKeyboard
+from hammett.core.payload_store import get_payload_store
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+from tests.base import TestScreen
+
+_LONG_PAYLOAD = 'payload' * 20
+
+_OTHER_USER_ID = 456
+
+_TEST_URL = 'https://github.com/cusdeb-com/hammett'
+
+
+class KeyboardTests(BaseTestCase):
+    """The class implements the tests for the compiled keyboards."""
+
+    async def test_compiled_keyboard_matches_created_buttons(self):
+        """Test that the markup of a compiled keyboard is the same as
+        the one of the buttons created individually, for different users.
+        """
+        rows = [
+            [Button('Move', TestScreen, source_type=SourceTypes.MOVE_SOURCE_TYPE)],
+            [Button('URL', _TEST_URL, source_type=SourceTypes.URL_SOURCE_TYPE)],
+        ]
+        keyboard = CompiledKeyboard(rows)
+
+        for update in (self.update, None):
+            markup = await keyboard.create_markup(update, self.context)
+            expected = [
+                [(await button.create(update, self.context))[0] for button in row]
+                for row in rows
+            ]
+            self.assertEqual([list(row) for row in markup.inline_keyboard], expected)
+            self.context._user_id = _OTHER_USER_ID  # noqa: SLF001
+
+        data = decode_callback_data(markup.inline_keyboard[0][0].callback_data)
+        self.assertEqual(data.user_id, _OTHER_USER_ID)
+
+    @override_settings(
+        HIDERS_CHECKER='tests.test_hiders_check_mechanism.TestCountingHidersChecker',
+    )
+    async def test_compiled_keyboard_checks_hiders_on_every_render(self):
+        """Test that the hiders of the buttons of a compiled keyboard are
+        checked on every render.
+        """
+        keyboard = CompiledKeyboard([[Button(
+            'Admin',
+            _TEST_URL,
+            hiders=Hider(ONLY_FOR_ADMIN),
+            source_type=SourceTypes.URL_SOURCE_TYPE,
+        )]])
+        settings.HIDER_CHECKS = 0
+
+        await keyboard.create_markup(self.update, self.context)
+        await keyboard.create_markup(Update(self.update_id + 1, message=self.message), self.context)
+
+        self.assertEqual(settings.HIDER_CHECKS, 2)
+
+    async def test_compiled_keyboard_stores_long_payloads(self):
+        """Test that the long payloads of the buttons of a compiled keyboard
+        are put into the payload store on every render.
+        """
+        button = Button(
+            'Move',
+            TestScreen,
+            payload=_LONG_PAYLOAD,
+            source_type=SourceTypes.MOVE_SOURCE_TYPE,
+        )
+        _, _, payload_key = button.get_callback_data_parts()
+        self.assertIsNotNone(payload_key)
+
+        await CompiledKeyboard([[button]]).create_markup(self.update, self.context)
+
+        self.assertEqual(await get_payload_store(self.context).get(payload_key), _LONG_PAYLOAD)
@@ -0,0 +1,157 @@
+"""The module contains the tests for the keyboard hiding queue."""
+
+# ruff: noqa: RUF029, S106, SLF001
+
+import asyncio
+
+from telegram.error import NetworkError
+from telegram.ext import CallbackContext
+
+from hammett.core.constants import LATEST_SENT_MSG_KEY, FinalRenderConfig
+from hammett.core.keyboard_hiding import KeyboardHidingQueue, get_keyboard_hiding_queue
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+from tests.base import CHAT_ID, BaseTestScreenWithHideKeyboard, TestRenderer, get_bot
+
+_KEYBOARD_HIDING = {'DEFERRED': True, 'MAX_PENDING': 10}
+
+_OTHER_CHAT_ID = 2
+
+_PREV_MESSAGE_ID = 10
+
+
+class TestBlockingRenderer(TestRenderer):
+    """The class implements a renderer whose keyboard hiding waits until
+    it's released.
+    """
+
+    def __init__(self, html_parse_mode):
+        """Initialize a renderer object."""
+        super().__init__(html_parse_mode)
+        self.hidden = []
+        self.released = asyncio.Event()
+
+    async def hide_keyboard(self, _context, latest_message):
+        """Remember the message after the keyboard hiding is released."""
+        await self.released.wait()
+        self.hidden.append(latest_message['message_id'])
+
+
+class TestScreenWithBlockingRenderer(BaseTestScreenWithHideKeyboard):
+    """The class implements a screen whose keyboard hiding waits until
+    it's released.
+    """
+
+    def __init__(self):
+        """Initialize a screen object."""
+        super().__init__()
+        self.renderer = TestBlockingRenderer(self.html_parse_mode)
+
+
+class KeyboardHidingTests(BaseTestCase):
+    """The class implements the tests for the keyboard hiding queue."""
+
+    def _get_hide(self, chat_id, message_id):
+        """Return the function hiding the keyboard of the message which
+        remembers the message.
+        """
+        async def hide():
+            self.hidden.append((chat_id, message_id))
+
+        return hide
+
+    def setUp(self):
+        """Initialize the list of the hidden keyboards."""
+        super().setUp()
+        self.hidden = []
+
+    async def test_hiding_same_message_once(self):
+        """Test that the repeated hides of the same message are coalesced
+        and the keyboards of a chat are hidden in order.
+        """
+        queue = KeyboardHidingQueue()
+        for message_id in (1, 2, 1):
+            queue.schedule(CHAT_ID, message_id, self._get_hide(CHAT_ID, message_id))
+
+        queue.schedule(_OTHER_CHAT_ID, 1, self._get_hide(_OTHER_CHAT_ID, 1))
+        self.assertEqual(queue.pending, 3)
+
+        await queue.join()
+
+        self.assertEqual(queue.pending, 0)
+        self.assertEqual(
+            [key for key in self.hidden if key[0] == CHAT_ID],
+            [(CHAT_ID, 2), (CHAT_ID, 1)],
+        )
+        self.assertIn((_OTHER_CHAT_ID, 1), self.hidden)
+
+    async def test_dropping_oldest_hides(self):
+        """Test that the oldest hides are dropped when there are too many
+        of them.
+        """
+        queue = KeyboardHidingQueue(max_pending=2)
+        for message_id in range(3):
+            queue.schedule(CHAT_ID, message_id, self._get_hide(CHAT_ID, message_id))
+
+        await queue.join()
+
+        self.assertEqual(self.hidden, [(CHAT_ID, 1), (CHAT_ID, 2)])
+
+    async def test_errors_do_not_stop_hiding(self):
+        """Test that a failed hide is logged and the next ones are still sent."""
+        async def fail():
+            msg = 'Network is unreachable'
+            raise NetworkError(msg)
+
+        queue = KeyboardHidingQueue()
+        queue.schedule(CHAT_ID, 1, fail)
+        queue.schedule(CHAT_ID, 2, self._get_hide(CHAT_ID, 2))
+        with self.assertLogs('hammett.core.keyboard_hiding', level='WARNING'):
+            await queue.join()
+
+        self.assertEqual(self.hidden, [(CHAT_ID, 2)])
+
+    @override_settings(KEYBOARD_HIDING=_KEYBOARD_HIDING, TOKEN='secret-token')
+    async def test_hiding_pending_keyboards_on_stop(self):
+        """Test that the keyboards still waiting to be hidden are hidden
+        when the application stops.
+        """
+        application = get_bot()._native_application
+        queue = get_keyboard_hiding_queue()
+        queue.schedule(CHAT_ID, 1, self._get_hide(CHAT_ID, 1))
+        await application.post_stop(application)
+
+        self.assertEqual(queue.max_pending, _KEYBOARD_HIDING['MAX_PENDING'])
+        self.assertEqual(self.hidden, [(CHAT_ID, 1)])
+
+    @override_settings(
+        KEYBOARD_HIDING=_KEYBOARD_HIDING,
+        SAVE_LATEST_MESSAGE=False,
+        TOKEN='secret-token',
+    )
+    async def test_rendering_does_not_wait_for_hiding(self):
+        """Test that rendering a screen as a new message doesn't wait for
+        the keyboard of the previous message to be hidden.
+        """
+        screen = TestScreenWithBlockingRenderer()
+        context = CallbackContext(
+            self.get_native_application(),
+            chat_id=self.chat_id,
+            user_id=self.user_id,
+        )
+        context.user_data[LATEST_SENT_MSG_KEY] = {
+            'chat_id': CHAT_ID,
+            'hide_keyboard': True,
+            'message_id': _PREV_MESSAGE_ID,
+        }
+        config = FinalRenderConfig(as_new_message=True, hide_keyboard=True)
+
+        with self.assertLogs('hammett.core.screen', level='WARNING'):
+            await screen._post_render(self.update, context, self.message, config)
+
+        self.assertEqual(screen.renderer.hidden, [])
+
+        screen.renderer.released.set()
+        await get_keyboard_hiding_queue().join()
+
+        self.assertEqual(screen.renderer.hidden, [_PREV_MESSAGE_ID])
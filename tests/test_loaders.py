@@ -0,0 +1,130 @@
+"""The module contains the tests for the data loaders."""
+
+# ruff: noqa: RUF029
+
+import asyncio
+
+from telegram import Update
+
+from hammett.core.exceptions import DataLoaderResultIsInvalid
+from hammett.core.loaders import DataLoader, memoize_per_update
+from hammett.core.screen import Screen
+from hammett.test.base import BaseTestCase
+
+_ARTISTS = ('Artist 1', 'Artist 2')
+
+_MISSING_KEY = 2
+
+
+class TestScreenWithLoader(Screen):
+    """The class implements a screen which needs the same data in several getters."""
+
+    def __init__(self):
+        """Initialize a screen with a loader object."""
+        super().__init__()
+        self.loads = 0
+        self.fail = False
+
+    @memoize_per_update
+    async def get_artists(self, _update, _context):
+        """Imitate loading the artists from a database."""
+        self.loads += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            msg = 'The database is unavailable'
+            raise ConnectionError(msg)
+
+        return _ARTISTS
+
+    async def get_description(self, update, context):
+        """Return the description listing the artists."""
+        return ', '.join(await self.get_artists(update, context))
+
+    async def add_default_keyboard(self, update, context):
+        """Return the keyboard containing a row per artist."""
+        return [[] for _ in await self.get_artists(update, context)]
+
+
+class LoadersTests(BaseTestCase):
+    """The class implements the tests for the data loaders."""
+
+    async def test_value_is_loaded_once_per_update(self):
+        """Test that the memoized method is run once per update, even if
+        it's called by the concurrent getters.
+        """
+        screen = TestScreenWithLoader()
+        config = await screen._finalize_config(self.update, self.context, None)  # noqa: SLF001
+
+        self.assertEqual(config.description, ', '.join(_ARTISTS))
+        self.assertEqual(len(config.keyboard), len(_ARTISTS))
+        self.assertEqual(screen.loads, 1)
+
+        await screen.get_artists(Update(self.update_id + 1), self.context)
+
+        self.assertEqual(screen.loads, 2)
+
+    async def test_exceptions_are_not_memoized(self):
+        """Test that the memoized method is run again if it raised an exception."""
+        screen = TestScreenWithLoader()
+        screen.fail = True
+        with self.assertRaises(ConnectionError):
+            await screen.get_artists(self.update, self.context)
+
+        screen.fail = False
+        artists = await screen.get_artists(self.update, self.context)
+
+        self.assertEqual(artists, _ARTISTS)
+        self.assertEqual(screen.loads, 2)
+
+
+class DataLoaderTests(BaseTestCase):
+    """The class implements the tests for the data loader."""
+
+    async def test_concurrent_loads_are_batched(self):
+        """Test that the keys requested concurrently are loaded in a single batch
+        and each caller gets the value of its key.
+        """
+        batches = []
+
+        async def batch_load(keys):
+            batches.append(keys)
+            return [key * 10 for key in keys]
+
+        loader = DataLoader(batch_load)
+        values = await asyncio.gather(
+            loader.load(1),
+            loader.load(2),
+            loader.load(1),
+            loader.load_many([3, 2]),
+        )
+
+        self.assertEqual(values, [10, 20, 10, [30, 20]])
+        self.assertEqual(batches, [[1, 2, 3]])
+
+    async def test_mapping_result_and_max_batch_size(self):
+        """Test that the batches are split according to the maximum size and
+        the keys missing from the mapping returned by the batch load function get None.
+        """
+        batches = []
+
+        async def batch_load(keys):
+            batches.append(keys)
+            return {key: str(key) for key in keys if key != _MISSING_KEY}
+
+        loader = DataLoader(batch_load, max_batch_size=2)
+        values = await loader.load_many([1, 2, 3])
+
+        self.assertEqual(values, ['1', None, '3'])
+        self.assertEqual(batches, [[1, 2], [3]])
+
+    async def test_invalid_result(self):
+        """Test that all the callers get an exception if the batch load function
+        returns a wrong number of values.
+        """
+
+        async def batch_load(_keys):
+            return []
+
+        loader = DataLoader(batch_load)
+        with self.assertRaises(DataLoaderResultIsInvalid):
+            await loader.load_many([1, 2])
@@ -0,0 +1,87 @@
+"""The module contains the tests for the media cache."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from hammett.core.media_cache import MediaCache, get_media_cache, read_media
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_CONTENT = b'cover'
+
+
+class MediaCacheTests(BaseTestCase):
+    """The class implements the tests for the media cache."""
+
+    def setUp(self):
+        """Create a temporary directory for the files of the tests."""
+        super().setUp()
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _create_file(self, name, content=_CONTENT):
+        """Create a file with the specified content in the temporary directory."""
+        path = Path(self.tmp_dir.name) / name
+        path.write_bytes(content)
+        return path
+
+    async def test_reading_cached_file(self):
+        """Test that a file is read from disk only once."""
+        cache = MediaCache(max_bytes=1024)
+        path = self._create_file('cover.png')
+
+        for _ in range(3):
+            self.assertEqual(await cache.read(path), _CONTENT)
+
+        stats = cache.get_stats()
+        self.assertEqual(stats.hits, 2)
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.bytes_read, len(_CONTENT))
+        self.assertEqual(stats.bytes_served, len(_CONTENT) * 3)
+        self.assertAlmostEqual(stats.hit_rate, 2 / 3)
+
+    async def test_invalidating_modified_file(self):
+        """Test that a modified file is read from disk again."""
+        cache = MediaCache(max_bytes=1024)
+        path = self._create_file('cover.png')
+        await cache.read(path)
+
+        new_content = b'new cover'
+        path.write_bytes(new_content)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(await cache.read(path), new_content)
+        self.assertEqual(cache.get_stats().misses, 2)
+
+    async def test_evicting_least_recently_used_files(self):
+        """Test that the least recently used files are evicted when the total
+        size of the cached files exceeds the limit, and the files larger than
+        the limit are not cached.
+        """
+        cache = MediaCache(max_bytes=len(_CONTENT) * 2, max_file_size=len(_CONTENT))
+        paths = [self._create_file(f'{i}.png') for i in range(3)]
+        large_path = self._create_file('large.png', _CONTENT * 2)
+        for path in (*paths, large_path, large_path):
+            await cache.read(path)
+
+        stats = cache.get_stats()
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.size, len(_CONTENT) * 2)
+        self.assertEqual(stats.evictions, 1)
+        self.assertEqual(stats.misses, 5)
+
+    @override_settings(MEDIA_CACHE={'ENABLED': True, 'MAX_BYTES': len(_CONTENT)})
+    async def test_configuring_media_cache(self):
+        """Test that the media cache used for reading the media is configured
+        via the overridden MEDIA_CACHE setting.
+        """
+        path = self._create_file('cover.png')
+        for _ in range(2):
+            self.assertEqual(await read_media(path), _CONTENT)
+
+        cache = get_media_cache()
+        self.assertEqual(cache.max_bytes, len(_CONTENT))
+        self.assertEqual(cache.get_stats().hits, 1)
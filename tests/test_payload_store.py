@@ -0,0 +1,196 @@
+"""The module contains the tests for the payload stores."""
+
+from unittest.mock import patch
+
+from fakeredis import FakeAsyncRedis
+
+from hammett.core.handlers import get_payload_storage
+from hammett.core.payload_store import (
+    BotDataPayloadStore,
+    MemoryPayloadStore,
+    RedisPayloadStore,
+    get_payload_store,
+)
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_KEY = 'key'
+
+_PAYLOAD = 'payload'
+
+_TTL = 60
+
+
+class BotDataPayloadStoreTests(BaseTestCase):
+    """The class implements the tests for the bot_data payload store."""
+
+    async def test_storing_payloads_in_bot_data(self):
+        """Test that the bound store keeps the payloads in the payload storage
+        in bot_data and shares the statistics with the unbound one.
+        """
+        store = BotDataPayloadStore(ttl=_TTL)
+        bound_store = store.bind(self.context)
+        await bound_store.set(_KEY, _PAYLOAD)
+        await bound_store.set(_KEY, _PAYLOAD)
+
+        self.assertEqual(list(get_payload_storage(self.context)), [f'payload:{_KEY}'])
+        self.assertEqual(await store.bind(self.context).get(_KEY), _PAYLOAD)
+        self.assertIsNone(await store.get(_KEY))
+        self.assertEqual(await bound_store.pop(_KEY), _PAYLOAD)
+        self.assertEqual(get_payload_storage(self.context), {})
+
+        stats = store.get_stats()
+        self.assertEqual(stats.hits, 2)
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.writes, 1)
+
+    async def test_evicting_least_recently_used_payloads_from_bot_data(self):
+        """Test that the least recently used payloads are evicted from bot_data
+        when the limits are exceeded, while the legacy payloads are kept.
+        """
+        get_payload_storage(self.context)['legacy'] = _PAYLOAD
+        size = len(_KEY) + len(_PAYLOAD) + 1
+        store = BotDataPayloadStore(max_bytes=size * 2, max_entries=2).bind(self.context)
+        await store.set(f'{_KEY}1', _PAYLOAD)
+        await store.set(f'{_KEY}2', _PAYLOAD)
+        await store.get(f'{_KEY}1')
+        await store.set(f'{_KEY}3', _PAYLOAD)
+
+        self.assertEqual(await store.get(f'{_KEY}1'), _PAYLOAD)
+        self.assertIsNone(await store.get(f'{_KEY}2'))
+        self.assertEqual(await store.get(f'{_KEY}3'), _PAYLOAD)
+
+        await store.set(f'{_KEY}4', _PAYLOAD * 2)
+
+        self.assertIsNone(await store.get(f'{_KEY}1'))
+        self.assertIsNone(await store.get(f'{_KEY}3'))
+        self.assertEqual(get_payload_storage(self.context)['legacy'], _PAYLOAD)
+
+        stats = store.get_stats()
+        self.assertEqual(stats.entries, 1)
+        self.assertEqual(stats.evictions, 3)
+        self.assertLessEqual(stats.size, size * 2)
+
+    async def test_expiring_payloads_in_bot_data(self):
+        """Test that the payloads in bot_data not accessed within the TTL
+        expire, and that the payloads loaded by the persistence are counted.
+        """
+        store = BotDataPayloadStore(ttl=_TTL)
+        with patch('hammett.core.payload_store.time.time', return_value=0):
+            await store.bind(self.context).set(_KEY, _PAYLOAD)
+
+        loaded_store = BotDataPayloadStore(ttl=_TTL)
+        with patch('hammett.core.payload_store.time.time', return_value=_TTL - 1):
+            self.assertEqual(await loaded_store.bind(self.context).get(_KEY), _PAYLOAD)
+
+        self.assertEqual(loaded_store.get_stats().entries, 1)
+        with patch('hammett.core.payload_store.time.time', return_value=_TTL * 3):
+            self.assertIsNone(await loaded_store.bind(self.context).get(_KEY))
+
+        stats = loaded_store.get_stats()
+        self.assertEqual(stats.entries, 0)
+        self.assertEqual(stats.size, 0)
+        self.assertEqual(stats.expirations, 1)
+        self.assertEqual(get_payload_storage(self.context), {})
+
+
+class MemoryPayloadStoreTests(BaseTestCase):
+    """The class implements the tests for the memory payload store."""
+
+    async def test_evicting_least_recently_used_payloads_by_entries(self):
+        """Test that the least recently used payload is evicted when
+        the number of the payloads exceeds the limit.
+        """
+        store = MemoryPayloadStore(max_entries=2)
+        await store.set('1', _PAYLOAD)
+        await store.set('2', _PAYLOAD)
+        await store.get('1')
+        await store.set('3', _PAYLOAD)
+
+        self.assertEqual(await store.get('1'), _PAYLOAD)
+        self.assertIsNone(await store.get('2'))
+        self.assertEqual(await store.get('3'), _PAYLOAD)
+
+        stats = store.get_stats()
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.evictions, 1)
+        self.assertEqual(stats.hits, 3)
+        self.assertEqual(stats.misses, 1)
+
+    async def test_evicting_payloads_by_size(self):
+        """Test that the payloads are evicted when their total size
+        exceeds the limit.
+        """
+        size = len(_KEY) + len(_PAYLOAD)
+        store = MemoryPayloadStore(max_bytes=size * 2)
+        await store.set(f'{_KEY}1', _PAYLOAD)
+        await store.set(f'{_KEY}2', _PAYLOAD * 2)
+
+        self.assertIsNone(await store.get(f'{_KEY}1'))
+        self.assertLessEqual(store.get_stats().size, size * 2)
+
+    async def test_expiring_payloads(self):
+        """Test that the payloads not accessed within the TTL expire."""
+        store = MemoryPayloadStore(ttl=_TTL)
+        with patch('hammett.core.payload_store.time.monotonic', return_value=0):
+            await store.set(_KEY, _PAYLOAD)
+
+        with patch('hammett.core.payload_store.time.monotonic', return_value=_TTL - 1):
+            self.assertEqual(await store.get(_KEY), _PAYLOAD)
+
+        with patch('hammett.core.payload_store.time.monotonic', return_value=_TTL * 2 - 2):
+            self.assertEqual(await store.get(_KEY), _PAYLOAD)
+
+        with patch('hammett.core.payload_store.time.monotonic', return_value=_TTL * 3):
+            self.assertIsNone(await store.get(_KEY))
+
+        stats = store.get_stats()
+        self.assertEqual(stats.entries, 0)
+        self.assertEqual(stats.size, 0)
+        self.assertEqual(stats.expirations, 1)
+
+    async def test_writing_same_payload_once(self):
+        """Test that storing the same payload again does not count as a write."""
+        store = MemoryPayloadStore()
+        await store.set(_KEY, _PAYLOAD)
+        await store.set(_KEY, _PAYLOAD)
+
+        self.assertEqual(store.get_stats().writes, 1)
+        self.assertEqual(await store.pop(_KEY), _PAYLOAD)
+        self.assertIsNone(await store.get(_KEY))
+
+    @override_settings(PAYLOAD_STORE={
+        'BACKEND': 'hammett.core.payload_store.MemoryPayloadStore',
+        'MAX_ENTRIES': 1,
+    })
+    async def test_opting_into_memory_payload_store(self):
+        """Test that the memory payload store is used when it's configured
+        via the PAYLOAD_STORE setting.
+        """
+        store = get_payload_store(self.context)
+
+        self.assertIsInstance(store, MemoryPayloadStore)
+        self.assertEqual(store.max_entries, 1)
+        self.assertIs(get_payload_store(self.context), store)
+
+
+class RedisPayloadStoreTests(BaseTestCase):
+    """The class implements the tests for the Redis payload store."""
+
+    def setUp(self):
+        """Initialize a Redis payload store object."""
+        super().setUp()
+
+        self.store = RedisPayloadStore(ttl=_TTL)
+        self.store.redis_cli = FakeAsyncRedis()
+
+    async def test_storing_payloads_with_expiration(self):
+        """Test that each payload is stored under its own key with the TTL."""
+        await self.store.set(_KEY, _PAYLOAD)
+        name = f'{self.store.key_prefix}{_KEY}'
+
+        self.assertEqual(await self.store.get(_KEY), _PAYLOAD)
+        self.assertGreater(await self.store.redis_cli.ttl(name), 0)
+        self.assertEqual(await self.store.pop(_KEY), _PAYLOAD)
+        self.assertIsNone(await self.store.get(_KEY))
+        self.assertEqual(await self.store.redis_cli.exists(name), 0)
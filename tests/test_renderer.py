@@ -0,0 +1,281 @@
+"""The module contains the tests for the renderer."""
+
+# ruff: noqa: RUF029
+
+import tempfile
+from unittest.mock import patch
+
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest
+
+from hammett.core import Button
+from hammett.core.constants import FinalRenderConfig, SourceTypes
+from hammett.core.file_id_cache import get_file_id_cache, get_media_key
+from hammett.core.renderer import Renderer
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_COVER_URL = 'https://example.com/cover.png'
+
+_DESCRIPTION = 'Test description'
+
+_FILE_ID = 'AgACAgIAAxkBAAIBZ2Z'
+
+_RENDER_DIFF = {'ENABLED': True, 'MAX_MESSAGES': 10}
+
+_TEST_BUTTON_NAME = 'Test button'
+
+_TEST_URL = 'https://github.com/cusdeb-com/hammett'
+
+
+class RendererTests(BaseTestCase):
+    """The class implements the tests for the renderer."""
+
+    def setUp(self):
+        """Forget the fingerprints of the messages rendered by the other tests."""
+        super().setUp()
+
+        Renderer._fingerprints.clear()  # noqa: SLF001
+        self.renderer = Renderer(html_parse_mode=True)
+        self.requests = []
+
+    async def _render(self, **kwargs):
+        """Edit the message using the config with the specified attributes
+        and return the names of the sent requests.
+        """
+        async def send(send, _kwargs, _priority, _uploads=None):
+            self.requests.append(send.__name__)
+            return True
+
+        self.requests = []
+        config = FinalRenderConfig(
+            chat_id=self.chat_id,
+            message_id=self.message_id,
+            **{'description': _DESCRIPTION, **kwargs},
+        )
+        with patch.object(Renderer, '_send', side_effect=send):
+            await self.renderer.render(self.update, self.context, config)
+
+        return self.requests
+
+    @staticmethod
+    def _get_keyboard(caption=_TEST_BUTTON_NAME):
+        """Return a keyboard with the button with the specified caption."""
+        return [[Button(caption, _TEST_URL, source_type=SourceTypes.URL_SOURCE_TYPE)]]
+
+    @override_settings(RENDER_DIFF=_RENDER_DIFF)
+    async def test_editing_text_message(self):
+        """Test that only the changed parts of a text message are edited."""
+        self.assertEqual(await self._render(), ['edit_message_text'])
+        self.assertEqual(await self._render(), [])
+        self.assertEqual(
+            await self._render(keyboard=self._get_keyboard()),
+            ['edit_message_reply_markup'],
+        )
+        self.assertEqual(
+            await self._render(description='New description', keyboard=self._get_keyboard()),
+            ['edit_message_text'],
+        )
+
+    @override_settings(RENDER_DIFF=_RENDER_DIFF)
+    async def test_editing_message_with_cover(self):
+        """Test that the caption of a message is edited without re-uploading
+        the unchanged cover, unless it's a URL of a cover which is not cached.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.png') as cover:
+            self.assertEqual(await self._render(cover=cover.name), ['edit_message_media'])
+            self.assertEqual(
+                await self._render(cover=cover.name, description='New description'),
+                ['edit_message_caption'],
+            )
+
+        self.assertEqual(await self._render(cover=_COVER_URL), ['edit_message_media'])
+        self.assertEqual(await self._render(cover=_COVER_URL), ['edit_message_media'])
+        for requests in (['edit_message_media'], []):
+            self.assertEqual(await self._render(cover=_COVER_URL, cache_covers=True), requests)
+
+    @override_settings(RENDER_DIFF=_RENDER_DIFF)
+    async def test_returning_result_of_skipped_edit(self):
+        """Test that the result of the previous edit is returned when
+        the edit is skipped because nothing has changed.
+        """
+        async def send(_send, _kwargs, _priority, _uploads=None):
+            return self.message
+
+        config = FinalRenderConfig(
+            chat_id=self.chat_id,
+            description=_DESCRIPTION,
+            message_id=self.message_id,
+        )
+        with patch.object(Renderer, '_send', side_effect=send):
+            edited_message = await self.renderer.render(self.update, self.context, config)
+
+        self.assertEqual(await self._render(), [])
+        with patch.object(Renderer, '_send', side_effect=send):
+            message = await self.renderer.render(self.update, self.context, config)
+
+        self.assertIs(message, edited_message)
+
+    @override_settings(RENDER_DIFF=_RENDER_DIFF)
+    async def test_forgetting_fingerprint_on_keyboard_hiding(self):
+        """Test that the message is edited completely after its keyboard is hidden."""
+        await self._render(keyboard=self._get_keyboard())
+
+        async def send(_send, _kwargs, _priority, _uploads=None):
+            return True
+
+        with patch.object(Renderer, '_send', side_effect=send):
+            await self.renderer.hide_keyboard(self.context, {
+                'chat_id': self.chat_id,
+                'message_id': self.message_id,
+            })
+
+        self.assertEqual(await self._render(keyboard=self._get_keyboard()), ['edit_message_text'])
+
+    async def test_editing_without_render_diff(self):
+        """Test that the message is edited every time if the render diff is disabled."""
+        for _ in range(2):
+            self.assertEqual(await self._render(), ['edit_message_text'])
+
+    async def test_sending_cached_cover(self):
+        """Test that the file ID of an uploaded cover is sent instead of the file."""
+        sent_kwargs = []
+
+        async def send(_send, kwargs, _priority, _uploads=None):
+            sent_kwargs.append(kwargs)
+            return True
+
+        with tempfile.NamedTemporaryFile(suffix='.png') as cover:
+            await get_file_id_cache().set(await get_media_key(cover.name), _FILE_ID)
+            config = FinalRenderConfig(
+                as_new_message=True,
+                cache_covers=True,
+                chat_id=self.chat_id,
+                cover=cover.name,
+                description=_DESCRIPTION,
+            )
+            with patch.object(Renderer, '_send', side_effect=send):
+                await self.renderer.render(self.update, self.context, config)
+
+        self.assertEqual(sent_kwargs[0]['photo'], _FILE_ID)
+
+    @override_settings(RENDER_DIFF=_RENDER_DIFF)
+    async def test_forgetting_fingerprint_on_failure(self):
+        """Test that the message is edited completely after a failed edit."""
+        await self._render()
+
+        async def fail(_send, _kwargs, _priority, _uploads=None):
+            msg = 'Message to edit not found'
+            raise BadRequest(msg)
+
+        with (
+            patch.object(Renderer, '_send', side_effect=fail),
+            self.assertRaises(BadRequest),
+        ):
+            await self.renderer.render(
+                self.update,
+                self.context,
+                FinalRenderConfig(
+                    chat_id=self.chat_id,
+                    message_id=self.message_id,
+                    description='New description',
+                ),
+            )
+
+        self.assertEqual(await self._render(), ['edit_message_text'])
+
+    async def test_splitting_long_caption(self):
+        """Test that a caption which is too long is split into the caption
+        and the following messages, the last of which gets the keyboard.
+        """
+        sent = []
+
+        async def send(send, kwargs, _priority, _uploads=None):
+            sent.append((send.__name__, kwargs))
+            return True
+
+        description = '\n'.join(f'<b>Release {i}</b>' for i in range(200))
+        config = FinalRenderConfig(
+            as_new_message=True,
+            chat_id=self.chat_id,
+            cover=_COVER_URL,
+            description=description,
+            keyboard=self._get_keyboard(),
+        )
+        with patch.object(Renderer, '_send', side_effect=send):
+            await self.renderer.render(self.update, self.context, config)
+
+        methods = [method for method, _ in sent]
+        self.assertEqual(methods, ['send_photo', 'send_message'])
+        caption = sent[0][1]['caption'].replace('<b>', '').replace('</b>', '')
+        self.assertLessEqual(len(caption), MessageLimit.CAPTION_LENGTH)
+        self.assertNotIn('reply_markup', sent[0][1])
+        self.assertIn('reply_markup', sent[-1][1])
+        self.assertEqual(
+            ''.join(kwargs.get('caption', kwargs.get('text')) for _, kwargs in sent),
+            description,
+        )
+
+    async def test_rendering_document_with_different_descriptions(self):
+        """Test that the description of each render becomes the caption of
+        the document shared between the renders.
+        """
+        sent = []
+
+        async def send(send, kwargs, _priority, _uploads=None):
+            sent.append((send.__name__, kwargs))
+            return True
+
+        document = {'media': _COVER_URL, 'document_kwargs': {}}
+        with patch.object(Renderer, '_send', side_effect=send):
+            for description in (_DESCRIPTION, 'New description'):
+                config = FinalRenderConfig(
+                    as_new_message=True,
+                    chat_id=self.chat_id,
+                    description=description,
+                    document=document,
+                )
+                await self.renderer.render(self.update, self.context, config)
+
+        self.assertEqual(
+            [kwargs['caption'] for _, kwargs in sent],
+            [_DESCRIPTION, 'New description'],
+        )
+        self.assertEqual(document['document_kwargs'], {})
+
+    async def test_replacing_edited_message_with_long_caption(self):
+        """Test that a message which is edited to have a caption which is too
+        long is replaced with the new messages, the last of which gets
+        the keyboard, and that the keyboard of the message is hidden if
+        the message can no longer be deleted.
+        """
+        sent = []
+
+        async def send(send, kwargs, _priority, _uploads=None):
+            sent.append((send.__name__, kwargs))
+            if send.__name__ == 'delete_message' and not deletable:
+                msg = "Message can't be deleted for everyone"
+                raise BadRequest(msg)
+
+            return True
+
+        description = '\n'.join(f'<b>Release {i}</b>' for i in range(400))
+        config = FinalRenderConfig(
+            chat_id=self.chat_id,
+            description=description,
+            keyboard=self._get_keyboard(),
+            message_id=self.message_id,
+        )
+        with patch.object(Renderer, '_send', side_effect=send):
+            deletable = True
+            await self.renderer.render(self.update, self.context, config)
+            methods = [method for method, _ in sent]
+            self.assertEqual(methods, ['send_message', 'send_message', 'delete_message'])
+            self.assertIn('reply_markup', sent[1][1])
+            self.assertEqual(''.join(kwargs['text'] for _, kwargs in sent[:2]), description)
+
+            sent.clear()
+            deletable = False
+            await self.renderer.render(self.update, self.context, config)
+            methods = [method for method, _ in sent]
+            self.assertEqual(methods[-2:], ['delete_message', 'edit_message_reply_markup'])
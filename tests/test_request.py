@@ -0,0 +1,69 @@
+"""The module contains the tests for the outbound Bot API transport."""
+
+# ruff: noqa: S106, SLF001
+
+import httpx
+
+from hammett.core.request import InstrumentedHTTPXRequest, PoolStats, build_request
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+from tests.base import get_bot
+
+_CONNECTION_POOL_SIZE = 16
+
+_GET_UPDATES_CONNECTION_POOL_SIZE = 2
+
+_KEEPALIVE_CONNECTIONS = 4
+
+
+class RequestTests(BaseTestCase):
+    """The class implements the tests for the outbound Bot API transport."""
+
+    @override_settings(
+        APPLICATION_BUILDER_REQUEST={
+            'CONNECTION_POOL_SIZE': _CONNECTION_POOL_SIZE,
+            'KEEPALIVE_CONNECTIONS': _KEEPALIVE_CONNECTIONS,
+        },
+        APPLICATION_BUILDER_GET_UPDATES_REQUEST={
+            'CONNECTION_POOL_SIZE': _GET_UPDATES_CONNECTION_POOL_SIZE,
+        },
+        TOKEN='secret-token',
+    )
+    def test_separate_pools_are_configured_from_settings(self):
+        """Test that the getUpdates requests and the regular requests
+        use separate pools configured via the settings.
+        """
+        bot = get_bot()
+        get_updates_request, request = bot._native_application.bot._request
+
+        self.assertIsInstance(request, InstrumentedHTTPXRequest)
+        self.assertIsInstance(get_updates_request, InstrumentedHTTPXRequest)
+        self.assertIsNot(request, get_updates_request)
+
+        limits = request._client_kwargs['limits']
+        self.assertEqual(limits.max_connections, _CONNECTION_POOL_SIZE)
+        self.assertEqual(limits.max_keepalive_connections, _KEEPALIVE_CONNECTIONS)
+
+        limits = get_updates_request._client_kwargs['limits']
+        self.assertEqual(limits.max_connections, _GET_UPDATES_CONNECTION_POOL_SIZE)
+        self.assertEqual(limits.max_keepalive_connections, _GET_UPDATES_CONNECTION_POOL_SIZE)
+
+        self.assertEqual(bot.get_pool_stats(), {
+            'get_updates': PoolStats(),
+            'request': PoolStats(),
+        })
+
+    async def test_measuring_pool_wait(self):
+        """Test that only the first trace event of a request is taken into account
+        when measuring the time spent waiting for a connection.
+        """
+        request = build_request({'CONNECTION_POOL_SIZE': 1})
+        native_request = httpx.Request('POST', 'http://127.0.0.1/bot/getMe')
+        await request._trace_pool_wait(native_request)
+
+        trace = native_request.extensions['trace']
+        await trace('connection.connect_tcp.started', {})
+        await trace('http11.send_request_headers.started', {})
+
+        self.assertEqual(request.pool_stats.requests, 1)
+        self.assertGreaterEqual(request.pool_stats.max_wait, request.pool_stats.avg_wait)
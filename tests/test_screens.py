@@ -2,11 +2,19 @@
 
 # ruff: noqa: S106, SLF001
 
+import asyncio
+
 from fakeredis import FakeAsyncRedis
+from telegram import Update, User
 from telegram.ext import CallbackContext
 
-from hammett.core.constants import DEFAULT_STATE, LATEST_SENT_MSG_KEY
-from hammett.core.exceptions import ScreenDescriptionIsEmpty
+from hammett.core.constants import (
+    DEFAULT_STATE,
+    LANGUAGE_CODE_KEY,
+    LATEST_SENT_MSG_KEY,
+    RenderConfig,
+)
+from hammett.core.exceptions import ImproperlyConfigured, ScreenDescriptionIsEmpty
 from hammett.core.persistence import RedisPersistence
 from hammett.core.screen import Screen
 from hammett.test.base import BaseTestCase
@@ -23,6 +31,12 @@ from tests.base import (
 
 _DATA = {'key1': 'value1', 'key2': 'value2'}
 
+_GETTER_DELAY = 0.1
+
+_COVER = 'https://example.com/cover.png'
+
+_DESCRIPTION = 'A screen with slow getters'
+
 
 class TestScreenWithMockedRendererAndHideKeyboard(
     BaseTestScreenWithMockedRenderer,
@@ -36,6 +50,61 @@ class TestScreenWithoutDescription(Screen):
     """The class implements a screen without a description."""
 
 
+class TestScreenWithSlowGetters(Screen):
+    """The class implements a screen the getters of which do I/O."""
+
+    def __init__(self):
+        """Initialize a screen with slow getters object."""
+        super().__init__()
+        self.calls = []
+
+    async def _get(self, name, value):
+        """Imitate I/O and record the start and the end of the getter."""
+        self.calls.append(f'{name} started')
+        await asyncio.sleep(_GETTER_DELAY)
+        self.calls.append(f'{name} finished')
+        return value
+
+    async def get_cover(self, _update, _context):
+        """Return the cover of the screen."""
+        return await self._get('get_cover', _COVER)
+
+    async def get_description(self, _update, _context):
+        """Return the description of the screen."""
+        return await self._get('get_description', _DESCRIPTION)
+
+
+class TestScreenWithDependentGetters(TestScreenWithSlowGetters):
+    """The class implements a screen the description of which depends on its cover."""
+
+    getter_dependencies = {'get_description': ('get_cover', )}
+
+
+class TestScreenWithCircularGetters(TestScreenWithSlowGetters):
+    """The class implements a screen with circular getter dependencies."""
+
+    getter_dependencies = {
+        'get_cover': ('get_description', ),
+        'get_description': ('get_cover', ),
+    }
+
+
+class TestCacheableScreen(Screen):
+    """The class implements a screen with a constant description and keyboard."""
+
+    cacheable = True
+
+    def __init__(self):
+        """Initialize a cacheable screen object."""
+        super().__init__()
+        self.calls = 0
+
+    async def get_description(self, _update, _context):
+        """Return the description of the screen."""
+        self.calls += 1
+        return _DESCRIPTION
+
+
 class ScreenTests(BaseTestCase):
     """The class implements the tests for the screens."""
 
@@ -81,3 +150,83 @@ class ScreenTests(BaseTestCase):
                 **_DATA,
             },
         })
+
+    async def test_getters_are_resolved_concurrently(self):
+        """Test that the independent getters of a screen are run concurrently."""
+        screen = TestScreenWithSlowGetters()
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        config = await screen._finalize_config(None, self.context, None)
+        elapsed = loop.time() - start
+
+        self.assertEqual(config.cover, _COVER)
+        self.assertEqual(config.description, _DESCRIPTION)
+        self.assertLess(elapsed, _GETTER_DELAY * 2)
+
+    async def test_dependent_getters_are_resolved_in_order(self):
+        """Test that a getter starts only after the getters it depends on finish."""
+        screen = TestScreenWithDependentGetters()
+        await screen._finalize_config(None, self.context, None)
+
+        self.assertEqual(screen.calls, [
+            'get_cover started',
+            'get_cover finished',
+            'get_description started',
+            'get_description finished',
+        ])
+
+    async def test_getters_supplied_by_config_are_skipped(self):
+        """Test that the getters are not run for the attributes supplied by the config."""
+        screen = TestScreenWithDependentGetters()
+        config = await screen._finalize_config(
+            None,
+            self.context,
+            RenderConfig(cover=_COVER),
+        )
+
+        self.assertEqual(config.description, _DESCRIPTION)
+        self.assertEqual(screen.calls, ['get_description started', 'get_description finished'])
+
+    async def test_circular_getter_dependencies(self):
+        """Test that circular getter dependencies are reported."""
+        screen = TestScreenWithCircularGetters()
+        with self.assertRaises(ImproperlyConfigured):
+            await screen._finalize_config(None, self.context, None)
+
+    async def test_cacheable_screen_runs_getters_once_per_language(self):
+        """Test that the getters of a cacheable screen are run once per language."""
+        screen = TestCacheableScreen()
+        screen.clear_render_cache()
+        user = User(self.user_id, 'TestUser', is_bot=False, language_code='de')
+
+        for update_id in range(2):
+            config = await screen._finalize_config(Update(update_id), self.context, None)
+            self.assertEqual(config.description, _DESCRIPTION)
+
+        self.assertEqual(screen.calls, 1)
+
+        update = self.update
+        update._unfreeze()
+        update.message._unfreeze()
+        update.message.from_user = user
+        await screen._finalize_config(update, self.context, None)
+
+        self.assertEqual(screen.calls, 2)
+
+    async def test_language_chosen_by_user_takes_precedence(self):
+        """Test that the language stored in user_data takes precedence over
+        the language of the user's Telegram client.
+        """
+        screen = TestScreen()
+        context = CallbackContext(
+            self.get_native_application(),
+            chat_id=self.chat_id,
+            user_id=self.user_id,
+        )
+        context.user_data[LANGUAGE_CODE_KEY] = 'de'
+
+        self.assertEqual(await screen.get_language(self.update, context), 'de')
+
+        context.user_data.pop(LANGUAGE_CODE_KEY)
+        self.assertNotEqual(await screen.get_language(self.update, context), 'de')
@@ -0,0 +1,127 @@
+"""The module contains the tests for the send queue."""
+
+# ruff: noqa: RUF029
+
+import asyncio
+
+from telegram.error import RetryAfter
+
+from hammett.core.send_queue import Priority, SendQueue, get_send_queue
+from hammett.core.uploads import Uploads, get_upload_limiter
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_FIRST_CHAT_ID = 1
+
+_SECOND_CHAT_ID = 2
+
+_UPLOAD_SIZE = 1024
+
+
+class SendQueueTests(BaseTestCase):
+    """The class implements the tests for the send queue."""
+
+    async def test_interactive_requests_go_ahead_of_jobs(self):
+        """Test that the interactive requests are sent ahead of the jobs
+        when the global limit is reached.
+        """
+        queue = SendQueue(global_rate=50, global_burst=1, per_chat_burst=10)
+        order = []
+
+        async def method(name):
+            order.append(name)
+
+        await queue.send(method, {'name': 'first'}, chat_id=_FIRST_CHAT_ID)
+        await asyncio.gather(
+            queue.send(method, {'name': 'job'}, chat_id=_FIRST_CHAT_ID, priority=Priority.JOB),
+            queue.send(method, {'name': 'interactive'}, chat_id=_SECOND_CHAT_ID),
+        )
+
+        self.assertEqual(order, ['first', 'interactive', 'job'])
+
+    async def test_paused_chat_does_not_block_other_chats(self):
+        """Test that pausing a chat does not affect the requests to other chats."""
+        queue = SendQueue()
+        order = []
+
+        async def method(name):
+            order.append(name)
+
+        queue.pause_chat(_FIRST_CHAT_ID, 0.2)
+        await asyncio.gather(
+            queue.send(method, {'name': 'paused'}, chat_id=_FIRST_CHAT_ID),
+            queue.send(method, {'name': 'other'}, chat_id=_SECOND_CHAT_ID),
+        )
+
+        self.assertEqual(order, ['other', 'paused'])
+
+    async def test_retrying_after_flood_control(self):
+        """Test that the request is sent again if Telegram responds with RetryAfter."""
+        queue = SendQueue()
+        attempts = []
+
+        async def method():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RetryAfter(0)
+
+            return True
+
+        result = await queue.send(method, {}, chat_id=_FIRST_CHAT_ID)
+        stats = queue.get_stats()
+
+        self.assertTrue(result)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(stats.retried, 1)
+        self.assertEqual(stats.sent, 1)
+        self.assertEqual(stats.submitted, 1)
+        self.assertEqual(sum(stats.pending.values()), 0)
+
+    async def test_giving_up_after_max_retries(self):
+        """Test that RetryAfter is raised when the number of retries is exhausted."""
+        queue = SendQueue(max_retries=0)
+
+        async def method():
+            raise RetryAfter(0)
+
+        with self.assertRaises(RetryAfter):
+            await queue.send(method, {}, chat_id=_FIRST_CHAT_ID)
+
+        self.assertEqual(queue.get_stats().failed, 1)
+
+    async def test_reserving_uploads_only_while_sending(self):
+        """Test that the files of a request are not reserved in the upload
+        limiter while the request is waiting for its turn.
+        """
+        queue = SendQueue()
+        limiter = get_upload_limiter()
+        in_flight = limiter.in_flight
+        reserved = []
+
+        async def method():
+            reserved.append(limiter.in_flight - in_flight)
+
+        uploads = Uploads()
+        uploads.size = _UPLOAD_SIZE
+        queue.pause_chat(_FIRST_CHAT_ID, 0.1)
+        task = asyncio.ensure_future(
+            queue.send(method, {}, chat_id=_FIRST_CHAT_ID, uploads=uploads),
+        )
+        await asyncio.sleep(0.05)
+        self.assertEqual(limiter.in_flight, in_flight)
+
+        await task
+        self.assertEqual(reserved, [_UPLOAD_SIZE])
+        self.assertEqual(limiter.in_flight, in_flight)
+
+    async def test_overriding_send_queue_settings(self):
+        """Test that the send queue is built again when the SEND_QUEUE
+        setting is overridden, and shared otherwise.
+        """
+        queue = get_send_queue()
+        self.assertIs(get_send_queue(), queue)
+
+        with override_settings(SEND_QUEUE={'ENABLED': True, 'MAX_RETRIES': 0}):
+            self.assertEqual(get_send_queue().max_retries, 0)
+
+        self.assertEqual(get_send_queue().max_retries, queue.max_retries)
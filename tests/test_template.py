@@ -0,0 +1,69 @@
+"""The module contains the tests for rendering the dynamic descriptions."""
+
+# ruff: noqa: RUF029
+
+from hammett import template
+from hammett.template import (
+    clear_template_cache,
+    precompile_templates,
+    render_template_from_string,
+    render_template_from_string_async,
+)
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+
+_TEMPLATE = 'Hello, {{ name }}!'
+
+
+class TemplateTests(BaseTestCase):
+    """The class implements the tests for rendering the dynamic descriptions."""
+
+    def setUp(self):
+        """Remove the templates compiled by the other tests."""
+        super().setUp()
+
+        clear_template_cache()
+
+    async def test_rendering_template(self):
+        """Test that a template is compiled once and rendered both
+        synchronously and asynchronously.
+        """
+        async def get_name():
+            return 'Async'
+
+        for name in ('John', 'Jane'):
+            result = render_template_from_string(_TEMPLATE, {'name': name})
+            self.assertEqual(result, f'Hello, {name}!')
+
+        self.assertEqual(len(template._templates), 1)  # noqa: SLF001
+        self.assertEqual(
+            await render_template_from_string_async(
+                'Hello, {{ get_name() }}!',
+                {'get_name': get_name},
+            ),
+            'Hello, Async!',
+        )
+
+    async def test_unescaping_template(self):
+        """Test that the template escaped by an HTML editor is unescaped."""
+        result = render_template_from_string('{% if 1 &lt; 2 %}yes{% endif %}')
+
+        self.assertEqual(result, 'yes')
+
+    @override_settings(TEMPLATE_CACHE={'MAX_ENTRIES': 2})
+    async def test_evicting_least_recently_used_templates(self):
+        """Test that the least recently used templates are evicted when there
+        are more of them than the limit.
+        """
+        for i in range(3):
+            render_template_from_string(f'{{{{ {i} }}}}')
+
+        self.assertEqual(
+            [source for source, _ in template._templates],  # noqa: SLF001
+            ['{{ 1 }}', '{{ 2 }}'],
+        )
+
+    async def test_precompiling_templates(self):
+        """Test that only the strings with the Jinja2 syntax are precompiled."""
+        self.assertEqual(precompile_templates((_TEMPLATE, 'Plain text', '')), 1)
+        self.assertIn((_TEMPLATE, False), template._templates)  # noqa: SLF001
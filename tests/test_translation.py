@@ -0,0 +1,111 @@
+"""The module contains the tests for the localization tools."""
+
+import builtins
+import gettext as native_gettext
+import struct
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from hammett.core.exceptions import LocalePathIsNotSpecified
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+from hammett.utils.translation import clear_translation_cache, gettext, preload_catalogs
+
+_CAPTION = 'Hello'
+
+_TRANSLATIONS = {
+    'pt': 'Ola',
+    'ru': 'Privet',
+}
+
+
+def _write_catalog(path, messages):
+    """Write the messages to the catalog in the GNU .mo format."""
+    keys = sorted(messages)
+    ids = strs = b''
+    offsets = []
+    for key in keys:
+        msgid, msgstr = key.encode(), messages[key].encode()
+        offsets.append((len(ids), len(msgid), len(strs), len(msgstr)))
+        ids += msgid + b'\0'
+        strs += msgstr + b'\0'
+
+    header_size = 7 * 4
+    keys_start = header_size + len(keys) * 16
+    values_start = keys_start + len(ids)
+    key_offsets, value_offsets = [], []
+    for id_offset, id_length, str_offset, str_length in offsets:
+        key_offsets += [id_length, keys_start + id_offset]
+        value_offsets += [str_length, values_start + str_offset]
+
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b''.join((
+        struct.pack(
+            'Iiiiiii',
+            0x950412de,  # magic number
+            0,  # version
+            len(keys),
+            header_size,
+            header_size + len(keys) * 8,
+            0, 0,  # hash table
+        ),
+        struct.pack(f'{len(keys) * 4}i', *key_offsets, *value_offsets),
+        ids,
+        strs,
+    )))
+
+
+class TranslationTests(BaseTestCase):
+    """The class implements the tests for the localization tools."""
+
+    def setUp(self):
+        """Create the catalogs in a temporary locale directory."""
+        super().setUp()
+
+        clear_translation_cache()
+        self.addCleanup(clear_translation_cache)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        for language, translation in _TRANSLATIONS.items():
+            path = Path(self.tmp_dir.name) / language / 'LC_MESSAGES' / 'hammett.mo'
+            _write_catalog(path, {_CAPTION: translation})
+
+        settings_overrider = override_settings(DOMAIN='hammett', LOCALE_PATH=self.tmp_dir.name)
+        settings_overrider.enable()
+        self.addCleanup(settings_overrider.disable)
+
+    async def test_translating_caption(self):
+        """Test that the catalog of each language is loaded once and that
+        it's not installed globally.
+        """
+        with patch.object(
+            native_gettext,
+            'translation',
+            wraps=native_gettext.translation,
+        ) as translation:
+            for _ in range(3):
+                for language, expected in _TRANSLATIONS.items():
+                    self.assertEqual(gettext(_CAPTION, language), expected)
+
+                self.assertEqual(gettext('Untranslated', 'pt'), 'Untranslated')
+
+        self.assertEqual(translation.call_count, len(_TRANSLATIONS))
+        self.assertNotIn('_', vars(builtins))
+
+    async def test_preloading_catalogs(self):
+        """Test that the catalogs of all the languages are loaded at once."""
+        self.assertEqual(preload_catalogs(), sorted(_TRANSLATIONS))
+
+        with patch.object(native_gettext, 'translation') as translation:
+            self.assertEqual(gettext(_CAPTION, 'ru'), 'Privet')
+
+        translation.assert_not_called()
+
+    @override_settings(LOCALE_PATH='')
+    async def test_missing_locale_path(self):
+        """Test that the locale path must be specified."""
+        with self.assertRaises(LocalePathIsNotSpecified):
+            gettext(_CAPTION)
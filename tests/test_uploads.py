@@ -0,0 +1,104 @@
+"""The module contains the tests for uploading the local files."""
+
+# ruff: noqa: RUF029
+
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from hammett.core.constants import FinalRenderConfig
+from hammett.core.renderer import Renderer
+from hammett.core.uploads import UploadLimiter, Uploads, get_upload_limiter
+from hammett.test.base import BaseTestCase
+from hammett.test.utils import override_settings
+from telegram import InputFile
+
+_CONTENT = b'%PDF-1.4'
+
+_STREAMING_THRESHOLD = len(_CONTENT)
+
+_UPLOADS = {'STREAMING_THRESHOLD': _STREAMING_THRESHOLD, 'MAX_BYTES_IN_FLIGHT': 1024}
+
+
+class UploadsTests(BaseTestCase):
+    """The class implements the tests for uploading the local files."""
+
+    def setUp(self):
+        """Create a temporary directory for the files of the tests."""
+        super().setUp()
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _create_file(self, name, content=_CONTENT):
+        """Create a file with the specified content in the temporary directory."""
+        path = Path(self.tmp_dir.name) / name
+        path.write_bytes(content)
+        return path
+
+    async def test_limiting_bytes_in_flight(self):
+        """Test that an upload waits until it fits into the limit, unless
+        nothing else is being uploaded.
+        """
+        limiter = UploadLimiter(max_bytes=10)
+        await limiter.acquire(20)
+        waiter = asyncio.ensure_future(limiter.acquire(5))
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        await limiter.release(20)
+        await waiter
+        self.assertEqual(limiter.in_flight, 5)
+
+        await limiter.acquire(5)
+        self.assertEqual(limiter.in_flight, 10)
+
+    @override_settings(UPLOADS=_UPLOADS)
+    async def test_streaming_large_files(self):
+        """Test that the large files are streamed and reserved in the upload
+        limiter only while being uploaded, while the small ones are read into
+        memory.
+        """
+        uploads = Uploads()
+        small_file = await uploads.add(self._create_file('small.pdf'))
+        large_file = await uploads.add(self._create_file('large.pdf', _CONTENT * 2))
+        file_handle = large_file.input_file_content
+
+        self.assertEqual(small_file, _CONTENT)
+        self.assertIsInstance(large_file, InputFile)
+        self.assertEqual(uploads.size, len(_CONTENT) * 3)
+
+        limiter = get_upload_limiter()
+        in_flight = limiter.in_flight
+        self.assertEqual(limiter.max_bytes, _UPLOADS['MAX_BYTES_IN_FLIGHT'])
+        async with uploads.reserve():
+            self.assertFalse(file_handle.closed)
+            self.assertEqual(limiter.in_flight, in_flight + uploads.size)
+
+        self.assertEqual(limiter.in_flight, in_flight)
+        uploads.close()
+        self.assertTrue(file_handle.closed)
+
+    @override_settings(UPLOADS=_UPLOADS)
+    async def test_streaming_document(self):
+        """Test that the renderer streams a large local document."""
+        sent_kwargs = []
+
+        async def send(_send, kwargs, _priority, _uploads=None):
+            sent_kwargs.append(kwargs)
+            return True
+
+        path = self._create_file('document.pdf', _CONTENT * 2)
+        config = FinalRenderConfig(
+            as_new_message=True,
+            chat_id=self.chat_id,
+            document={'media': str(path), 'document_kwargs': {}},
+        )
+        with patch.object(Renderer, '_send', side_effect=send):
+            await Renderer(html_parse_mode=True).render(self.update, self.context, config)
+
+        document = sent_kwargs[0]['document']
+        self.assertIsInstance(document, InputFile)
+        self.assertTrue(document.input_file_content.closed)
+        self.assertEqual(document.filename, path.name)
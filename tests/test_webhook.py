@@ -0,0 +1,188 @@
+"""The module contains the tests for the webhook mode with replies."""
+
+# ruff: noqa: SLF001
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import httpx
+import tornado.httpserver
+import tornado.netutil
+from telegram.ext import Application, Updater
+from telegram.ext._utils.webhookhandler import WebhookServer
+from telegram.request import RequestData
+from telegram.request._requestparameter import RequestParameter
+
+from hammett.core.webhook import (
+    WebhookReplyAppClass,
+    WebhookReplyRequest,
+    WebhookReplyUpdater,
+    expect_reply,
+    forget_reply,
+    run_webhook_with_replies,
+    take_reply,
+)
+from hammett.test.base import BaseTestCase
+
+_ANSWER_CALLBACK_QUERY_URL = 'https://api.telegram.org/botsecret-token/answerCallbackQuery'
+
+_CALLBACK_QUERY_ID = '42'
+
+_PORT = 8443
+
+_SECRET_TOKEN = 'webhook-secret'  # noqa: S105
+
+_TEXT = 'Done'
+
+
+class WebhookTests(BaseTestCase):
+    """The class implements the tests for the webhook mode with replies."""
+
+    def _get_update_data(self):
+        """Return the data of an update containing a callback query."""
+        return {
+            'update_id': self.update_id,
+            'callback_query': {
+                'id': _CALLBACK_QUERY_ID,
+                'chat_instance': '1',
+                'from': {'id': self.user_id, 'first_name': 'TestUser', 'is_bot': False},
+                'data': 'data',
+                'message': {
+                    'message_id': self.message_id,
+                    'date': int(datetime.now(timezone.utc).timestamp()),
+                    'chat': {'id': self.chat_id, 'type': 'private'},
+                },
+            },
+        }
+
+    async def test_answer_is_passed_to_pending_reply(self):
+        """Test that the answer to the callback query is not sent to the Bot API,
+        but passed to the pending webhook response.
+        """
+        reply = expect_reply(_CALLBACK_QUERY_ID)
+        request = WebhookReplyRequest()
+        request_data = RequestData([
+            RequestParameter('callback_query_id', _CALLBACK_QUERY_ID, None),
+            RequestParameter('text', _TEXT, None),
+        ])
+
+        status, _ = await request.do_request(
+            _ANSWER_CALLBACK_QUERY_URL,
+            'POST',
+            request_data,
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(reply.result(), {
+            'method': 'answerCallbackQuery',
+            'callback_query_id': _CALLBACK_QUERY_ID,
+            'text': _TEXT,
+        })
+
+    async def test_only_first_answer_is_piggybacked(self):
+        """Test that only the first answer to the callback query is passed to
+        the pending webhook response and forgotten replies are not taken.
+        """
+        expect_reply(_CALLBACK_QUERY_ID)
+        parameters = {'callback_query_id': _CALLBACK_QUERY_ID}
+
+        self.assertTrue(take_reply('answerCallbackQuery', parameters))
+        self.assertFalse(take_reply('answerCallbackQuery', parameters))
+
+        expect_reply(_CALLBACK_QUERY_ID)
+        forget_reply(_CALLBACK_QUERY_ID)
+        self.assertFalse(take_reply('answerCallbackQuery', parameters))
+
+        expect_reply(_CALLBACK_QUERY_ID)
+        self.assertFalse(take_reply('editMessageText', parameters))
+        forget_reply(_CALLBACK_QUERY_ID)
+
+    async def test_webhook_response_contains_answer(self):
+        """Test that the webhook response contains the answer to the callback query."""
+        update_queue = asyncio.Queue()
+        web_application = WebhookReplyAppClass(
+            '/webhook',
+            self.context.bot,
+            update_queue,
+            _SECRET_TOKEN,
+        )
+        sockets = tornado.netutil.bind_sockets(0, '127.0.0.1')
+        port = sockets[0].getsockname()[1]
+        server = tornado.httpserver.HTTPServer(web_application)
+        server.add_sockets(sockets)
+
+        async def process_update():
+            update = await update_queue.get()
+            take_reply('answerCallbackQuery', {
+                'callback_query_id': update.callback_query.id,
+                'text': _TEXT,
+            })
+
+        try:
+            task = asyncio.create_task(process_update())
+            async with httpx.AsyncClient() as client:
+                rejected_response = await client.post(
+                    f'http://127.0.0.1:{port}/webhook',
+                    json=self._get_update_data(),
+                )
+                response = await client.post(
+                    f'http://127.0.0.1:{port}/webhook',
+                    json=self._get_update_data(),
+                    headers={'X-Telegram-Bot-Api-Secret-Token': _SECRET_TOKEN},
+                )
+
+            await task
+        finally:
+            server.stop()
+
+        self.assertEqual(rejected_response.status_code, 403)
+        self.assertEqual(response.json(), {
+            'method': 'answerCallbackQuery',
+            'callback_query_id': _CALLBACK_QUERY_ID,
+            'text': _TEXT,
+        })
+
+    async def test_webhook_with_replies_is_run_by_application(self):
+        """Test that the webhook server with replies is run by
+        Application.run_webhook with all the arguments passed through.
+        """
+        application = self.get_native_application()
+        with patch.object(Application, 'run_webhook') as run_webhook:
+            run_webhook_with_replies(
+                application,
+                reply_timeout=1,
+                port=_PORT,
+                secret_token=_SECRET_TOKEN,
+            )
+
+        run_webhook.assert_called_once_with(port=_PORT, secret_token=_SECRET_TOKEN)
+        self.assertIsInstance(application.updater, WebhookReplyUpdater)
+        self.assertIs(application.updater.bot, application.bot)
+        self.assertEqual(application.updater.reply_timeout, 1)
+
+    async def test_updater_serves_webhook_with_replies(self):
+        """Test that the webhook server started by the updater handles
+        the webhook requests using WebhookReplyAppClass.
+        """
+        updater = WebhookReplyUpdater(self.context.bot, asyncio.Queue(), reply_timeout=1)
+        with (
+            patch.object(Updater, '_bootstrap') as bootstrap,
+            patch.object(WebhookServer, 'serve_forever') as serve_forever,
+        ):
+            await updater._start_webhook(
+                '127.0.0.1',
+                _PORT,
+                'webhook',
+                0,
+                None,
+                secret_token=_SECRET_TOKEN,
+            )
+
+        bootstrap.assert_awaited_once()
+        serve_forever.assert_awaited_once()
+        self.assertEqual(bootstrap.call_args.kwargs['webhook_url'], f'http://127.0.0.1:{_PORT}/webhook')
+        web_application = updater._httpd._http_server.request_callback
+        self.assertIsInstance(web_application, WebhookReplyAppClass)
+        self.assertEqual(web_application.shared_objects['reply_timeout'], 1)
+        self.assertEqual(web_application.shared_objects['secret_token'], _SECRET_TOKEN)